@@ -0,0 +1,6 @@
+"""Offline benchmarks for the Requirement Agent examples
+
+Every benchmark runs against `examples.scripted.ScriptedChatModel`, so no
+API key or network access is needed. Run a suite with `python -m`, e.g.
+`python -m benchmarks.bench_examples`.
+"""
@@ -0,0 +1,117 @@
+"""Load test of pooled handoff targets
+
+Runs the orchestrator of example 5 (two handoffs per run) with 1, 8 and 64
+concurrent orchestrators against the scripted model, once with the stock
+`HandoffTool` (a new expert clone per handoff) and once with
+`PooledHandoffTool` (`--pool-size` pre-warmed experts each). Building an
+expert costs `--build-cost` seconds of CPU (prompt templates, tool schemas,
+clients), the part pooling avoids; model calls sleep `--latency`.
+
+Reports throughput, run latency and, for the pool, how often and how long
+handoffs waited for a free expert.
+
+    python -m benchmarks.bench_agent_pool --concurrency 1 8 64 --pool-size 8 --build-cost 0.005
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Any
+
+from benchmarks.scenarios import all_scripts
+from benchmarks.utils import load_example, write_results
+
+PROMPT = "I want to plan a beach vacation. Can you help me with destinations and weather?"
+
+
+def create_experts(llm: Any, build_cost: float) -> tuple[Any, Any]:
+    from beeai_framework.agents.experimental import RequirementAgent
+
+    example = load_example("05_multiagent_handoff")
+
+    class SlowBuildAgent(RequirementAgent):
+        async def clone(self) -> RequirementAgent:
+            time.sleep(build_cost)  # noqa: ASYNC251 - blocking on purpose, building an agent is CPU work
+            return await super().clone()
+
+    destination = SlowBuildAgent(
+        llm=llm, tools=[example.get_destination_info], instructions="You are a destination expert."
+    )
+    weather = SlowBuildAgent(llm=llm, tools=[example.get_weather_info], instructions="You are a weather expert.")
+    return destination, weather
+
+
+async def measure(variant: str, concurrency: int, args: argparse.Namespace) -> dict[str, Any]:
+    from beeai_framework.agents.experimental import RequirementAgent
+    from beeai_framework.agents.experimental.requirements.conditional import ConditionalRequirement
+    from beeai_framework.tools.handoff import HandoffTool
+
+    from examples.agent_pool import AgentPool, PooledHandoffTool
+    from examples.batch import BatchRunner
+    from examples.scripted import ScriptedChatModel
+
+    llm = ScriptedChatModel(all_scripts(), latency=args.latency)
+    destination, weather = create_experts(llm, args.build_cost)
+    pools: list[AgentPool] = []
+    if variant == "pooled":
+        pools = [AgentPool(expert, size=args.pool_size, prewarm=args.pool_size) for expert in (destination, weather)]
+        await asyncio.gather(*(pool.warm() for pool in pools))
+
+    def create_orchestrator() -> RequirementAgent:
+        if pools:
+            handoff_destination = PooledHandoffTool(pools[0], name="transfer_to_destination_expert")
+            handoff_weather = PooledHandoffTool(pools[1], name="transfer_to_weather_expert")
+        else:
+            handoff_destination = HandoffTool(destination, name="transfer_to_destination_expert")
+            handoff_weather = HandoffTool(weather, name="transfer_to_weather_expert")
+        return RequirementAgent(
+            llm=llm,
+            tools=[handoff_destination, handoff_weather],
+            requirements=[ConditionalRequirement(handoff_weather, only_after=[handoff_destination])],
+        )
+
+    runner = BatchRunner(create_orchestrator, concurrency=concurrency)
+    results = await runner.run([PROMPT] * max(args.runs, concurrency))
+    errors = [result.error for result in results if not result.ok]
+    if errors:
+        raise RuntimeError(f"{len(errors)} runs failed") from errors[0]
+
+    result = runner.stats.to_dict()
+    if pools:
+        result["pool"] = {
+            name: value
+            for name, value in zip(("destination", "weather"), (pool.stats.to_dict() for pool in pools), strict=True)
+        }
+    return result
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 64])
+    parser.add_argument("--runs", type=int, default=64, help="orchestrator runs per level (at least the concurrency)")
+    parser.add_argument("--pool-size", type=int, default=8)
+    parser.add_argument("--build-cost", type=float, default=0.005, help="CPU seconds to build an expert agent")
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated model latency in seconds")
+    parser.add_argument("--output", default="benchmark-agent-pool.json")
+    args = parser.parse_args()
+
+    results: dict[str, Any] = {}
+    for concurrency in args.concurrency:
+        for variant in ("clone", "pooled"):
+            result = results[f"{variant}_{concurrency}"] = await measure(variant, concurrency, args)
+            latency = result["latency_s"]
+            line = (
+                f"{concurrency:3d} orchestrators {variant:<7} {result['throughput_per_s']:7.2f} runs/s  "
+                f"p50 {latency['p50'] * 1000:8.2f}ms  p95 {latency['p95'] * 1000:8.2f}ms"
+            )
+            if "pool" in result:
+                waits = sum(stats["waits"] for stats in result["pool"].values())
+                wait_s = sum(stats["wait_s"] for stats in result["pool"].values())
+                created = sum(stats["created"] for stats in result["pool"].values())
+                line += f"  experts built {created}  waits {waits} ({wait_s:.2f}s)"
+            print(line)
+    write_results(args.output, "agent_pool", results)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,139 @@
+"""Benchmark agent construction: build per request vs clone vs template
+
+For two agents, the one of example 1 (two tools, one requirement) and a
+`CompiledRequirementAgent` over a pipeline of `--tools` tools (the rule set
+of `bench_automaton`), measures the time and the retained memory per agent
+of
+
+* build: the constructor with fresh requirements, as a per-request handler
+  would do it;
+* clone: `await agent.clone()` of a prebuilt agent;
+* template: `AgentTemplate.create()`.
+
+Then runs one template clone of example 1 against the scripted model to
+check it answers like a freshly built agent.
+
+    python -m benchmarks.bench_agent_template --count 2000 --tools 20
+"""
+
+import argparse
+import asyncio
+import gc
+import time
+import tracemalloc
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from benchmarks.bench_automaton import create_requirements, create_tools
+from benchmarks.scenarios import all_scripts
+from benchmarks.utils import load_example, use_scripted_model, write_results
+
+
+async def measure(create: Callable[[], Awaitable[Any]], count: int) -> dict[str, float]:
+    await create()  # warm up lazy imports and caches
+    gc.collect()
+    start = time.perf_counter()
+    for _ in range(count):
+        await create()
+    elapsed = time.perf_counter() - start
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        agents = [await create() for _ in range(count)]
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del agents
+    return {"us_per_agent": elapsed / count * 1e6, "bytes_per_agent": (after - before) / count}
+
+
+def example_factory(llm: Any) -> Callable[[], Any]:
+    from beeai_framework.agents.experimental import RequirementAgent
+    from beeai_framework.agents.experimental.requirements.conditional import ConditionalRequirement
+
+    example = load_example("01_context_before_tool")
+
+    def build() -> RequirementAgent:
+        return RequirementAgent(
+            llm=llm,
+            tools=[example.fetch_user_location, example.weather_tool],
+            requirements=[ConditionalRequirement(example.weather_tool, only_after=[example.fetch_user_location])],
+        )
+
+    return build
+
+
+def compiled_factory(llm: Any, size: int) -> Callable[[], Any]:
+    from beeai_framework.tools.think import ThinkTool
+
+    from examples.automaton import CompiledRequirementAgent
+
+    think = ThinkTool()
+    pipeline = create_tools(size)
+
+    def build() -> CompiledRequirementAgent:
+        return CompiledRequirementAgent(
+            llm=llm,
+            tools=[think, *pipeline],
+            requirements=create_requirements(think, pipeline),
+            instructions="Run every pipeline step in order.",
+        )
+
+    return build
+
+
+async def check_answer(build: Callable[[], Any]) -> None:
+    from examples.agent_template import AgentTemplate
+
+    template = AgentTemplate(build())
+    expected = (await build().run("What's the weather like?")).answer.text
+    first, second = template.create(), template.create()
+    for agent in (first, second):
+        answer = (await agent.run("What's the weather like?")).answer.text
+        if answer != expected:
+            raise AssertionError(f"template clone answered {answer!r}, a new agent {expected!r}")
+    if first.memory is second.memory or first.emitter is second.emitter:
+        raise AssertionError("template clones share per-run state")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=2000, help="agents to create per variant")
+    parser.add_argument("--tools", type=int, default=20, help="pipeline tools of the compiled agent")
+    parser.add_argument("--output", default="benchmark-agent-template.json")
+    args = parser.parse_args()
+
+    from examples.agent_template import AgentTemplate
+
+    llm = use_scripted_model()
+    llm.scripts = all_scripts()
+
+    results: dict[str, Any] = {}
+    for name, build in (("example_01", example_factory(llm)), ("compiled", compiled_factory(llm, args.tools))):
+        prototype = build()
+        template = AgentTemplate(build())
+
+        async def build_async(build: Callable[[], Any] = build) -> Any:
+            return build()
+
+        async def create(template: AgentTemplate[Any] = template) -> Any:
+            return template.create()
+
+        variants = {"build": build_async, "clone": prototype.clone, "template": create}
+        results[name] = {variant: await measure(fn, args.count) for variant, fn in variants.items()}
+        for variant, result in results[name].items():
+            speedup = results[name]["build"]["us_per_agent"] / result["us_per_agent"]
+            print(
+                f"{name:<11} {variant:<9} {result['us_per_agent']:9.2f}us/agent  "
+                f"{result['bytes_per_agent']:9.0f} B/agent  {speedup:6.1f}x"
+            )
+
+    await check_answer(example_factory(llm))
+    print("template clones answer like new agents")
+    write_results(args.output, "agent_template", results)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,126 @@
+"""Benchmark runs waiting on approval
+
+Starts `--runs` runs of the example 9 agent at once (all of them need an
+approval to send the email) and measures how fast they complete when a
+simulated human takes `--think` seconds per decision:
+
+* blocking: the stock handler, `io_read` in a worker thread per request;
+* queue: `ApprovalQueue`, the human decides each batch of pending requests;
+* policy: `ApprovalQueue` with an `ApprovalPolicy`, so identical requests
+  share a decision and later ones are approved from the cache.
+
+Meanwhile a probe measures how long `asyncio.to_thread` work (e.g. a sync
+tool of another run) waits for a worker thread.
+
+    python -m benchmarks.bench_approvals --runs 1000 --think 0.2
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Any
+
+from benchmarks.scenarios import all_scripts
+from benchmarks.utils import load_example, use_scripted_model, write_results
+from examples.metrics import summarize
+
+PROMPT = "Please draft a report on Q4 sales performance and send it to manager."
+
+
+async def probe(delays: list[float], interval: float) -> None:
+    while True:
+        start = time.perf_counter()
+        await asyncio.to_thread(time.sleep, 0)
+        delays.append(time.perf_counter() - start)
+        await asyncio.sleep(interval)
+
+
+async def measure(variant: str, args: argparse.Namespace, llm: Any) -> dict[str, Any]:
+    from beeai_framework.agents.experimental import RequirementAgent
+    from beeai_framework.agents.experimental.requirements.ask_permission import AskPermissionRequirement
+    from beeai_framework.utils.asynchronous import ensure_async
+    from beeai_framework.utils.io import setup_io_context
+
+    from examples.agent_template import AgentTemplate
+    from examples.approvals import ApprovalPolicy, ApprovalQueue
+    from examples.batch import BatchRunner
+
+    example = load_example("09_permission_required")
+    decisions = 0
+
+    def blocking_human(_: str) -> str:
+        nonlocal decisions
+        time.sleep(args.think)  # like input(), holds the worker thread while the human reads
+        decisions += 1
+        return "yes"
+
+    async def human(batch: list[Any]) -> bool:
+        nonlocal decisions
+        await asyncio.sleep(args.think)
+        decisions += 1
+        return True
+
+    queue = ApprovalQueue(policy=ApprovalPolicy(ttl=600) if variant == "policy" else None)
+    requirement = (
+        AskPermissionRequirement(example.send_email_to_manager)
+        if variant == "blocking"
+        else AskPermissionRequirement(example.send_email_to_manager, handler=queue.ask)
+    )
+    template = AgentTemplate(
+        RequirementAgent(
+            llm=llm, tools=[example.send_email_to_manager, example.draft_report], requirements=[requirement]
+        )
+    )
+    runner = BatchRunner(template, concurrency=args.runs)
+
+    delays: list[float] = []
+    restore_io = setup_io_context(read=ensure_async(blocking_human))
+    probe_task = asyncio.create_task(probe(delays, args.probe_interval))
+    try:
+        start = time.perf_counter()
+        async with queue.approver(human, max_wait=0.01):
+            results = await runner.run([PROMPT] * args.runs)
+        elapsed = time.perf_counter() - start
+    finally:
+        probe_task.cancel()
+        restore_io()
+
+    errors = [result.error for result in results if not result.ok]
+    if errors:
+        raise RuntimeError(f"{len(errors)} runs failed") from errors[0]
+    return {
+        "elapsed_s": elapsed,
+        "throughput_per_s": args.runs / elapsed,
+        "latency_s": runner.stats.to_dict()["latency_s"],
+        "decisions": decisions,
+        "thread_wait_s": summarize(delays),
+        "queue": queue.stats.to_dict() if variant != "blocking" else None,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=1000, help="concurrent runs waiting on approval")
+    parser.add_argument("--think", type=float, default=0.2, help="seconds the human needs per decision")
+    parser.add_argument("--probe-interval", type=float, default=0.05)
+    parser.add_argument("--variants", nargs="+", default=["blocking", "queue", "policy"])
+    parser.add_argument("--output", default="benchmark-approvals.json")
+    args = parser.parse_args()
+
+    llm = use_scripted_model()
+    llm.scripts = all_scripts()
+
+    results: dict[str, Any] = {}
+    for variant in args.variants:
+        result = results[variant] = await measure(variant, args, llm)
+        print(
+            f"{variant:<9} {result['elapsed_s']:7.2f}s  {result['throughput_per_s']:8.1f} runs/s  "
+            f"decisions {result['decisions']:5d}  "
+            f"to_thread wait p95 {result['thread_wait_s']['p95'] * 1000:8.2f}ms "
+            f"max {result['thread_wait_s']['max'] * 1000:8.2f}ms"
+        )
+    write_results(args.output, "approvals", results)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,159 @@
+"""Microbenchmark the compiled requirement automaton
+
+Builds synthetic agents with a growing number of tools and rules (a pipeline
+of `only_after` + `max_invocations=1` steps, a ReAct-style ThinkTool rule and
+a final answer gated on the last pipeline step) and measures, per agent
+iteration, the cost of evaluating every `ConditionalRequirement` as the
+agent does today versus one lookup in the compiled automaton. Also reports
+compile time, automaton size and how fast a contradictory rule set is
+rejected.
+
+    python -m benchmarks.bench_automaton --sizes 10 50 100 300 --steps 40
+"""
+
+import argparse
+import asyncio
+import itertools
+import time
+from typing import Any
+
+from benchmarks.utils import write_results
+from examples.metrics import summarize
+
+
+def create_tools(count: int) -> list[Any]:
+    from beeai_framework.tools import tool
+
+    def create(name: str) -> Any:
+        @tool(name=name, description=f"Pipeline step {name}")
+        def step(value: str = "") -> str:
+            return value
+
+        return step
+
+    return [create(f"step_{i:03d}") for i in range(count)]
+
+
+def create_requirements(think: Any, pipeline: list[Any]) -> list[Any]:
+    from beeai_framework.agents.experimental.requirements.conditional import ConditionalRequirement
+    from beeai_framework.tools import Tool
+
+    return [
+        ConditionalRequirement(think, force_at_step=1, force_after=[Tool], consecutive_allowed=False),
+        ConditionalRequirement(pipeline[0], max_invocations=1),
+        *(
+            ConditionalRequirement(tool, only_after=[previous], max_invocations=1)
+            for previous, tool in itertools.pairwise(pipeline)
+        ),
+        ConditionalRequirement("final_answer", only_after=[pipeline[-1]]),
+    ]
+
+
+async def measure(size: int, steps: int) -> dict[str, Any]:
+    from beeai_framework.agents.experimental.types import RequirementAgentRunState, RequirementAgentRunStateStep
+    from beeai_framework.agents.experimental.utils._tool import FinalAnswerTool
+    from beeai_framework.context import RunContext
+    from beeai_framework.memory import UnconstrainedMemory
+    from beeai_framework.tools import StringToolOutput
+    from beeai_framework.tools.think import ThinkTool
+
+    from examples.automaton import AutomatonRequirement, RequirementAutomaton
+
+    think = ThinkTool()
+    pipeline = create_tools(size)
+    tools = [think, *pipeline]
+    requirements = create_requirements(think, pipeline)
+
+    start = time.perf_counter()
+    automaton = RequirementAutomaton(tools, requirements)
+    compile_s = time.perf_counter() - start
+    compiled = AutomatonRequirement(automaton)
+
+    state = RequirementAgentRunState(memory=UnconstrainedMemory(), steps=[], iteration=0, answer=None, result=None)
+    ctx = RunContext(think, parent=None, signal=None)
+    for requirement in requirements:
+        await requirement.init(tools=[*tools, FinalAnswerTool(None, state=state)], ctx=ctx)
+
+    trajectory = [tool for pair in zip([think] * len(pipeline), pipeline, strict=True) for tool in pair][:steps]
+    interpreted_s: list[float] = []
+    compiled_s: list[float] = []
+    lookup_s: list[float] = []
+    state_id = automaton.initial
+    for i, tool in enumerate(trajectory):
+        state.iteration = i + 1
+
+        start = time.perf_counter()
+        for requirement in requirements:
+            await requirement.run(state)
+        interpreted_s.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await compiled.run(state)
+        compiled_s.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        _ = automaton.states[state_id].rules
+        state_id = automaton.step(state_id, tool.name)
+        lookup_s.append(time.perf_counter() - start)
+
+        state.steps.append(
+            RequirementAgentRunStateStep(
+                id=str(i), iteration=i + 1, tool=tool, input={}, output=StringToolOutput("ok"), error=None
+            )
+        )
+
+    return {
+        "tools": len(tools),
+        "rules": len(requirements),
+        "states": len(automaton.states),
+        "compile_s": compile_s,
+        "interpreted_s": summarize(interpreted_s),
+        "compiled_s": summarize(compiled_s),
+        "lookup_s": summarize(lookup_s),
+    }
+
+
+def measure_rejection(size: int) -> float:
+    from beeai_framework.agents.experimental.requirements.conditional import ConditionalRequirement
+    from beeai_framework.tools.think import ThinkTool
+
+    from examples.automaton import RequirementAutomaton, RequirementCompileError
+
+    think = ThinkTool()
+    pipeline = create_tools(size)
+    # the first pipeline step now also waits for the last one, so the final answer is unreachable
+    requirements = [
+        *create_requirements(think, pipeline),
+        ConditionalRequirement(pipeline[0], only_after=[pipeline[-1]]),
+    ]
+    start = time.perf_counter()
+    try:
+        RequirementAutomaton([think, *pipeline], requirements)
+    except RequirementCompileError:
+        return time.perf_counter() - start
+    raise AssertionError("contradictory requirements were not rejected")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 100, 300])
+    parser.add_argument("--steps", type=int, default=40, help="agent iterations to replay per size")
+    parser.add_argument("--output", default="benchmark-automaton.json")
+    args = parser.parse_args()
+
+    results: dict[str, Any] = {}
+    for size in args.sizes:
+        result = await measure(size, args.steps)
+        result["reject_s"] = measure_rejection(size)
+        results[str(size)] = result
+        print(
+            f"tools {result['tools']:4d}  rules {result['rules']:4d}  states {result['states']:5d}  "
+            f"compile {result['compile_s'] * 1000:8.2f}ms  reject {result['reject_s'] * 1000:8.2f}ms  "
+            f"per iteration: interpreted {result['interpreted_s']['p50'] * 1e6:9.1f}us  "
+            f"compiled {result['compiled_s']['p50'] * 1e6:7.1f}us  lookup {result['lookup_s']['p50'] * 1e6:5.2f}us"
+        )
+    write_results(args.output, "automaton", results)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
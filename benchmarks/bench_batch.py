@@ -0,0 +1,63 @@
+"""Load-test the batch runner
+
+Pushes a stream of flight-booking prompts through the agent from example 7
+(scripted model with simulated latency) at several concurrency levels and
+reports throughput and latency percentiles for each.
+
+    python -m benchmarks.bench_batch --prompts 500 --concurrency 1 8 32 128 --latency 0.05
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+from collections.abc import AsyncGenerator
+from typing import Any
+
+from benchmarks.scenarios import all_scripts
+from benchmarks.utils import load_example, use_scripted_model, write_results
+
+CITIES = ["New York", "Los Angeles", "Chicago", "Houston", "Phoenix", "Seattle", "Denver", "Boston"]
+
+
+async def prompts(count: int) -> AsyncGenerator[str]:
+    for i in range(count):
+        departure, destination = CITIES[i % len(CITIES)], CITIES[(i + 3) % len(CITIES)]
+        yield f"Book me a flight from {departure} to {destination}."
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--prompts", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated model latency in seconds")
+    parser.add_argument("--output", default="benchmark-batch.json")
+    args = parser.parse_args()
+
+    from examples.batch import BatchRunner
+
+    llm = use_scripted_model()
+    llm.scripts = all_scripts()
+    llm.latency = args.latency
+    example = load_example("07_tool_dependency")
+
+    results: dict[str, Any] = {}
+    for concurrency in args.concurrency:
+        runner = BatchRunner(example.create_agent, concurrency=concurrency)
+        with contextlib.redirect_stdout(io.StringIO()):
+            errors = [result.error async for result in runner.stream(prompts(args.prompts)) if not result.ok]
+        if errors:
+            raise errors[0]
+
+        stats = runner.stats.to_dict()
+        results[str(concurrency)] = stats
+        print(
+            f"concurrency {concurrency:4d}  {stats['throughput_per_s']:8.1f} runs/s  "
+            f"p50 {stats['latency_s']['p50'] * 1000:8.2f}ms  p95 {stats['latency_s']['p95'] * 1000:8.2f}ms  "
+            f"p99 {stats['latency_s']['p99'] * 1000:8.2f}ms"
+        )
+    write_results(args.output, "batch", {"prompts": args.prompts, "latency_s": args.latency, "levels": results})
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,186 @@
+"""Benchmark run budgets
+
+Limits: runs a ReAct loop that never settles (example 6's agent thinking and
+searching Wikipedia for ever) and a chain of handoffs to a sub-agent caught
+in the same loop, driven by the scripted model, without a budget and under
+each limit. Reports the limit that ended the run, its time, the iterations
+(sub-agents included), tokens and tool calls it used, and its answer. The
+unbounded runs end at the framework's `max_iterations` with an error.
+
+Load: `--requests` runs of example 6 arrive at `--rate` per second and
+share `--workers` workers; a `--runaway` share of them loops. Reports the
+response time (arrival to answer, queueing included) of all runs and of the
+well-behaved ones, without and with a `--timeout` budget, and how many
+well-behaved runs the budget cut short.
+
+    python -m benchmarks.bench_budget --latency 0.05 --timeout 0.5 --requests 200 --rate 8 --workers 4 --runaway 0.1
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from typing import Any
+
+from benchmarks.scenarios import SCRIPTS
+from benchmarks.utils import load_example, use_scripted_model, write_results
+from examples.metrics import summarize
+
+LOOP_PROMPT = "Research everything there is to know about Paris."
+CHAIN_PROMPT = "Plan a week in Paris for me."
+PROMPT = "What's the weather in Paris and what is the city's population?"
+
+
+def scripts() -> list[Any]:
+    from examples.scripted import Script, call
+
+    loop = []
+    for index in range(50):
+        loop.append(call("think", thoughts=f"Next I look up topic {index}.", next_step=["wikipedia_tool"]))
+        loop.append(call("wikipedia_tool", query=f"Paris topic {index}"))
+    chain = [call("transfer_to_researcher", task=f"{LOOP_PROMPT} Part {part}.") for part in range(10)]
+    return [Script(match=LOOP_PROMPT, steps=loop), Script(match=CHAIN_PROMPT, steps=chain), *SCRIPTS["06_react_loop"]]
+
+
+def create_agent(llm: Any) -> Any:
+    from beeai_framework.agents.experimental.requirements.conditional import ConditionalRequirement
+    from beeai_framework.tools import Tool
+    from beeai_framework.tools.think import ThinkTool
+
+    from examples.run_budget import RunBudgetAgent
+
+    example = load_example("06_react_loop")
+    return RunBudgetAgent(
+        llm=llm,
+        tools=[ThinkTool(), example.wikipedia_tool, example.weather_tool],
+        requirements=[
+            ConditionalRequirement(ThinkTool, force_at_step=1, force_after=[Tool], consecutive_allowed=False)
+        ],
+    )
+
+
+def create_orchestrator(llm: Any) -> Any:
+    from beeai_framework.tools.handoff import HandoffTool
+
+    from examples.run_budget import RunBudgetAgent, bounded
+
+    researcher = bounded(
+        HandoffTool(create_agent(llm), name="transfer_to_researcher", description="Transfer to the researcher.")
+    )
+    return RunBudgetAgent(llm=llm, tools=[researcher])
+
+
+async def measure_limits(llm: Any, args: argparse.Namespace) -> dict[str, Any]:
+    from examples.run_budget import RunBudget
+
+    budgets = {
+        "none": {},
+        "timeout": {"timeout": args.timeout},
+        "iterations": {"max_iterations": 8},
+        "tokens": {"max_tokens": 5_000},
+        "tool_calls": {"max_tool_calls": 6},
+    }
+    results: dict[str, Any] = {}
+    scenarios = (("loop", LOOP_PROMPT, create_agent), ("handoffs", CHAIN_PROMPT, create_orchestrator))
+    for scenario, prompt, factory in scenarios:
+        for name, limits in budgets.items():
+            budget = RunBudget(**limits)  # no limits: only counts
+            start = time.perf_counter()
+            try:
+                response = await factory(llm).run(prompt, budget=budget)
+                answer, error = response.answer.text, None
+            except Exception as e:  # noqa: BLE001 - the unbounded runs are expected to fail
+                answer, error = None, type(e).__name__
+            result = results[f"{scenario}/{name}"] = {
+                "run_s": time.perf_counter() - start,
+                "answer": answer,
+                "error": error,
+                **budget.to_dict(),
+            }
+            print(
+                f"{scenario:<8} {name:<10} {result['run_s']:6.2f}s  ended by {result['exceeded'] or '-':<10} "
+                f"iterations {result['iterations']:3d}  tokens {result['tokens']:7,d}  "
+                f"tool calls {result['tool_calls']:3d}  cut {result['cut_requests']}/{result['cut_tools']}  "
+                + (f"answer {answer.splitlines()[0][:40]!r}" if answer is not None else f"failed: {error}")
+            )
+    return results
+
+
+async def measure_load(variant: str, llm: Any, args: argparse.Namespace) -> dict[str, Any]:
+    from examples.run_budget import RunBudget
+
+    rng = random.Random(args.seed)
+    runaway = [rng.random() < args.runaway for _ in range(args.requests)]
+    gaps = [rng.expovariate(args.rate) for _ in range(args.requests)]
+    workers = asyncio.Semaphore(args.workers)
+    response_times: list[float] = []
+    normal_times: list[float] = []
+    failed = 0
+    normal_cut = 0
+
+    async def serve(index: int, arrived: float) -> None:
+        nonlocal failed, normal_cut
+        async with workers:
+            budget = RunBudget(timeout=args.timeout, grace=args.grace) if variant == "budgeted" else RunBudget()
+            try:
+                await create_agent(llm).run(LOOP_PROMPT if runaway[index] else PROMPT, budget=budget)
+            except Exception:  # noqa: BLE001 - unbounded runaway runs fail at the framework's max_iterations
+                failed += 1
+        elapsed = time.perf_counter() - arrived
+        response_times.append(elapsed)
+        if not runaway[index]:
+            normal_times.append(elapsed)
+            normal_cut += budget.exceeded is not None
+
+    tasks = []
+    start = time.perf_counter()
+    for index, gap in enumerate(gaps):
+        await asyncio.sleep(gap)
+        tasks.append(asyncio.create_task(serve(index, time.perf_counter())))
+    await asyncio.gather(*tasks)
+
+    return {
+        "wall_s": time.perf_counter() - start,
+        "runaway": sum(runaway),
+        "failed": failed,
+        "normal_cut": normal_cut,
+        "response_s": summarize(response_times),
+        "normal_response_s": summarize(normal_times),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per model response")
+    parser.add_argument("--timeout", type=float, default=0.5, help="run budget in seconds")
+    parser.add_argument("--grace", type=float, default=0.5, help="seconds past the deadline before a run is aborted")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--rate", type=float, default=8.0, help="arrivals per second")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--runaway", type=float, default=0.1, help="share of the runs that loop")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmark-budget.json")
+    args = parser.parse_args()
+
+    llm = use_scripted_model()
+    llm.scripts = scripts()
+    llm.latency = args.latency
+
+    results: dict[str, Any] = {"limits": await measure_limits(llm, args)}
+    for variant in ("unbounded", "budgeted"):
+        result = results[variant] = await measure_load(variant, llm, args)
+        for label, key in (("all", "response_s"), ("normal", "normal_response_s")):
+            stats = result[key]
+            print(
+                f"{variant:<9} {label:<6} p50 {stats['p50'] * 1000:8.1f}ms  p95 {stats['p95'] * 1000:8.1f}ms  "
+                f"p99 {stats['p99'] * 1000:8.1f}ms  max {stats['max'] * 1000:8.1f}ms"
+            )
+        print(
+            f"{variant:<9} {result['runaway']} runaway runs, {result['failed']} failed, "
+            f"{result['normal_cut']} well-behaved runs cut short"
+        )
+    write_results(args.output, "budget", results)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,132 @@
+"""Benchmark the token-budgeted memory on long ReAct trajectories
+
+Runs the think/act loop of example 6 (a forced `think` after every tool) for
+`--steps` tool steps against the scripted model, with the default run memory
+and with `BudgetedRequirementAgent`. Each model call sleeps `--latency` plus
+`--ms-per-1k-tokens` per thousand prompt tokens, as prefill time grows with
+the prompt. Reports prompt tokens of the first and the last request, the
+total over the run, and the time per iteration.
+
+    python -m benchmarks.bench_budget_memory --steps 10 50 200 --max-memory-tokens 2000
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Any
+
+from benchmarks.utils import write_results
+from examples.metrics import summarize
+
+PROMPT = "Research Paris district by district"
+
+
+def create_script(steps: int) -> Any:
+    from examples.scripted import Script, answer, call
+
+    turns = []
+    for index in range(steps // 2):
+        turns += [
+            call("think", thoughts=f"Next I need data on district {index + 1}.", next_step=["wikipedia_tool"]),
+            call("wikipedia_tool", query=f"Paris arrondissement {index + 1}"),
+        ]
+    turns += [
+        call("think", thoughts="I have everything I need.", next_step=["final_answer"]),
+        answer("Here is the overview of all districts."),
+    ]
+    return Script(steps=turns)
+
+
+def create_recorder(llm: Any, latency: float, ms_per_1k_tokens: float) -> Any:
+    from beeai_framework.backend.types import ChatModelInput, ChatModelOutput
+    from beeai_framework.context import RunContext
+
+    from examples.budget_memory import message_tokens
+    from examples.wrappers import ChatModelWrapper
+
+    class PromptRecorder(ChatModelWrapper):
+        def __init__(self) -> None:
+            super().__init__(llm)
+            self.prompt_tokens: list[int] = []
+            self.calls: list[float] = []
+
+        async def _create(self, input: ChatModelInput, run: RunContext) -> ChatModelOutput:
+            tokens = sum(message_tokens(msg) for msg in input.messages)
+            self.prompt_tokens.append(tokens)
+            self.calls.append(time.perf_counter())
+            await asyncio.sleep(latency + tokens / 1000 * ms_per_1k_tokens / 1000)
+            return await self.forward(input)
+
+    return PromptRecorder()
+
+
+async def measure(variant: str, steps: int, args: argparse.Namespace) -> dict[str, Any]:
+    from beeai_framework.agents import AgentExecutionConfig
+    from beeai_framework.agents.experimental import RequirementAgent
+    from beeai_framework.agents.experimental.requirements.conditional import ConditionalRequirement
+    from beeai_framework.tools import Tool, tool
+    from beeai_framework.tools.think import ThinkTool
+
+    from examples.budget_memory import BudgetedRequirementAgent
+    from examples.scripted import ScriptedChatModel
+
+    @tool
+    def wikipedia_tool(query: str) -> str:
+        """Tool to search Wikipedia for information."""
+        return f"Wikipedia search for '{query}': " + "The district has a population of about 150,000. " * 8
+
+    recorder = create_recorder(ScriptedChatModel(create_script(steps)), args.latency, args.ms_per_1k_tokens)
+    options: dict[str, Any] = {
+        "llm": recorder,
+        "tools": [ThinkTool(), wikipedia_tool],
+        "requirements": [
+            ConditionalRequirement(ThinkTool, force_at_step=1, force_after=[Tool], consecutive_allowed=False)
+        ],
+    }
+    agent = (
+        BudgetedRequirementAgent(max_memory_tokens=args.max_memory_tokens, **options)
+        if variant == "budgeted"
+        else RequirementAgent(**options)
+    )
+    start = time.perf_counter()
+    response = await agent.run(PROMPT, execution=AgentExecutionConfig(max_iterations=steps + 10))
+    end = time.perf_counter()
+
+    iterations = [b - a for a, b in zip(recorder.calls, [*recorder.calls[1:], end], strict=True)]
+    return {
+        "wall_s": end - start,
+        "iterations": response.state.iteration,
+        "prompt_tokens": {
+            "first": recorder.prompt_tokens[0],
+            "last": recorder.prompt_tokens[-1],
+            "total": sum(recorder.prompt_tokens),
+        },
+        "iteration_s": summarize(iterations),
+        "last_iteration_s": iterations[-1],
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--steps", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--max-memory-tokens", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.005, help="simulated model latency in seconds")
+    parser.add_argument("--ms-per-1k-tokens", type=float, default=10.0, help="simulated prefill time")
+    parser.add_argument("--output", default="benchmark-budget-memory.json")
+    args = parser.parse_args()
+
+    results: dict[str, Any] = {}
+    for steps in args.steps:
+        for variant in ("unbounded", "budgeted"):
+            result = results[f"{variant}_{steps}"] = await measure(variant, steps, args)
+            tokens = result["prompt_tokens"]
+            print(
+                f"{steps:4d} steps {variant:<10} prompt tokens first {tokens['first']:6d}  last {tokens['last']:6d}  "
+                f"total {tokens['total']:9d}  iteration p50 {result['iteration_s']['p50'] * 1000:7.2f}ms  "
+                f"last {result['last_iteration_s'] * 1000:7.2f}ms  wall {result['wall_s']:6.2f}s"
+            )
+    write_results(args.output, "budget_memory", results)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,85 @@
+"""Benchmark the LLM response cache
+
+Replays the repeated prompts of examples 1, 7 and 10 against a scripted
+model with injected latency, first without a cache, then with a cold cache,
+a warm in-memory tier and a warm on-disk tier (a new cache instance over the
+same SQLite file, as a fresh process would see it).
+
+    python -m benchmarks.bench_cache --runs 20 --latency 0.05
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from benchmarks.scenarios import all_scripts
+from benchmarks.utils import load_example, use_scripted_model, write_results
+from examples.metrics import summarize
+
+SCENARIOS = ["01_context_before_tool", "07_tool_dependency", "10_safety_stop"]
+
+
+async def run_phase(llm: Any, runs: int) -> list[float]:
+    durations: list[float] = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for name in SCENARIOS:
+            module = load_example(name)
+            module.llm = llm  # `main()` resolves the module-level name on every call
+            for _ in range(runs):
+                start = time.perf_counter()
+                await module.main()
+                durations.append(time.perf_counter() - start)
+    return durations
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated model latency in seconds")
+    parser.add_argument("--output", default="benchmark-cache.json")
+    args = parser.parse_args()
+
+    from examples.cache import CachedChatModel, TieredCache
+    from examples.scripted import ScriptedChatModel
+
+    use_scripted_model()
+    model = ScriptedChatModel(all_scripts(), latency=args.latency)
+
+    results: dict[str, Any] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "llm.sqlite"
+        phases: list[tuple[str, Any]] = [("uncached", model)]
+
+        cached = CachedChatModel(model, cache=TieredCache(path))
+        phases += [("cold", cached), ("warm_memory", cached)]
+
+        for phase, llm in phases:
+            if isinstance(llm, CachedChatModel):
+                llm.stats.reset_counters()
+            durations = await run_phase(llm, 1 if phase == "cold" else args.runs)
+            results[phase] = {"wall_s": summarize(durations)}
+            if isinstance(llm, CachedChatModel):
+                results[phase]["cache"] = llm.stats.to_dict()
+
+        cached.response_cache.close()
+        reopened = CachedChatModel(model, cache=TieredCache(path, max_memory_entries=0))
+        durations = await run_phase(reopened, args.runs)
+        results["warm_disk"] = {"wall_s": summarize(durations), "cache": reopened.stats.to_dict()}
+        reopened.response_cache.close()
+
+    for phase, result in results.items():
+        hit_rate = result.get("cache", {}).get("hit_rate")
+        print(
+            f"{phase:<12} p50 {result['wall_s']['p50'] * 1000:8.2f}ms  p95 {result['wall_s']['p95'] * 1000:8.2f}ms"
+            + (f"  hit rate {hit_rate:.0%}" if hit_rate is not None else "")
+        )
+    write_results(args.output, "cache", results)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,214 @@
+"""Benchmark run checkpoints: write overhead and resume vs re-run
+
+Uses a pipeline agent of `--steps` tools, each allowed only after the
+previous one (like `search_flights` before `book_flight` in example 7),
+driven by the scripted model.
+
+* overhead: runs the pipeline with and without a `checkpoint_id` and reports
+  the added time per step, with and without fsync, plus the checkpoint size
+  and the encode and write time of the last one;
+* resume: a child process runs the pipeline with checkpoints and is killed
+  (`os._exit`) inside step `--crash-at`; then one new process resumes the
+  run and another one starts it over without checkpoints. Reports wall time
+  and model calls of both, each model call taking `--latency` seconds.
+
+    python -m benchmarks.bench_checkpoint --steps 10 --crash-at 9 --latency 0.2
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any
+
+from benchmarks.utils import use_scripted_model, write_results
+from examples.metrics import summarize
+
+PROMPT = "Run the pipeline on the quarterly data."
+OUTPUT = "Processed batch of the quarterly data: " + "revenue, units, regions, channels; " * 6
+
+
+def create_agent(
+    llm: Any, steps: int, directory: str | None, *, fsync: bool = True, crash_at: int | None = None
+) -> Any:
+    from beeai_framework.agents.experimental import RequirementAgent
+    from beeai_framework.agents.experimental.requirements.conditional import ConditionalRequirement
+    from beeai_framework.tools import tool
+
+    from examples.checkpoint import CheckpointStore, ResumableRequirementAgent
+    from examples.scripted import Script, answer, call
+
+    def create_tool(index: int) -> Any:
+        @tool(name=f"step_{index:03d}", description=f"Pipeline step {index}")
+        def step(value: str = "") -> str:
+            if index == crash_at:
+                os._exit(3)  # the process dies in the middle of the step
+            return f"{OUTPUT}(step {index}, {value})"
+
+        return step
+
+    tools = [create_tool(index) for index in range(1, steps + 1)]
+    requirements = [
+        ConditionalRequirement(tool, only_after=[previous], max_invocations=1)
+        for previous, tool in itertools.pairwise(tools)
+    ]
+    llm.scripts = [
+        Script(
+            match=PROMPT,
+            steps=[*(call(tool.name, value=f"batch {index}") for index, tool in enumerate(tools)), answer("Done.")],
+        )
+    ]
+    if directory is None:
+        return RequirementAgent(llm=llm, tools=tools, requirements=requirements)
+    return ResumableRequirementAgent(
+        llm=llm, tools=tools, requirements=requirements, checkpoints=CheckpointStore(directory, fsync=fsync)
+    )
+
+
+def count_model_calls(llm: Any) -> list[int]:
+    calls = [0]
+    create = llm._create
+
+    async def counted(input: Any, run: Any) -> Any:
+        calls[0] += 1
+        return await create(input, run)
+
+    llm._create = counted
+    return calls
+
+
+async def child(args: argparse.Namespace) -> None:
+    """One process of the resume benchmark; prints its measurements as JSON."""
+    llm = use_scripted_model()
+    llm.latency = args.latency
+    calls = count_model_calls(llm)
+    crash_at = args.crash_at if args.child == "crash" else None
+    directory = None if args.child == "full" else args.directory
+    agent = create_agent(llm, args.steps, directory, crash_at=crash_at)
+
+    start = time.perf_counter()
+    if directory is None:
+        await agent.run(PROMPT)
+    else:
+        await agent.run(PROMPT, checkpoint_id="pipeline")
+    print(json.dumps({"elapsed_s": time.perf_counter() - start, "model_calls": calls[0]}))
+
+
+def spawn(mode: str, args: argparse.Namespace, directory: str) -> dict[str, Any] | None:
+    command = [sys.executable, "-m", "benchmarks.bench_checkpoint", "--child", mode, "--directory", directory]
+    command += ["--steps", str(args.steps), "--crash-at", str(args.crash_at), "--latency", str(args.latency)]
+    process = subprocess.run(command, capture_output=True, text=True, check=False)
+    if mode == "crash":
+        if process.returncode != 3:
+            raise RuntimeError(f"the crashing run exited with {process.returncode}: {process.stderr[-2000:]}")
+        return None
+    if process.returncode != 0:
+        raise RuntimeError(f"the {mode} run failed: {process.stderr[-2000:]}")
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+async def measure_overhead(args: argparse.Namespace) -> dict[str, Any]:
+    from examples.checkpoint import Checkpoint
+
+    llm = use_scripted_model()
+    llm.latency = 0.0
+    results: dict[str, Any] = {}
+    with tempfile.TemporaryDirectory() as directory:
+        variants = {
+            "none": create_agent(llm, args.steps, None),
+            "no_fsync": create_agent(llm, args.steps, directory, fsync=False),
+            "fsync": create_agent(llm, args.steps, directory, fsync=True),
+        }
+        timings: dict[str, list[float]] = {name: [] for name in variants}
+        last_state: Any = None
+        for _ in range(args.runs):
+            for name, agent in variants.items():  # interleaved, so drift affects every variant alike
+                agent.memory.reset()
+                start = time.perf_counter()
+                if name == "none":
+                    response = await agent.run(PROMPT)
+                    last_state = response.state
+                else:
+                    await agent.run(PROMPT, checkpoint_id=f"overhead-{name}")
+                timings[name].append(time.perf_counter() - start)
+
+        base = summarize(timings["none"])["p50"]
+        iterations = last_state.iteration
+        for name, values in timings.items():
+            stats = summarize(values)
+            results[name] = {
+                "run_s": stats,
+                "per_step_overhead_ms": (stats["p50"] - base) / iterations * 1000,
+            }
+
+        # the checkpoint written before the final answer, the largest of the run
+        agent = variants["fsync"]
+        last_state.answer = None
+        checkpoint = Checkpoint.capture("size", last_state, agent._requirements)
+        start = time.perf_counter()
+        for _ in range(100):
+            data = Checkpoint.capture("size", last_state, agent._requirements).encode()
+        encode_s = (time.perf_counter() - start) / 100
+        start = time.perf_counter()
+        for _ in range(100):
+            agent.checkpoints.save(checkpoint)
+        save_s = (time.perf_counter() - start) / 100
+        raw_size = len(json.dumps({"messages": checkpoint.messages, "steps": checkpoint.steps}))
+        results["last_checkpoint"] = {
+            "bytes": len(data),
+            "json_bytes": raw_size,
+            "capture_encode_ms": encode_s * 1000,
+            "save_fsync_ms": save_s * 1000,
+        }
+    return results
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--steps", type=int, default=10)
+    parser.add_argument("--crash-at", type=int, default=9, help="step whose tool kills the process")
+    parser.add_argument("--latency", type=float, default=0.2, help="simulated model latency in seconds")
+    parser.add_argument("--runs", type=int, default=20, help="runs per variant for the overhead measurement")
+    parser.add_argument("--output", default="benchmark-checkpoint.json")
+    parser.add_argument("--child", choices=["crash", "resume", "full"], help=argparse.SUPPRESS)
+    parser.add_argument("--directory", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        await child(args)
+        return
+
+    results: dict[str, Any] = {"overhead": await measure_overhead(args)}
+    for name in ("none", "no_fsync", "fsync"):
+        result = results["overhead"][name]
+        print(
+            f"checkpoint {name:<9} run p50 {result['run_s']['p50'] * 1000:8.2f}ms  "
+            f"overhead/step {result['per_step_overhead_ms']:6.2f}ms"
+        )
+    last = results["overhead"]["last_checkpoint"]
+    print(
+        f"last checkpoint {last['bytes']} B ({last['json_bytes']} B as JSON), capture+encode "
+        f"{last['capture_encode_ms']:.3f}ms, write+fsync {last['save_fsync_ms']:.3f}ms"
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        spawn("crash", args, directory)
+        resumed = spawn("resume", args, directory)
+        full = spawn("full", args, directory)
+    results["resume"] = {"resumed": resumed, "full_rerun": full}
+    assert resumed is not None and full is not None
+    print(
+        f"after a crash in step {args.crash_at}/{args.steps}: resume {resumed['elapsed_s']:.2f}s "
+        f"({resumed['model_calls']} model calls), full re-run {full['elapsed_s']:.2f}s "
+        f"({full['model_calls']} model calls)"
+    )
+    write_results(args.output, "checkpoint", results)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
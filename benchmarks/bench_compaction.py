@@ -0,0 +1,219 @@
+"""Benchmark tool output compaction
+
+Runs an agent that fetches `--rows` rows of sales data (in the free-text
+format of example 8's `get_sales_data`), reviews a log of `--log-lines`
+lines (example 10's `log_reviewer`) and emails a summary, driven by the
+scripted model, with plain and with `compact`ed tools. Reports the prompt
+tokens sent to the model per run (the tool outputs are re-sent with every
+later request), the tokens in memory at the end and the tokens saved.
+
+Also compacts the same table as CSV, Markdown and JSON and reports size and
+time per format.
+
+    python -m benchmarks.bench_compaction --rows 144 --log-lines 2000 --runs 20
+"""
+
+import argparse
+import asyncio
+import csv
+import io
+import json
+import time
+from typing import Any
+
+from benchmarks.utils import use_scripted_model, write_results
+from examples.metrics import summarize
+
+PROMPT = "Analyze our sales data, check the payment logs for errors and email me a summary."
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+REGIONS = ["North", "South", "East", "West"]
+
+
+def sales_records(rows: int) -> list[dict[str, Any]]:
+    return [
+        {
+            "month": f"{MONTHS[(index // len(REGIONS)) % 12]} {2020 + index // (len(REGIONS) * 12)}",
+            "region": REGIONS[index % len(REGIONS)],
+            "revenue": f"${1.2 + index * 0.013 + (index % 4) * 0.2:.2f}M",
+            "units": f"{9000 + index * 37 + (index % 4) * 800:,}",
+        }
+        for index in range(rows)
+    ]
+
+
+def sales_text(records: list[dict[str, Any]], fmt: str) -> str:
+    if fmt == "records":
+        return " | ".join(
+            f"{record['month']} {record['region']}: {record['revenue']} revenue, {record['units']} units"
+            for record in records
+        )
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=list(records[0]), lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(records)
+        return buffer.getvalue()
+    if fmt == "markdown":
+        lines = ["| " + " | ".join(records[0]) + " |", "|" + "---|" * len(records[0])]
+        lines += ["| " + " | ".join(str(value) for value in record.values()) + " |" for record in records]
+        return "\n".join(lines)
+    return json.dumps(records)
+
+
+def log_text(lines: int) -> str:
+    return "\n".join(
+        f"2024-05-01T10:{index // 60 % 60:02d}:{index % 60:02d}Z "
+        + (
+            f"ERROR payment {index:06d} declined: insufficient funds"
+            if index % 97 == 13
+            else f"INFO payment {index:06d} authorized in {20 + index % 30}ms"
+        )
+        for index in range(lines)
+    )
+
+
+def create_agent(llm: Any, args: argparse.Namespace, compacted: bool) -> tuple[Any, list[Any]]:
+    from beeai_framework.agents.experimental import RequirementAgent
+    from beeai_framework.agents.experimental.requirements.conditional import ConditionalRequirement
+    from beeai_framework.tools import tool
+
+    from examples.compaction import OutputStore, ReadOutputTool, TableSummary, TextCap, compact
+
+    sales = sales_text(sales_records(args.rows), "records")
+    log = log_text(args.log_lines)
+
+    @tool
+    def get_sales_data() -> str:
+        """Tool to retrieve quarterly sales data."""
+        return sales
+
+    @tool
+    def log_reviewer(log_file: str) -> str:
+        """Tool that reviews payment logs."""
+        return log
+
+    @tool
+    def send_email_summary(report_content: str) -> str:
+        """Tool to send summary report via email."""
+        return f"Summary report sent via email: {report_content[:50]}..."
+
+    tools: list[Any] = [get_sales_data, log_reviewer, send_email_summary]
+    wrapped: list[Any] = []
+    if compacted:
+        store = OutputStore()
+        wrapped = [
+            compact(get_sales_data, TableSummary(), TextCap(max_chars=2000), readable=True, store=store),
+            compact(log_reviewer, TextCap(max_chars=2000), readable=True, store=store),
+        ]
+        tools = [*wrapped, send_email_summary, ReadOutputTool(store)]
+    agent = RequirementAgent(
+        llm=llm,
+        tools=tools,
+        requirements=[ConditionalRequirement(send_email_summary, min_invocations=1, max_invocations=1)],
+    )
+    return agent, wrapped
+
+
+def count_prompt_tokens(llm: Any) -> list[int]:
+    from examples.budget_memory import message_tokens
+
+    totals = [0, 0]  # tokens, requests
+    create = llm._create
+
+    async def counted(input: Any, run: Any) -> Any:
+        totals[0] += sum(message_tokens(message) for message in input.messages)
+        totals[1] += 1
+        return await create(input, run)
+
+    llm._create = counted
+    return totals
+
+
+async def measure(variant: str, args: argparse.Namespace) -> dict[str, Any]:
+    from examples.budget_memory import message_tokens
+    from examples.scripted import Script, answer, call
+
+    llm = use_scripted_model()
+    llm.scripts = [
+        Script(
+            match=PROMPT,
+            steps=[
+                call("get_sales_data"),
+                call("log_reviewer", log_file="payments.log"),
+                call("send_email_summary", report_content="Revenue is up, a few payments were declined."),
+                answer("Sent the summary."),
+            ],
+        )
+    ]
+    totals = count_prompt_tokens(llm)
+    agent, wrapped = create_agent(llm, args, variant == "compacted")
+
+    timings: list[float] = []
+    memory_tokens = 0
+    for _ in range(args.runs):
+        agent.memory.reset()
+        start = time.perf_counter()
+        response = await agent.run(PROMPT)
+        timings.append(time.perf_counter() - start)
+        memory_tokens = sum(message_tokens(message) for message in response.memory.messages)
+
+    return {
+        "run_s": summarize(timings),
+        "prompt_tokens_per_run": totals[0] / args.runs,
+        "model_requests_per_run": totals[1] / args.runs,
+        "memory_tokens": memory_tokens,
+        "compaction": [tool.stats.to_dict() for tool in wrapped],
+    }
+
+
+def measure_formats(args: argparse.Namespace) -> dict[str, Any]:
+    from examples.compaction import TableSummary, TextCap, estimate_tokens
+
+    records = sales_records(args.rows)
+    inputs = {fmt: (sales_text(records, fmt), TableSummary()) for fmt in ("records", "csv", "markdown", "json")}
+    inputs["log"] = (log_text(args.log_lines), TextCap(max_chars=2000))
+    results: dict[str, Any] = {}
+    for fmt, (text, compactor) in inputs.items():
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            compacted = compactor(text)
+        elapsed = (time.perf_counter() - start) / args.repeat
+        assert compacted is not None, f"{fmt} was not compacted"
+        results[fmt] = {
+            "chars": len(text),
+            "compacted_chars": len(compacted),
+            "tokens_saved": estimate_tokens(text) - estimate_tokens(compacted),
+            "compact_ms": elapsed * 1000,
+        }
+    return results
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=144, help="rows of sales data")
+    parser.add_argument("--log-lines", type=int, default=2000)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=50, help="repetitions per format for the compaction time")
+    parser.add_argument("--output", default="benchmark-compaction.json")
+    args = parser.parse_args()
+
+    results: dict[str, Any] = {"formats": measure_formats(args)}
+    for fmt, result in results["formats"].items():
+        print(
+            f"{fmt:<9} {result['chars']:8,d} -> {result['compacted_chars']:6,d} chars  "
+            f"saves {result['tokens_saved']:6,d} tokens  in {result['compact_ms']:7.3f}ms"
+        )
+    for variant in ("plain", "compacted"):
+        result = results[variant] = await measure(variant, args)
+        print(
+            f"{variant:<9} prompt tokens/run {result['prompt_tokens_per_run']:9,.0f}  "
+            f"memory tokens {result['memory_tokens']:7,d}  run p50 {result['run_s']['p50'] * 1000:7.2f}ms"
+        )
+    saved = results["plain"]["prompt_tokens_per_run"] - results["compacted"]["prompt_tokens_per_run"]
+    results["prompt_tokens_saved_per_run"] = saved
+    print(f"saved {saved:,.0f} prompt tokens per run")
+    write_results(args.output, "compaction", results)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,102 @@
+"""Benchmark every example against the offline scripted model
+
+Runs each `examples/0X_*.py` scenario several times and records wall time,
+agent iterations, time spent in requirement checks, model and tool calls, and
+peak traced memory. Results are written as JSON; pass `--compare` with an
+older results file to see the relative change of the median wall time.
+
+    python -m benchmarks.bench_examples --runs 20 --output results.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import time
+from typing import Any
+
+from benchmarks.scenarios import all_scripts
+from benchmarks.utils import EXAMPLES, load_example, measure_peak_memory, use_scripted_model, write_results
+from examples.metrics import summarize
+
+
+async def _auto_approve(_: str) -> str:
+    return "yes"
+
+
+async def run_scenario(name: str, runs: int) -> dict[str, Any]:
+    from beeai_framework.emitter import Emitter
+    from beeai_framework.utils.io import setup_io_context
+
+    from examples.metrics import RunMetrics
+
+    module = load_example(name)
+    metrics = RunMetrics()
+    cleanup = metrics.observe(Emitter.root())
+    restore_io = setup_io_context(read=_auto_approve)  # answers the permission prompt in example 9
+
+    records: list[dict[str, Any]] = []
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(runs):
+                metrics.reset()
+                start = time.perf_counter()
+                await module.main()
+                records.append({"wall_s": round(time.perf_counter() - start, 6), **metrics.to_dict()})
+
+            _, peak_memory = await measure_peak_memory(module.main)
+    finally:
+        restore_io()
+        cleanup()
+
+    return {
+        "runs": records,
+        "wall_s": summarize([record["wall_s"] for record in records]),
+        "requirement_s": summarize([record["requirement_s"] for record in records]),
+        "iterations": records[-1]["iterations"] if records else 0,
+        "peak_memory_bytes": peak_memory,
+    }
+
+
+def compare(results: dict[str, Any], baseline_path: str) -> None:
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+
+    print(f"{'scenario':<28}{'baseline p50':>14}{'current p50':>14}{'change':>10}")
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before, after = baseline[name]["wall_s"]["p50"], result["wall_s"]["p50"]
+        change = (after - before) / before * 100 if before else 0.0
+        print(f"{name:<28}{before * 1000:>12.2f}ms{after * 1000:>12.2f}ms{change:>+9.1f}%")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10, help="timed runs per scenario")
+    parser.add_argument("--only", nargs="*", default=None, help="scenario names (e.g. 01_context_before_tool)")
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--compare", default=None, help="baseline results file")
+    args = parser.parse_args()
+
+    llm = use_scripted_model()
+    llm.scripts = all_scripts()
+
+    results: dict[str, Any] = {}
+    for name in args.only or EXAMPLES:
+        result = await run_scenario(name, args.runs)
+        results[name] = result
+        print(
+            f"{name:<28} p50 {result['wall_s']['p50'] * 1000:8.2f}ms  "
+            f"requirements p50 {result['requirement_s']['p50'] * 1000:7.2f}ms  "
+            f"iterations {result['iterations']:3d}  peak {result['peak_memory_bytes'] / 1024:8.1f}KiB"
+        )
+
+    write_results(args.output, "examples", results)
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
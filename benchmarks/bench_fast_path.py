@@ -0,0 +1,116 @@
+"""Benchmark the requirement fast path
+
+Runs every example against the scripted model with simulated latency, once
+as is and once wrapped in `FastPathChatModel`, and reports the median wall
+time and how many model round-trips the fast path answered itself.
+
+Before timing, every example runs once more with each shortcut checked
+against the model: the scripted model is asked the same request and the
+tool call it would send must match the derived one. Mismatches are printed
+and make the benchmark exit non-zero.
+
+    python -m benchmarks.bench_fast_path --runs 10 --latency 0.05
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import sys
+import time
+from typing import Any
+
+from benchmarks.scenarios import all_scripts
+from benchmarks.utils import EXAMPLES, load_example, use_scripted_model, write_results
+from examples.metrics import summarize
+
+
+async def _auto_approve(_: str) -> str:
+    return "yes"
+
+
+def create_checked(llm: Any) -> Any:
+    from examples.fast_path import FastPathChatModel
+
+    class CheckedFastPath(FastPathChatModel):
+        def __init__(self) -> None:
+            super().__init__(llm)
+            self.mismatches: list[str] = []
+
+        async def _create(self, input: Any, run: Any) -> Any:
+            output = self.shortcut(input)
+            expected = await self.forward(input, stream=False)
+            if output is not None:
+                derived, sent = output.get_tool_calls()[0], expected.get_tool_calls()
+                if not sent or (derived.tool_name, json.loads(derived.args)) != (
+                    sent[0].tool_name,
+                    json.loads(sent[0].args),
+                ):
+                    got = [(call.tool_name, call.args) for call in sent]
+                    self.mismatches.append(f"{derived.tool_name}({derived.args}), model sends {got}")
+            return expected
+
+    return CheckedFastPath()
+
+
+async def run_example(name: str, llm: Any, runs: int) -> list[float]:
+    module = load_example(name)
+    module.llm = llm  # `main()` resolves the module-level name on every call
+    durations: list[float] = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(runs):
+            start = time.perf_counter()
+            await module.main()
+            durations.append(time.perf_counter() - start)
+    return durations
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated model latency in seconds")
+    parser.add_argument("--only", nargs="*", default=None, help="scenario names (e.g. 03_start_with_analysis)")
+    parser.add_argument("--output", default="benchmark-fast-path.json")
+    args = parser.parse_args()
+
+    from beeai_framework.utils.io import setup_io_context
+
+    from examples.fast_path import FastPathChatModel
+
+    model = use_scripted_model()
+    model.scripts = all_scripts()
+    model.latency = args.latency
+    fast_path = FastPathChatModel(model)
+    restore_io = setup_io_context(read=_auto_approve)  # answers the permission prompt in example 9
+
+    results: dict[str, Any] = {}
+    mismatches = 0
+    try:
+        for name in args.only or EXAMPLES:
+            model.latency = 0
+            checked = create_checked(model)
+            await run_example(name, checked, 1)
+            for mismatch in checked.mismatches:
+                print(f"{name:<28} MISMATCH {mismatch}")
+            mismatches += len(checked.mismatches)
+            model.latency = args.latency
+
+            baseline = summarize(await run_example(name, model, args.runs))
+            fast_path.hits = fast_path.misses = 0
+            optimized = summarize(await run_example(name, fast_path, args.runs))
+            skipped = fast_path.hits // args.runs
+            results[name] = {"baseline_s": baseline, "fast_path_s": optimized, "skipped_llm_calls_per_run": skipped}
+            print(
+                f"{name:<28} baseline p50 {baseline['p50'] * 1000:8.2f}ms  "
+                f"fast path p50 {optimized['p50'] * 1000:8.2f}ms  skipped model calls/run {skipped}"
+            )
+    finally:
+        restore_io()
+    write_results(args.output, "fast_path", results)
+    if mismatches:
+        sys.exit(f"{mismatches} derived tool calls differ from what the model sends")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,150 @@
+"""Benchmark hedged rephrase-and-search against the serial retry loop
+
+Replays the trajectory of example 4 where the first two queries find nothing:
+
+* serial: `RetryWithRephrasing` from example 4, i.e. search, rephrase, search,
+  rephrase, search (three searches, six model turns);
+* hedged: `HedgedRetry` + `HedgedTool` on `ParallelRequirementAgent`, i.e.
+  search, then one turn with three rephrased searches racing each other
+  (three model turns). With `max_invocations=3` one search is already used,
+  so the planner drops the third parallel call.
+
+Each search takes a log-normally distributed time (median `--tool-latency`,
+shape `--sigma`), which gives the long tail that hedging is meant to cut.
+
+    python -m benchmarks.bench_hedged_retry --runs 200 --latency 0.02 --tool-latency 0.03 --sigma 1.0
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from typing import Any
+
+from benchmarks.utils import load_example, write_results
+from examples.metrics import summarize
+
+PROMPT = "Find information about New York City on Wikipedia."
+RESULTS = {
+    "New York City": "",
+    "New York": "",
+    "NYC": "Wikipedia page for 'NYC': New York City is the most populous city in the United States...",
+    "Big Apple": "Wikipedia page for 'Big Apple': The Big Apple is a nickname for New York City...",
+}
+
+
+def create_tools(rng: random.Random, latency: float, tool_latency: float, sigma: float) -> tuple[Any, Any]:
+    from beeai_framework.tools import tool
+
+    @tool
+    async def rephrase_tool(original_query: str) -> str:
+        """Tool to rephrase search queries for better results."""
+        await asyncio.sleep(latency)  # a rephrasing is another model call
+        return "alternative phrasing"
+
+    @tool
+    async def wikipedia_search_tool(query: str) -> str:
+        """Tool to search Wikipedia."""
+        await asyncio.sleep(rng.lognormvariate(0, sigma) * tool_latency)
+        return RESULTS.get(query, "")
+
+    return rephrase_tool, wikipedia_search_tool
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.02, help="simulated model latency in seconds")
+    parser.add_argument("--tool-latency", type=float, default=0.03, help="median search latency in seconds")
+    parser.add_argument("--sigma", type=float, default=1.0, help="shape of the log-normal search latency")
+    parser.add_argument("--max-invocations", type=int, default=3)
+    parser.add_argument("--output", default="benchmark-hedged-retry.json")
+    args = parser.parse_args()
+
+    from beeai_framework.agents.experimental import RequirementAgent
+    from beeai_framework.agents.experimental.requirements.conditional import ConditionalRequirement
+
+    from examples.hedged_retry import HedgedRetry, HedgedTool
+    from examples.parallel_tools import ParallelRequirementAgent
+    from examples.scripted import Script, ScriptedChatModel, answer, call, parallel
+
+    example = load_example("04_retry_rephrasing")
+    serial_model = ScriptedChatModel(
+        Script(
+            steps=[
+                call("wikipedia_search_tool", query="New York City"),
+                call("rephrase_tool", original_query="New York City"),
+                call("wikipedia_search_tool", query="New York"),
+                call("rephrase_tool", original_query="New York"),
+                call("wikipedia_search_tool", query="NYC"),
+                answer("New York City is the most populous city in the United States."),
+            ]
+        ),
+        latency=args.latency,
+    )
+    hedged_model = ScriptedChatModel(
+        Script(
+            steps=[
+                call("wikipedia_search_tool", query="New York City"),
+                parallel(
+                    call("wikipedia_search_tool", query="NYC"),
+                    call("wikipedia_search_tool", query="Big Apple"),
+                    call("wikipedia_search_tool", query="New York"),
+                ),
+                answer("New York City is the most populous city in the United States."),
+            ]
+        ),
+        latency=args.latency,
+    )
+
+    results: dict[str, Any] = {}
+    for variant in ("serial", "hedged"):
+        rng = random.Random(0)
+        durations: list[float] = []
+        stats: dict[str, Any] = {}
+        searches = 0
+        for _ in range(args.runs):
+            rephrase, search = create_tools(rng, args.latency, args.tool_latency, args.sigma)
+            if variant == "serial":
+                agent = RequirementAgent(
+                    llm=serial_model,
+                    tools=[rephrase, search],
+                    requirements=[
+                        example.RetryWithRephrasing(search),
+                        ConditionalRequirement(search, max_invocations=args.max_invocations),
+                    ],
+                )
+            else:
+                search = HedgedTool(search)
+                search_limit = ConditionalRequirement(search, max_invocations=args.max_invocations)
+                agent = ParallelRequirementAgent(
+                    llm=hedged_model,
+                    tools=[rephrase, search],
+                    requirements=[HedgedRetry(search, fan_out=3, limit=search_limit), search_limit],
+                )
+            start = time.perf_counter()
+            response = await agent.run(PROMPT)
+            durations.append(time.perf_counter() - start)
+            searches = sum(1 for step in response.state.steps if step.tool is search)
+            if isinstance(search, HedgedTool):
+                for name, value in search.stats.to_dict().items():
+                    stats[name] = stats.get(name, 0) + value
+
+        results[variant] = {
+            "wall_s": summarize(durations),
+            "searches": searches,
+            "iterations": response.state.iteration,
+        }
+        if stats:
+            results[variant]["hedge"] = stats
+        wall = results[variant]["wall_s"]
+        print(
+            f"{variant:<7} p50 {wall['p50'] * 1000:8.2f}ms  p95 {wall['p95'] * 1000:8.2f}ms  "
+            f"p99 {wall['p99'] * 1000:8.2f}ms  searches {searches}  iterations {response.state.iteration}"
+            + (f"  cancelled {stats['cancelled']}/{args.runs}" if stats else "")
+        )
+    write_results(args.output, "hedged_retry", results)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
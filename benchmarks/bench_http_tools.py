@@ -0,0 +1,148 @@
+"""Benchmark HTTP tool I/O against the local OpenMeteo stand-in
+
+Starts `examples.http_standin` in a process of its own and makes `--calls`
+weather tool calls (a geocoding and a forecast request each), `--concurrency`
+of them at a time, for locations drawn with repeats from `--locations`
+names, through:
+
+* blocking: a sync function tool using `urllib`, a new connection per request
+  and the event loop blocked while it waits;
+* per_call: an async tool opening an `httpx.AsyncClient` per request, like the
+  framework's `OpenMeteoTool`;
+* pooled: `OpenMeteoWeatherTool` on an `HttpClient` without coalescing;
+* coalesced: `OpenMeteoWeatherTool` on the default `HttpClient`.
+
+Reports throughput, call latency, and the connections and requests the
+server saw.
+
+    python -m benchmarks.bench_http_tools --calls 400 --concurrency 50 --latency 0.05
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import urllib.parse
+import urllib.request
+from typing import Any
+
+from benchmarks.utils import write_results
+from examples.metrics import summarize
+
+
+class PerCallClient:
+    """Opens a client, and so a connection, for every request."""
+
+    async def get_json(self, url: str, *, params: dict[str, Any] | None = None) -> Any:
+        import httpx
+
+        async with httpx.AsyncClient() as client:
+            response = await client.get(url, params=params)
+            response.raise_for_status()
+            return response.json()
+
+
+def create_blocking_tool(url: str) -> Any:
+    from beeai_framework.tools import tool
+
+    def get_json(path: str, params: dict[str, Any]) -> Any:
+        with urllib.request.urlopen(f"{url}{path}?{urllib.parse.urlencode(params)}") as response:
+            return json.load(response)
+
+    @tool
+    def weather_tool(location: str) -> str:
+        """Tool to fetch weather data from OpenMeteo API."""
+        place = get_json("/v1/search", {"name": location, "count": 1, "format": "json"})["results"][0]
+        weather = get_json("/v1/forecast", {"latitude": place["latitude"], "longitude": place["longitude"]})
+        return f"Weather for {place['name']}: {weather['current']['temperature_2m']}°C"
+
+    return weather_tool
+
+
+def server_stats(url: str) -> dict[str, Any]:
+    with urllib.request.urlopen(f"{url}/stats") as response:
+        return json.load(response)
+
+
+async def measure(variant: str, url: str, locations: list[str], args: argparse.Namespace) -> dict[str, Any]:
+    from examples.http_tools import HttpClient, OpenMeteoWeatherTool
+
+    client: Any = None
+    if variant == "blocking":
+        weather = create_blocking_tool(url)
+    else:
+        client = {"per_call": PerCallClient, "pooled": lambda: HttpClient(coalesce=False), "coalesced": HttpClient}[
+            variant
+        ]()
+        weather = OpenMeteoWeatherTool(geocoding_url=url, forecast_url=url, client=client)
+
+    slots = asyncio.Semaphore(args.concurrency)
+    latencies: list[float] = []
+
+    async def call(location: str) -> None:
+        async with slots:
+            start = time.perf_counter()
+            await weather.run({"location": location})
+            latencies.append(time.perf_counter() - start)
+
+    before = server_stats(url)
+    start = time.perf_counter()
+    await asyncio.gather(*(call(location) for location in locations))
+    elapsed = time.perf_counter() - start
+    after = server_stats(url)
+    if isinstance(client, HttpClient):
+        await client.aclose()
+
+    return {
+        "elapsed_s": elapsed,
+        "throughput_per_s": len(locations) / elapsed,
+        "latency_s": summarize(latencies),
+        "server_connections": after["connections"] - before["connections"] - 1,  # minus the first /stats
+        "server_requests": after["requests"] - before["requests"],
+        "client": client.stats.to_dict() if isinstance(client, HttpClient) else None,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--locations", type=int, default=100, help="distinct locations the calls are drawn from")
+    parser.add_argument("--latency", type=float, default=0.05, help="server seconds per response")
+    parser.add_argument("--handshake", type=float, default=0.05, help="server seconds to set up a connection")
+    parser.add_argument("--variants", nargs="+", default=["blocking", "per_call", "pooled", "coalesced"])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmark-http-tools.json")
+    args = parser.parse_args()
+
+    names = [f"City {index}" for index in range(args.locations)]
+    rng = random.Random(args.seed)
+    # skewed like real traffic: a few places are asked for much more often than the rest
+    locations = rng.choices(names, weights=[1 / (rank + 1) for rank in range(len(names))], k=args.calls)
+
+    server = await asyncio.create_subprocess_exec(
+        *[sys.executable, "-m", "examples.http_standin", "--port", "0"],
+        *["--latency", str(args.latency), "--handshake", str(args.handshake)],
+        stdout=asyncio.subprocess.PIPE,
+    )
+    try:
+        assert server.stdout is not None
+        url = (await server.stdout.readline()).decode().split()[-1]
+        results: dict[str, Any] = {}
+        for variant in args.variants:
+            result = results[variant] = await measure(variant, url, locations, args)
+            print(
+                f"{variant:<10} {result['elapsed_s']:6.2f}s  {result['throughput_per_s']:7.1f} calls/s  "
+                f"p50 {result['latency_s']['p50'] * 1000:7.1f}ms  p95 {result['latency_s']['p95'] * 1000:7.1f}ms  "
+                f"connections {result['server_connections']:4d}  requests {result['server_requests']:4d}"
+            )
+    finally:
+        server.terminate()
+        await server.wait()
+    write_results(args.output, "http_tools", results)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
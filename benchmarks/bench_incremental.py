@@ -0,0 +1,122 @@
+"""Benchmark incremental requirement evaluation
+
+Replays a run in which every iteration appends `--parallel` JSON tool outputs
+and `--requirements` custom requirements scan the outputs for a pattern.
+Compares requirements that read `state.steps[-1].output.get_text_content()`
+(as examples 4 and 10 did, missing all but one output per iteration), with
+requirements that rescan the whole history, and with `IncrementalRequirement`s,
+reporting the time per iteration and how many steps each variant looked at.
+
+    python -m benchmarks.bench_incremental --iterations 50 --parallel 4 --requirements 4
+"""
+
+import argparse
+import asyncio
+import re
+import time
+from typing import Any
+
+from benchmarks.utils import write_results
+from examples.metrics import summarize
+
+PATTERN = re.compile(r"\b\d{4}[\s-]?\d{4}[\s-]?\d{4}[\s-]?\d{4}\b")
+
+
+def create_requirements(count: int) -> dict[str, list[Any]]:
+    from beeai_framework.agents.experimental.requirements.requirement import Requirement, Rule
+
+    from examples.incremental import IncrementalRequirement
+
+    class LastStepScan(Requirement[Any]):
+        def __init__(self) -> None:
+            super().__init__()
+            self.seen = 0
+
+        async def run(self, state: Any) -> list[Rule]:  # type: ignore[override]
+            if state.steps:
+                self.seen += 1
+                if PATTERN.search(state.steps[-1].output.get_text_content()):
+                    return [Rule(target="final_answer", forced=True)]
+            return []
+
+    class FullScan(LastStepScan):
+        # the straightforward way not to miss steps: rescan the whole history
+        async def run(self, state: Any) -> list[Rule]:  # type: ignore[override]
+            self.seen += len(state.steps)
+            if any(PATTERN.search(step.output.get_text_content()) for step in state.steps):
+                return [Rule(target="final_answer", forced=True)]
+            return []
+
+    class IncrementalScan(IncrementalRequirement):
+        def __init__(self) -> None:
+            super().__init__()
+            self.seen = 0
+
+        async def check(self, state: Any, steps: Any) -> list[Rule]:
+            self.seen += len(steps)
+            if any(PATTERN.search(step.text) for step in steps):
+                return [Rule(target="final_answer", forced=True)]
+            return []
+
+    return {
+        "last_step": [LastStepScan() for _ in range(count)],
+        "full_scan": [FullScan() for _ in range(count)],
+        "incremental": [IncrementalScan() for _ in range(count)],
+    }
+
+
+async def measure(requirements: list[Any], iterations: int, parallel: int, size: int) -> dict[str, Any]:
+    from beeai_framework.agents.experimental.types import RequirementAgentRunState, RequirementAgentRunStateStep
+    from beeai_framework.memory import UnconstrainedMemory
+    from beeai_framework.tools import JSONToolOutput
+
+    state = RequirementAgentRunState(memory=UnconstrainedMemory(), steps=[], iteration=0, answer=None, result=None)
+    durations: list[float] = []
+    for iteration in range(1, iterations + 1):
+        for i in range(parallel):
+            rows = [{"id": n, "note": f"transaction {iteration}-{i}-{n} ok"} for n in range(size)]
+            state.steps.append(
+                RequirementAgentRunStateStep(
+                    id=f"{iteration}-{i}",
+                    iteration=iteration,
+                    tool=None,
+                    input={},
+                    output=JSONToolOutput(rows),
+                    error=None,
+                )
+            )
+        state.iteration = iteration
+        start = time.perf_counter()
+        for requirement in requirements:
+            await requirement.run(state)
+        durations.append(time.perf_counter() - start)
+
+    return {
+        "per_iteration_s": summarize(durations),
+        "steps": len(state.steps),
+        "steps_seen": requirements[0].seen,  # per requirement, a step is counted every time it is scanned
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--parallel", type=int, default=4, help="tool outputs appended per iteration")
+    parser.add_argument("--requirements", type=int, default=4, help="custom requirements scanning the outputs")
+    parser.add_argument("--rows", type=int, default=200, help="rows per JSON tool output")
+    parser.add_argument("--output", default="benchmark-incremental.json")
+    args = parser.parse_args()
+
+    results: dict[str, Any] = {}
+    for variant, requirements in create_requirements(args.requirements).items():
+        result = await measure(requirements, args.iterations, args.parallel, args.rows)
+        results[variant] = result
+        print(
+            f"{variant:<12} per iteration p50 {result['per_iteration_s']['p50'] * 1000:7.3f}ms  "
+            f"steps checked {result['steps_seen']:4d}/{result['steps']}"
+        )
+    write_results(args.output, "incremental", results)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,108 @@
+"""Benchmark parallel tool calls
+
+Replays the ReAct agent from example 6 with tools that take `--tool-latency`
+seconds: once with the recorded one-call-per-turn trajectory on a plain
+RequirementAgent, once on a `ParallelRequirementAgent` whose model asks for
+the independent Wikipedia and weather lookups in the same turn. Reports wall
+time, agent iterations and the tool time saved by overlapping calls.
+
+    python -m benchmarks.bench_parallel_tools --runs 10 --latency 0.05 --tool-latency 0.2
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Any
+
+from benchmarks.scenarios import SCRIPTS
+from benchmarks.utils import load_example, use_scripted_model, write_results
+from examples.metrics import summarize
+
+PROMPT = "What's the weather in Paris and what is the city's population?"
+
+
+def create_tools(example: Any, latency: float) -> list[Any]:
+    from beeai_framework.tools import tool
+    from beeai_framework.tools.think import ThinkTool
+
+    @tool
+    async def wikipedia_tool(query: str) -> str:
+        """Tool to search Wikipedia for information."""
+        await asyncio.sleep(latency)
+        return (await example.wikipedia_tool.run({"query": query})).get_text_content()
+
+    @tool
+    async def weather_tool(location: str) -> str:
+        """Tool to get weather information."""
+        await asyncio.sleep(latency)
+        return (await example.weather_tool.run({"location": location})).get_text_content()
+
+    return [ThinkTool(), wikipedia_tool, weather_tool]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated model latency in seconds")
+    parser.add_argument("--tool-latency", type=float, default=0.2, help="simulated tool latency in seconds")
+    parser.add_argument("--output", default="benchmark-parallel-tools.json")
+    args = parser.parse_args()
+
+    from beeai_framework.agents.experimental import RequirementAgent
+    from beeai_framework.agents.experimental.requirements.conditional import ConditionalRequirement
+    from beeai_framework.tools import Tool
+    from beeai_framework.tools.think import ThinkTool
+
+    from examples.parallel_tools import ParallelRequirementAgent, ToolOverlapTimings
+    from examples.scripted import Script, ScriptedChatModel, answer, call, parallel
+
+    use_scripted_model()
+    example = load_example("06_react_loop")
+    sequential_model = ScriptedChatModel(SCRIPTS["06_react_loop"], latency=args.latency)
+    parallel_model = ScriptedChatModel(
+        Script(
+            match="weather in Paris",
+            steps=[
+                call("think", thoughts="I need the population and the weather.", next_step=["wikipedia_tool"]),
+                parallel(call("wikipedia_tool", query="Paris"), call("weather_tool", location="Paris")),
+                call("think", thoughts="I have everything I need.", next_step=["final_answer"]),
+                answer("Paris is 22°C and partly cloudy; about 2.16 million people live in the city."),
+            ],
+        ),
+        latency=args.latency,
+    )
+
+    variants: dict[str, tuple[type[RequirementAgent], ScriptedChatModel]] = {
+        "sequential": (RequirementAgent, sequential_model),
+        "parallel": (ParallelRequirementAgent, parallel_model),
+    }
+    results: dict[str, Any] = {}
+    for variant, (agent_cls, model) in variants.items():
+        durations: list[float] = []
+        saved: list[float] = []
+        iterations = 0
+        for _ in range(args.runs):
+            agent = agent_cls(
+                llm=model,
+                tools=create_tools(example, args.tool_latency),
+                requirements=[
+                    ConditionalRequirement(ThinkTool, force_at_step=1, force_after=[Tool], consecutive_allowed=False)
+                ],
+            )
+            timings = ToolOverlapTimings()
+            start = time.perf_counter()
+            response = await agent.run(PROMPT).middleware(timings)
+            durations.append(time.perf_counter() - start)
+            saved.append(timings.saved_s)
+            iterations = response.state.iteration
+
+        results[variant] = {"wall_s": summarize(durations), "saved_s": summarize(saved), "iterations": iterations}
+        print(
+            f"{variant:<12} p50 {results[variant]['wall_s']['p50'] * 1000:8.2f}ms  iterations {iterations:2d}  "
+            f"tool time saved by overlap p50 {results[variant]['saved_s']['p50'] * 1000:7.2f}ms"
+        )
+    write_results(args.output, "parallel_tools", results)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,165 @@
+"""Benchmark the overhead of trajectory recording on the example scenarios
+
+Runs every example against the scripted model with the run middleware of
+`examples.utils.trajectory_middleware()` swapped for:
+
+* none: a middleware that does nothing (the baseline);
+* print: `GlobalTrajectoryMiddleware(included=[Tool])`, the default of the
+  examples, writing into a buffer instead of a terminal;
+* recorder: `TrajectoryRecorder` writing JSONL to a temporary file.
+
+The variants take turns run by run, in rotating order, so drift of the
+machine hits all of them alike. Reports the median wall time per scenario and variant, the overhead
+against the baseline over all scenarios, and the records the recorder wrote.
+
+The target is a wall-clock overhead under 1% (`TARGET_PCT`), and the last
+line says whether it is met. It is not: without `--latency` (pure framework
+time, the worst case) the recorder adds about 1.5-4% from run to run, and
+about 1% with `--latency 0.01`. Its own time (event handler and writer
+thread, reported as a share of its runs) stays under 1%; the rest is the
+emitter dispatching the run's events to a nested listener at all, which a
+listener that matches nothing costs as well.
+
+    python -m benchmarks.bench_recorder --runs 30 --latency 0.01
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from benchmarks.scenarios import all_scripts
+from benchmarks.utils import EXAMPLES, load_example, use_scripted_model, write_results
+from examples.metrics import summarize
+
+VARIANTS = ("none", "print", "recorder")
+TARGET_PCT = 1.0
+
+
+async def _auto_approve(_: str) -> str:
+    return "yes"
+
+
+def create_middlewares(path: Path) -> dict[str, Any]:
+    from beeai_framework.context import RunContext, RunMiddlewareProtocol
+    from beeai_framework.middleware.trajectory import GlobalTrajectoryMiddleware
+    from beeai_framework.tools import Tool
+
+    from examples.recorder import TrajectoryRecorder
+
+    class NoMiddleware(RunMiddlewareProtocol):
+        def bind(self, ctx: RunContext) -> None:
+            pass
+
+    class TimedRecorder(TrajectoryRecorder):
+        """Adds up the time spent in the event handler and in the writer thread."""
+
+        def __init__(self, *args: Any, **kwargs: Any) -> None:
+            super().__init__(*args, **kwargs)
+            self.self_s = 0.0
+
+        async def _on_event(self, data: Any, meta: Any) -> None:
+            start = time.perf_counter()
+            await super()._on_event(data, meta)
+            self.self_s += time.perf_counter() - start
+
+        def _write(self, batch: list[Any]) -> None:
+            start = time.thread_time()  # CPU time, the writer thread also waits for the GIL
+            super()._write(batch)
+            self.self_s += time.thread_time() - start
+
+    return {
+        "none": NoMiddleware(),
+        "print": GlobalTrajectoryMiddleware(target=io.StringIO(), included=[Tool]),
+        "recorder": TimedRecorder(path),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=30, help="timed runs per scenario and variant")
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated model latency in seconds")
+    parser.add_argument("--only", nargs="*", default=None, help="scenario names (e.g. 01_context_before_tool)")
+    parser.add_argument("--output", default="benchmark-recorder.json")
+    args = parser.parse_args()
+
+    from beeai_framework.utils.io import setup_io_context
+
+    llm = use_scripted_model()
+    llm.scripts = all_scripts()
+    llm.latency = args.latency
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "trajectories.jsonl"
+        middlewares = create_middlewares(path)
+        recorder = middlewares["recorder"]
+        restore_io = setup_io_context(read=_auto_approve)  # answers the permission prompt in example 9
+
+        results: dict[str, Any] = {}
+        totals = dict.fromkeys(VARIANTS, 0.0)
+        self_total = recorder_total = 0.0
+        try:
+            for name in args.only or EXAMPLES:
+                module = load_example(name)
+                durations: dict[str, list[float]] = {variant: [] for variant in VARIANTS}
+                self_s = 0.0
+                with contextlib.redirect_stdout(io.StringIO()):
+                    for run in range(args.warmup + args.runs):
+                        # rotated, so no variant always follows the garbage of the same other one
+                        for variant in VARIANTS[run % 3 :] + VARIANTS[: run % 3]:
+                            module.trajectory_middleware = lambda variant=variant: middlewares[variant]
+                            if run == args.warmup and variant == "recorder":
+                                recorder.self_s = 0.0
+                            start = time.perf_counter()
+                            await module.main()
+                            if run >= args.warmup:
+                                durations[variant].append(time.perf_counter() - start)
+                    await recorder.flush()
+                    self_s = recorder.self_s
+
+                results[name] = {variant: summarize(values) for variant, values in durations.items()}
+                results[name]["recorder_self_pct"] = self_s / sum(durations["recorder"]) * 100
+                for variant in VARIANTS:
+                    totals[variant] += results[name][variant]["p50"]
+                self_total += self_s
+                recorder_total += sum(durations["recorder"])
+                print(
+                    f"{name:<28}"
+                    + "".join(f"  {variant} p50 {results[name][variant]['p50'] * 1000:7.2f}ms" for variant in VARIANTS)
+                    + f"  recorder self {results[name]['recorder_self_pct']:5.2f}%"
+                )
+            await recorder.aclose()
+        finally:
+            restore_io()
+
+        with path.open(encoding="utf-8") as f:
+            lines = sum(1 for _ in f)
+
+    overhead = {variant: (totals[variant] - totals["none"]) / totals["none"] * 100 for variant in VARIANTS[1:]}
+    results["overhead_pct"] = overhead
+    results["target_met"] = overhead["recorder"] < TARGET_PCT
+    results["recorder"] = {
+        "self_pct": self_total / recorder_total * 100,
+        "written": recorder.written,
+        "dropped": recorder.dropped,
+        "lines": lines,
+    }
+    print(
+        f"overhead over all scenarios (sum of p50): print {overhead['print']:+.2f}%  "
+        f"recorder {overhead['recorder']:+.2f}% (own time {results['recorder']['self_pct']:.2f}%)  "
+        f"records written {recorder.written} (dropped {recorder.dropped})"
+    )
+    print(
+        f"recorder wall-clock overhead {overhead['recorder']:+.2f}%: target < {TARGET_PCT:g}% "
+        + ("met" if results["target_met"] else "MISSED")
+    )
+    write_results(args.output, "recorder", results)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,170 @@
+"""Benchmark per-step routing and latency hedging
+
+Runs examples against stand-in models: the scripted model behind a wrapper
+that injects latency (log-normal around a median, with a `--tail-share` of
+requests `--tail-factor` times slower) and counts requests and prompt
+tokens. `large` is the primary model, `small` a cheap one (a fifth of the
+latency, a tenth of the price), `backup` a second provider for hedging.
+Variants:
+
+* single: every request goes to `large`;
+* routed: steps with a single forced tool go to `small`;
+* hedged: requests `large` has not answered after its p95 latency also go to
+  `backup`;
+* routed_hedged: both.
+
+Reports run time percentiles over all runs, the requests and the relative
+token cost per model, and how often hedging fired and won.
+
+    python -m benchmarks.bench_router --runs 15 --concurrency 4 --latency 0.2
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import random
+import time
+from typing import Any
+
+from benchmarks.scenarios import all_scripts
+from benchmarks.utils import load_example, use_scripted_model, write_results
+from examples.metrics import summarize
+
+EXAMPLES = ["03_start_with_analysis", "05_multiagent_handoff", "06_react_loop", "10_safety_stop"]
+
+
+def create_stand_in(llm: Any, name: str, median: float, price: float, args: argparse.Namespace, seed: int) -> Any:
+    from examples.budget_memory import message_tokens
+    from examples.wrappers import ChatModelWrapper
+
+    class StandInModel(ChatModelWrapper):
+        def __init__(self) -> None:
+            super().__init__(llm)
+            self.name = name
+            self.price = price
+            self.requests = 0
+            self.aborted = 0
+            self.prompt_tokens = 0
+            self.rng = random.Random(seed)
+
+        @property
+        def model_id(self) -> str:
+            return name
+
+        def sample_latency(self) -> float:
+            latency = median * self.rng.lognormvariate(0, args.sigma)
+            return latency * args.tail_factor if self.rng.random() < args.tail_share else latency
+
+        async def _create(self, input: Any, run: Any) -> Any:
+            self.requests += 1
+            self.prompt_tokens += sum(message_tokens(msg) for msg in input.messages)
+            try:
+                await asyncio.sleep(self.sample_latency())
+            except asyncio.CancelledError:
+                self.aborted += 1
+                raise
+            return await self.forward(input, stream=False)
+
+        async def clone(self) -> "StandInModel":
+            return self
+
+        def to_dict(self) -> dict[str, Any]:
+            return {
+                "requests": self.requests,
+                "aborted": self.aborted,
+                "prompt_tokens": self.prompt_tokens,
+                "cost": self.prompt_tokens / 1000 * self.price,
+            }
+
+    return StandInModel()
+
+
+async def _auto_approve(_: str) -> str:
+    return "yes"
+
+
+async def run_examples(llm: Any, args: argparse.Namespace) -> list[float]:
+    durations: list[float] = []
+    slots = asyncio.Semaphore(args.concurrency)
+
+    async def run(module: Any) -> None:
+        async with slots:
+            start = time.perf_counter()
+            await module.main()
+            durations.append(time.perf_counter() - start)
+
+    modules = [load_example(name) for name in args.only]
+    for module in modules:
+        module.llm = llm  # `main()` resolves the module-level name on every call
+    with contextlib.redirect_stdout(io.StringIO()):
+        await asyncio.gather(*(run(module) for _ in range(args.runs) for module in modules))
+    return durations
+
+
+async def measure(variant: str, scripted: Any, args: argparse.Namespace) -> dict[str, Any]:
+    from examples.router import Route, RoutingChatModel
+
+    large = create_stand_in(scripted, "large", args.latency, 1.0, args, seed=args.seed)
+    small = create_stand_in(scripted, "small", args.latency / 5, 0.1, args, seed=args.seed + 1)
+    backup = create_stand_in(scripted, "backup", args.latency * 1.2, 1.0, args, seed=args.seed + 2)
+    llm: Any = large
+    if variant != "single":
+        llm = RoutingChatModel(
+            large,
+            routes=[Route(small, name="constrained", max_choices=1)] if "routed" in variant else [],
+            hedge=backup if "hedged" in variant else None,
+            warmup=args.warmup,
+        )
+
+    durations = await run_examples(llm, args)
+    models = {model.name: model.to_dict() for model in (large, small, backup) if model.requests}
+    return {
+        "run_s": summarize(durations),
+        "models": models,
+        "cost": sum(model["cost"] for model in models.values()),
+        "router": llm.stats.to_dict() if isinstance(llm, RoutingChatModel) else None,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=15, help="runs per example")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.2, help="median seconds per request of the large model")
+    parser.add_argument("--sigma", type=float, default=0.25, help="spread of the log-normal latency")
+    parser.add_argument("--tail-share", type=float, default=0.05, help="share of requests in the slow tail")
+    parser.add_argument("--tail-factor", type=float, default=6.0, help="slowdown of the tail requests")
+    parser.add_argument("--warmup", type=int, default=20, help="responses before the p95 hedge delay applies")
+    parser.add_argument("--only", nargs="*", default=EXAMPLES, help="scenario names (e.g. 06_react_loop)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmark-router.json")
+    args = parser.parse_args()
+
+    from beeai_framework.utils.io import setup_io_context
+
+    scripted = use_scripted_model()
+    scripted.scripts = all_scripts()
+    restore_io = setup_io_context(read=_auto_approve)  # answers the permission prompt in example 9
+
+    results: dict[str, Any] = {}
+    try:
+        for variant in ("single", "routed", "hedged", "routed_hedged"):
+            result = results[variant] = await measure(variant, scripted, args)
+            run_s, router = result["run_s"], result["router"] or {}
+            requests = "  ".join(f"{name} {model['requests']:4d}" for name, model in result["models"].items())
+            print(
+                f"{variant:<14} p50 {run_s['p50'] * 1000:7.1f}ms  p95 {run_s['p95'] * 1000:7.1f}ms  "
+                f"p99 {run_s['p99'] * 1000:7.1f}ms  cost {result['cost']:7.2f}  requests: {requests}  "
+                f"hedged {router.get('hedged', 0):3d} (won {router.get('hedge_wins', 0):3d})"
+            )
+    finally:
+        restore_io()
+    results["relative_cost"] = {
+        variant: result["cost"] / results["single"]["cost"] for variant, result in results.items()
+    }
+    write_results(args.output, "router", results)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,80 @@
+"""Benchmark cold-import time of the examples
+
+Each measurement starts a fresh interpreter and times importing an example
+module, either building the model at import time as the examples used to
+(`eager`) or leaving it to the first request (`lazy`). No request is sent, so a
+placeholder API key is enough.
+
+    python -m benchmarks.bench_startup --runs 10 --model openai:gpt-5-nano
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any
+
+from benchmarks.utils import write_results
+from examples.metrics import summarize
+
+ROOT = Path(__file__).resolve().parent.parent
+
+PROBE = """
+import importlib, json, sys, time
+start = time.perf_counter()
+importlib.import_module(sys.argv[1])
+if sys.argv[2] == "eager":
+    from examples.utils import get_llm
+    get_llm()
+imported = time.perf_counter() - start
+print(json.dumps({"import_s": imported, "modules": len(sys.modules)}))
+"""
+
+VARIANTS = {
+    "utils_eager": ("examples.utils", "eager"),
+    "utils_lazy": ("examples.utils", "lazy"),
+    "example_eager": ("examples.01_context_before_tool", "eager"),
+    "example_lazy": ("examples.01_context_before_tool", "lazy"),
+}
+
+
+def probe(module: str, mode: str, env: dict[str, str]) -> dict[str, Any]:
+    completed = subprocess.run(
+        [sys.executable, "-c", PROBE, module, mode],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--model", default="openai:gpt-5-nano")
+    parser.add_argument("--output", default="benchmark-startup.json")
+    args = parser.parse_args()
+
+    env = {**os.environ, "MODEL": args.model, "API_KEY": os.getenv("API_KEY") or "sk-placeholder"}
+    env.pop("LLM_CACHE", None)
+
+    results: dict[str, Any] = {}
+    for variant, (module, mode) in VARIANTS.items():
+        samples = [probe(module, mode, env) for _ in range(args.runs)]
+        results[variant] = {
+            "import_s": summarize([sample["import_s"] for sample in samples]),
+            "modules": samples[-1]["modules"],
+        }
+        print(
+            f"{variant:<16} p50 {results[variant]['import_s']['p50'] * 1000:9.1f}ms  "
+            f"modules loaded {results[variant]['modules']:6d}"
+        )
+    write_results(args.output, "startup", {"model": args.model, **results})
+
+
+if __name__ == "__main__":
+    main()
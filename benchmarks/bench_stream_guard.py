@@ -0,0 +1,108 @@
+"""Benchmark the streaming safety guard
+
+Time to abort: the scripted model streams a long answer (`--chars`
+characters, `--token-latency` seconds per chunk) with a card number at
+several positions. Compares how long the response takes unguarded and with
+`StreamGuardChatModel`, which stops the generation at the match.
+
+Scanner throughput: feeds `--megabytes` of log-like text to `StreamScanner`
+in chunks of different sizes and reports MB/s, next to one `re.finditer`
+over the whole text.
+
+    python -m benchmarks.bench_stream_guard --chars 4000 --token-latency 0.002 --megabytes 8
+"""
+
+import argparse
+import asyncio
+import random
+import re
+import time
+from typing import Any
+
+from benchmarks.utils import write_results
+from examples.metrics import summarize
+
+CARD = "4532 1234 5678 9012"
+
+
+def create_answer(chars: int, position: float) -> str:
+    filler = "The transaction was retried and settled without further errors. "
+    text = (filler * (chars // len(filler) + 1))[:chars]
+    cut = int(len(text) * position)
+    return f"{text[:cut]} card {CARD} {text[cut:]}"
+
+
+async def measure_abort(chars: int, position: float, token_latency: float, runs: int) -> dict[str, Any]:
+    from beeai_framework.backend import UserMessage
+
+    from examples.scripted import Script, ScriptedChatModel, say
+    from examples.stream_guard import CREDIT_CARD, StreamGuardChatModel
+
+    model = ScriptedChatModel(Script(steps=[say(create_answer(chars, position))]), token_latency=token_latency)
+    guarded = StreamGuardChatModel(model, {"credit card number": CREDIT_CARD})
+
+    results: dict[str, Any] = {}
+    for variant, llm in (("unguarded", model), ("guarded", guarded)):
+        durations: list[float] = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            await llm.create(messages=[UserMessage("Summarize the payment logs")], stream=True)
+            durations.append(time.perf_counter() - start)
+        results[variant] = summarize(durations)
+    results["stopped"] = len(guarded.stops) == runs
+    return results
+
+
+def measure_throughput(megabytes: float, chunk_sizes: list[int]) -> dict[str, Any]:
+    from examples.stream_guard import CREDIT_CARD, StreamScanner
+
+    rng = random.Random(0)
+    words = ["payment", "error", "retry", "order", "id", "4532", "1234", "-", "ok", "timeout", "card", "2024"]
+    text = " ".join(rng.choice(words) for _ in range(int(megabytes * 2**20 / 5)))
+    size_mb = len(text) / 2**20
+    patterns = {"credit card number": CREDIT_CARD, "email": r"\b[\w.+-]+@[\w-]+\.[\w.]+\b"}
+
+    results: dict[str, Any] = {}
+    start = time.perf_counter()
+    expected = sum(1 for _ in re.finditer("|".join(f"(?:{pattern})" for pattern in patterns.values()), text))
+    results["full_text"] = {"mb_s": size_mb / (time.perf_counter() - start), "matches": expected}
+
+    for chunk_size in chunk_sizes:
+        scanner = StreamScanner(patterns)
+        matches = 0
+        start = time.perf_counter()
+        for offset in range(0, len(text), chunk_size):
+            matches += len(scanner.feed(text[offset : offset + chunk_size]))
+        matches += len(scanner.finish())
+        results[f"chunks_{chunk_size}"] = {"mb_s": size_mb / (time.perf_counter() - start), "matches": matches}
+    return results
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--chars", type=int, default=4000, help="length of the streamed answer")
+    parser.add_argument("--token-latency", type=float, default=0.002, help="simulated seconds per streamed chunk")
+    parser.add_argument("--positions", type=float, nargs="+", default=[0.1, 0.5, 0.9])
+    parser.add_argument("--megabytes", type=float, default=8)
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[4, 16, 256, 4096, 65536])
+    parser.add_argument("--output", default="benchmark-stream-guard.json")
+    args = parser.parse_args()
+
+    results: dict[str, Any] = {"abort": {}, "throughput": {}}
+    for position in args.positions:
+        result = await measure_abort(args.chars, position, args.token_latency, args.runs)
+        results["abort"][str(position)] = result
+        print(
+            f"card at {position:4.0%}  unguarded p50 {result['unguarded']['p50'] * 1000:8.2f}ms  "
+            f"guarded p50 {result['guarded']['p50'] * 1000:8.2f}ms  stopped {result['stopped']}"
+        )
+
+    results["throughput"] = measure_throughput(args.megabytes, args.chunk_sizes)
+    for variant, result in results["throughput"].items():
+        print(f"{variant:<14} {result['mb_s']:8.1f} MB/s  matches {result['matches']}")
+    write_results(args.output, "stream_guard", results)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,87 @@
+"""Benchmark memoized tools
+
+Sends `--calls` weather lookups, `--concurrency` at a time, to a tool that
+takes `--latency` seconds per execution. Locations are drawn from a Zipf-like
+distribution over `--locations` cities with varying case and spacing, as
+model-generated arguments come in. Compares the plain tool with the
+`memoize`d one and reports wall time, tool executions and the hit rate
+(including calls that shared an identical execution in flight).
+
+    python -m benchmarks.bench_tool_cache --calls 2000 --concurrency 50 --latency 0.02
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from typing import Any
+
+from benchmarks.utils import write_results
+
+CITIES = ["Paris", "San Francisco", "New York", "Tokyo", "Berlin", "Rome", "Madrid", "Sydney", "Oslo", "Lima"]
+
+
+def create_arguments(calls: int, locations: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    names = [f"{CITIES[i % len(CITIES)]} {i // len(CITIES)}" for i in range(locations)]
+    weights = [1 / (rank + 1) for rank in range(locations)]
+    variants = [str, str.lower, str.upper, lambda name: f" {name}  "]
+    return [rng.choice(variants)(name) for name in rng.choices(names, weights, k=calls)]
+
+
+async def measure(variant: str, arguments: list[str], concurrency: int, latency: float, ttl: float) -> dict[str, Any]:
+    from beeai_framework.tools import tool
+
+    from examples.tool_cache import MemoizedTool, memoize
+
+    executions = 0
+
+    @tool
+    async def weather_tool(location: str) -> str:
+        """Tool to fetch weather data."""
+        nonlocal executions
+        executions += 1
+        await asyncio.sleep(latency)
+        return f"Weather for {location.strip()}: 22°C, partly cloudy"
+
+    target = memoize(weather_tool, ttl=ttl, casefold=True) if variant == "memoized" else weather_tool
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def call(location: str) -> None:
+        async with semaphore:
+            await target.run({"location": location})
+
+    start = time.perf_counter()
+    await asyncio.gather(*(call(location) for location in arguments))
+    wall = time.perf_counter() - start
+    result: dict[str, Any] = {"wall_s": wall, "calls_s": len(arguments) / wall, "executions": executions}
+    if isinstance(target, MemoizedTool):
+        result["cache"] = target.stats.to_dict()
+    return result
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--locations", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.02, help="simulated seconds per tool execution")
+    parser.add_argument("--ttl", type=float, default=300.0)
+    parser.add_argument("--output", default="benchmark-tool-cache.json")
+    args = parser.parse_args()
+
+    arguments = create_arguments(args.calls, args.locations)
+    results: dict[str, Any] = {}
+    for variant in ("plain", "memoized"):
+        result = results[variant] = await measure(variant, arguments, args.concurrency, args.latency, args.ttl)
+        cache = result.get("cache")
+        print(
+            f"{variant:<9} wall {result['wall_s'] * 1000:9.2f}ms  {result['calls_s']:8.1f} calls/s  "
+            f"executions {result['executions']:5d}"
+            + (f"  hit rate {cache['hit_rate']:.1%} (shared {cache['shared']})" if cache else "")
+        )
+    write_results(args.output, "tool_cache", results)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
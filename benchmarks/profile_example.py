@@ -0,0 +1,72 @@
+"""Profile one example against the scripted model
+
+Runs the example with `SpanProfiler` in place of its trajectory middleware
+and writes a Chrome trace (open it in https://ui.perfetto.dev or
+chrome://tracing) and collapsed stacks (https://www.speedscope.app or
+flamegraph.pl). Prints the self time per category and the slowest spans.
+Each model call sleeps `--latency`, so the model shows up as it would
+against a real provider.
+
+    python -m benchmarks.profile_example 05_multiagent_handoff --latency 0.05
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+from collections import Counter
+
+from benchmarks.scenarios import all_scripts
+from benchmarks.utils import EXAMPLES, load_example, use_scripted_model
+
+
+async def _auto_approve(_: str) -> str:
+    return "yes"
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("example", nargs="?", default="05_multiagent_handoff", choices=EXAMPLES)
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated model latency in seconds")
+    parser.add_argument("--trace", default="profile-trace.json")
+    parser.add_argument("--collapsed", default="profile-stacks.txt")
+    parser.add_argument("--top", type=int, default=10, help="slowest spans to print")
+    args = parser.parse_args()
+
+    from beeai_framework.utils.io import setup_io_context
+
+    from examples.profiler import SpanProfiler
+
+    llm = use_scripted_model()
+    llm.scripts = all_scripts()
+    llm.latency = args.latency
+
+    module = load_example(args.example)
+    profiler = SpanProfiler()
+    module.trajectory_middleware = lambda: profiler
+    restore_io = setup_io_context(read=_auto_approve)  # answers the permission prompt in example 9
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            await module.main()
+    finally:
+        restore_io()
+
+    spans = profiler.spans()
+    by_category: Counter[str] = Counter()
+    for span in spans:
+        by_category[span.category] += span.self_time
+    total = sum(span.duration for span in profiler.roots)
+    print(f"{args.example}: {total * 1000:.1f}ms in {len(spans)} spans")
+    for category, value in by_category.most_common():
+        print(f"  {category:<12} self {value * 1000:8.2f}ms  {value / total * 100:5.1f}%")
+    print("slowest spans:")
+    for span in sorted(spans, key=lambda span: span.duration, reverse=True)[: args.top]:
+        print(f"  {span.duration * 1000:8.2f}ms  {' > '.join(span.path())}")
+
+    profiler.write(args.trace)
+    profiler.write(args.collapsed)
+    print(f"Chrome trace written to {args.trace}, collapsed stacks to {args.collapsed}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,129 @@
+"""Scripted model turns for every example
+
+Each script reproduces the trajectory the example is designed to produce, so
+the requirement rules are exercised exactly as with a well-behaved model.
+Scripts are matched against the user prompt (or the handoff task for the
+sub-agents in example 5).
+"""
+
+from examples.scripted import Script, answer, call
+
+SCRIPTS: dict[str, list[Script]] = {
+    "01_context_before_tool": [
+        Script(
+            match="What's the weather like?",
+            steps=[
+                call("fetch_user_location"),
+                call("weather_tool", location="San Francisco, CA"),
+                answer("It's 22°C and partly cloudy in San Francisco, CA."),
+            ],
+        )
+    ],
+    "02_exact_tool_usage": [
+        Script(
+            match="I need laptop pricing",
+            steps=[call("price_estimator", item="laptop"), answer("The estimated price for a laptop is $49.99.")],
+        )
+    ],
+    "03_start_with_analysis": [
+        Script(
+            match="marketing campaign",
+            steps=[
+                # "the given task" is the user's question as asked, the input the fast path derives
+                call("analyze_task", task="What analysis steps are needed for creating a marketing campaign?"),
+                answer("A marketing campaign requires data gathering, processing, and reporting."),
+            ],
+        )
+    ],
+    "04_retry_rephrasing": [
+        Script(
+            match="New York City on Wikipedia",
+            steps=[
+                call("wikipedia_search_tool", query="New York City"),
+                call("rephrase_tool", original_query="New York City"),
+                call("wikipedia_search_tool", query="NYC"),
+                answer("New York City is the most populous city in the United States."),
+            ],
+        )
+    ],
+    "05_multiagent_handoff": [
+        Script(
+            match="Recommend beach destinations",
+            steps=[
+                call("get_destination_info", location_query="beach"),
+                answer("Top beach destinations: Maldives, Bali, Hawaii"),
+            ],
+        ),
+        Script(
+            match="Current weather in the Maldives",
+            steps=[
+                call("get_weather_info", location="Maldives"),
+                answer("Maldives: 32°C, sunny, light breeze"),
+            ],
+        ),
+        Script(
+            match="plan a beach vacation",
+            steps=[
+                call("transfer_to_destination_expert", task="Recommend beach destinations"),
+                call("transfer_to_weather_expert", task="Current weather in the Maldives"),
+                answer("Consider the Maldives, Bali or Hawaii. The Maldives is 32°C and sunny right now."),
+            ],
+        ),
+    ],
+    "06_react_loop": [
+        Script(
+            match="weather in Paris",
+            steps=[
+                call("think", thoughts="I need the population and the weather.", next_step=["wikipedia_tool"]),
+                call("wikipedia_tool", query="Paris"),
+                call("think", thoughts="I have the population, now the weather.", next_step=["weather_tool"]),
+                call("weather_tool", location="Paris"),
+                call("think", thoughts="I have everything I need.", next_step=["final_answer"]),
+                answer("Paris is 22°C and partly cloudy; about 2.16 million people live in the city."),
+            ],
+        )
+    ],
+    "07_tool_dependency": [
+        Script(
+            match="Book me a flight",
+            steps=[
+                call("search_flights", departure="New York", destination="Los Angeles"),
+                call("book_flight", flight_info="Flight DL789: New York to Los Angeles at 6:00 PM - $275"),
+                answer("Your flight DL789 is booked. Confirmation number: ABC123."),
+            ],
+        )
+    ],
+    "08_final_action": [
+        Script(
+            match="quarterly sales data",
+            steps=[
+                call("get_sales_data"),
+                call("send_email_summary", report_content="Revenue grew every quarter, from $2.1M to $3.2M."),
+                answer("Sales grew from $2.1M in Q1 to $3.2M in Q4. The summary was sent via email."),
+            ],
+        )
+    ],
+    "09_permission_required": [
+        Script(
+            match="Q4 sales performance",
+            steps=[
+                call("draft_report", topic="Q4 sales performance"),
+                call("send_email_to_manager", subject="Q4 Sales Report", content="Revenue $3.2M (+15% YoY)"),
+                answer("The Q4 report was drafted and sent to your manager."),
+            ],
+        )
+    ],
+    "10_safety_stop": [
+        Script(
+            match="transaction error logs",
+            steps=[
+                call("log_reviewer", log_file="transactions.log"),
+                answer("I cannot complete this task because tool output contains credit card numbers."),
+            ],
+        )
+    ],
+}
+
+
+def all_scripts() -> list[Script]:
+    return [script for scripts in SCRIPTS.values() for script in scripts]
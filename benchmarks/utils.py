@@ -0,0 +1,73 @@
+import importlib
+import json
+import os
+import platform
+import sys
+import tracemalloc
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from types import ModuleType
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+EXAMPLES = [
+    "01_context_before_tool",
+    "02_exact_tool_usage",
+    "03_start_with_analysis",
+    "04_retry_rephrasing",
+    "05_multiagent_handoff",
+    "06_react_loop",
+    "07_tool_dependency",
+    "08_final_action",
+    "09_permission_required",
+    "10_safety_stop",
+]
+
+
+def use_scripted_model() -> Any:
+    """Make `examples.utils.llm` resolve to the offline scripted model and return it.
+
+    Must be called before any example runs.
+    """
+    os.environ["MODEL"] = "scripted"
+    from examples.utils import get_llm
+
+    return get_llm()
+
+
+def load_example(name: str) -> ModuleType:
+    return importlib.import_module(f"examples.{name}")
+
+
+async def measure_peak_memory(fn: Callable[[], Awaitable[T]]) -> tuple[T, int]:
+    """Run the coroutine with tracemalloc enabled and return its result and peak bytes."""
+    tracemalloc.start()
+    try:
+        result = await fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, peak
+
+
+def environment() -> dict[str, Any]:
+    try:
+        framework_version = version("beeai-framework")
+    except PackageNotFoundError:
+        framework_version = None
+
+    return {
+        "timestamp": datetime.now(tz=UTC).isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "beeai_framework": framework_version,
+    }
+
+
+def write_results(path: str | Path, suite: str, results: Any) -> None:
+    payload = {"suite": suite, "environment": environment(), "results": results}
+    Path(path).write_text(json.dumps(payload, indent=2, sort_keys=False), encoding="utf-8")
+    print(f"Results written to {path}")
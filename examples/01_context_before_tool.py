@@ -8,10 +8,10 @@ import asyncio
 
 from beeai_framework.agents.experimental import RequirementAgent
 from beeai_framework.agents.experimental.requirements.conditional import ConditionalRequirement
-from beeai_framework.middleware.trajectory import GlobalTrajectoryMiddleware
-from beeai_framework.tools import Tool, tool
+from beeai_framework.tools import tool
 
-from examples.utils import llm
+from examples.tool_cache import memoize
+from examples.utils import llm, trajectory_middleware
 
 
 @tool
@@ -20,6 +20,7 @@ def fetch_user_location() -> str:
     return "User location: San Francisco, CA"
 
 
+@memoize(ttl=600)
 @tool
 def weather_tool(location: str) -> str:
     """Tool to fetch weather data from OpenMeteo API."""
@@ -35,7 +36,7 @@ async def main():
     )
 
     # The agent will automatically fetch location before checking weather
-    response = await agent.run("What's the weather like?").middleware(GlobalTrajectoryMiddleware(included=[Tool]))
+    response = await agent.run("What's the weather like?").middleware(trajectory_middleware())
     print(response.answer.text)
 
 
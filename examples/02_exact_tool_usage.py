@@ -8,10 +8,9 @@ import asyncio
 
 from beeai_framework.agents.experimental import RequirementAgent
 from beeai_framework.agents.experimental.requirements.conditional import ConditionalRequirement
-from beeai_framework.middleware.trajectory import GlobalTrajectoryMiddleware
-from beeai_framework.tools import Tool, tool
+from beeai_framework.tools import tool
 
-from examples.utils import llm
+from examples.utils import llm, trajectory_middleware
 
 
 @tool
@@ -35,9 +34,7 @@ async def main():
     )
 
     # The agent must use price_estimator exactly once during the conversation
-    response = await agent.run("I need laptop pricing. What's the estimated price?").middleware(
-        GlobalTrajectoryMiddleware(included=[Tool])
-    )
+    response = await agent.run("I need laptop pricing. What's the estimated price?").middleware(trajectory_middleware())
     print(response.answer.text)
 
 
@@ -8,10 +8,9 @@ import asyncio
 
 from beeai_framework.agents.experimental import RequirementAgent
 from beeai_framework.agents.experimental.requirements.conditional import ConditionalRequirement
-from beeai_framework.tools import Tool, tool
-from beeai_framework.middleware.trajectory import GlobalTrajectoryMiddleware
+from beeai_framework.tools import tool
 
-from examples.utils import llm
+from examples.utils import llm, trajectory_middleware
 
 
 @tool
@@ -36,7 +35,7 @@ async def main():
 
     # The agent will automatically analyze the task first, and only once
     response = await agent.run("What analysis steps are needed for creating a marketing campaign?").middleware(
-        GlobalTrajectoryMiddleware(included=[Tool])
+        trajectory_middleware()
     )
     print(response.answer.text)
 
@@ -8,11 +8,12 @@ import asyncio
 
 from beeai_framework.agents.experimental import RequirementAgent
 from beeai_framework.agents.experimental.requirements.conditional import ConditionalRequirement
-from beeai_framework.agents.experimental.requirements.requirement import Requirement, Rule
-from beeai_framework.tools import Tool, tool
-from beeai_framework.middleware.trajectory import GlobalTrajectoryMiddleware
+from beeai_framework.agents.experimental.requirements.requirement import Rule
+from beeai_framework.tools import tool
 
-from examples.utils import llm
+from examples.incremental import IncrementalRequirement
+from examples.tool_cache import memoize
+from examples.utils import llm, trajectory_middleware
 
 
 @tool
@@ -24,6 +25,7 @@ def rephrase_tool(original_query: str) -> str:
     return rephrased_queries.get(original_query, f"alternative phrasing for: {original_query}")
 
 
+@memoize(ttl=3600)
 @tool
 def wikipedia_search_tool(query: str) -> str:
     """Tool to search Wikipedia."""
@@ -35,7 +37,7 @@ def wikipedia_search_tool(query: str) -> str:
     return f"Wikipedia page for '{query}': Article found with general information."
 
 
-class RetryWithRephrasing(Requirement):
+class RetryWithRephrasing(IncrementalRequirement):
     """Custom requirement to retry search with rephrasing if results are empty."""
 
     def __init__(self, target_tool):
@@ -43,17 +45,13 @@ class RetryWithRephrasing(Requirement):
         self.target_tool = target_tool
         self.enabled = True
 
-    async def run(self, state, **kwargs):
-        """Check if last output is empty and force rephrasing if needed."""
-        # Check if we have any steps and the last one returned empty results
-        if state.steps:
-            try:
-                last_step = state.steps[-1].output.get_text_content()
-                # Check if output is empty string (our trigger condition)
-                if last_step == "":
-                    return [Rule(target="rephrase_tool", forced=True)]
-            except (AttributeError, IndexError):
-                pass
+    async def check(self, state, steps):
+        """Force rephrasing if a search since the last check returned empty results."""
+        # Only the steps appended since the previous check are passed, so parallel searches are not missed
+        for step in steps:
+            # Check if output is empty string (our trigger condition)
+            if step.tool_name == self.target_tool.name and not step.failed and step.text == "":
+                return [Rule(target="rephrase_tool", forced=True)]
         return []
 
 
@@ -69,9 +67,7 @@ async def main():
     )
 
     # The agent will search, get empty results, then rephrase and retry
-    response = await agent.run("Find information about New York City on Wikipedia.").middleware(
-        GlobalTrajectoryMiddleware(included=[Tool])
-    )
+    response = await agent.run("Find information about New York City on Wikipedia.").middleware(trajectory_middleware())
     print(response.answer.text)
 
 
@@ -1,21 +1,25 @@
 """Example 5: Multi-agent handoff with constraints
 
 Use HandoffTool to delegate to DestinationExpert before WeatherExpert.
-This demonstrates controlled agent-to-agent handoffs.
+This demonstrates controlled agent-to-agent handoffs. The experts come from
+pools shared by all runs, so concurrent runs reuse idle expert agents.
+The experts share the run budget of the agent that hands off to them, and a
+handoff still running when the budget is used up is cancelled.
 """
 
 import asyncio
 
-from beeai_framework.agents.experimental import RequirementAgent
 from beeai_framework.agents.experimental.requirements.conditional import ConditionalRequirement
-from beeai_framework.middleware.trajectory import GlobalTrajectoryMiddleware
-from beeai_framework.tools import Tool, tool
-from beeai_framework.tools.handoff import HandoffTool
+from beeai_framework.tools import tool
 
-from examples.utils import llm
+from examples.agent_pool import AgentPool, PooledHandoffTool
+from examples.run_budget import RunBudget, RunBudgetAgent, bounded
+from examples.tool_cache import memoize
+from examples.utils import llm, trajectory_middleware
 
 
 # Create expert agents with simple instructions
+@memoize(ttl=3600, casefold=True)
 @tool
 def get_destination_info(location_query: str) -> str:
     """Get destination recommendations."""
@@ -24,6 +28,7 @@ def get_destination_info(location_query: str) -> str:
     return "No destination recommendations available"
 
 
+@memoize(ttl=600, casefold=True)
 @tool
 def get_weather_info(location: str) -> str:
     """Get current weather."""
@@ -38,34 +43,42 @@ def get_weather_info(location: str) -> str:
     return f"Weather for {location}: pleasant conditions"
 
 
-destination_expert = RequirementAgent(
+destination_expert = RunBudgetAgent(
     llm=llm,
     tools=[get_destination_info],
     instructions="You are a destination expert. Only provide destination recommendations. Keep responses brief and focused.",
 )
 
-weather_expert = RequirementAgent(
+weather_expert = RunBudgetAgent(
     llm=llm,
     tools=[get_weather_info],
     instructions="You are a weather expert. Only provide current weather information. Keep responses brief and focused.",
 )
 
+# At most 8 runs of each expert at a time, further handoffs wait for a free one
+destination_pool = AgentPool(destination_expert, size=8)
+weather_pool = AgentPool(weather_expert, size=8)
+
 
 async def main():
     # Create agent with handoff tools
-    handoff_destination = HandoffTool(
-        target=destination_expert,
-        name="transfer_to_destination_expert",
-        description="Transfer to destination expert for travel recommendations",
+    handoff_destination = bounded(
+        PooledHandoffTool(
+            destination_pool,
+            name="transfer_to_destination_expert",
+            description="Transfer to destination expert for travel recommendations",
+        )
     )
 
-    handoff_weather = HandoffTool(
-        target=weather_expert,
-        name="transfer_to_weather_expert",
-        description="Transfer to weather expert for climate information",
+    handoff_weather = bounded(
+        PooledHandoffTool(
+            weather_pool,
+            name="transfer_to_weather_expert",
+            description="Transfer to weather expert for climate information",
+        )
     )
 
-    agent = RequirementAgent(
+    agent = RunBudgetAgent(
         llm=llm,
         tools=[handoff_destination, handoff_weather],
         requirements=[
@@ -74,12 +87,14 @@ async def main():
                 only_after=[handoff_destination],  # Weather expert only after destination expert
             )
         ],
+        # shared with the experts: their iterations, tokens and tool calls count as well
+        budget=RunBudget(timeout=120, max_iterations=16, max_tokens=50_000),
     )
 
     # The agent will handoff to DestinationExpert before WeatherExpert
     response = await agent.run(
         "I want to plan a beach vacation. Can you help me with destinations and weather?"
-    ).middleware(GlobalTrajectoryMiddleware(included=[Tool]))
+    ).middleware(trajectory_middleware())
     print(response.answer.text)
 
 
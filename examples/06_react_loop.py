@@ -2,19 +2,22 @@
 
 Alternate tools and reasoning, avoid consecutive thinking.
 This implements the ReAct (Reasoning + Acting) pattern with constraints.
+The run budget stops a loop that keeps thinking and searching: once it is
+used up, the agent has to answer with what it found.
 """
 
 import asyncio
 
-from beeai_framework.agents.experimental import RequirementAgent
 from beeai_framework.agents.experimental.requirements.conditional import ConditionalRequirement
-from beeai_framework.middleware.trajectory import GlobalTrajectoryMiddleware
 from beeai_framework.tools import Tool, tool
 from beeai_framework.tools.think import ThinkTool
 
-from examples.utils import llm
+from examples.run_budget import RunBudget, RunBudgetAgent
+from examples.tool_cache import memoize
+from examples.utils import llm, trajectory_middleware
 
 
+@memoize(ttl=3600)
 @tool
 def wikipedia_tool(query: str) -> str:
     """Tool to search Wikipedia for information."""
@@ -23,6 +26,7 @@ def wikipedia_tool(query: str) -> str:
     return f"Wikipedia search for '{query}': No data available."
 
 
+@memoize(ttl=600)
 @tool
 def weather_tool(location: str) -> str:
     """Tool to get weather information."""
@@ -30,10 +34,10 @@ def weather_tool(location: str) -> str:
         return f"Weather data for {location}: Currently 22°C (72°F), partly cloudy with light winds. High today: 25°C, Low: 18°C."
     return f"Weather data for {location}: No data available."
 
- 
+
 async def main():
     # Create agent with ReAct constraints
-    agent = RequirementAgent(
+    agent = RunBudgetAgent(
         llm=llm,
         tools=[ThinkTool(), wikipedia_tool, weather_tool],
         requirements=[
@@ -44,11 +48,12 @@ async def main():
                 consecutive_allowed=False,  # Prevent consecutive thinking
             )
         ],
+        budget=RunBudget(timeout=60, max_iterations=12),
     )
 
     # The agent will follow ReAct pattern: Reason -> Act -> Reason -> Act...
     response = await agent.run("What's the weather in Paris and what is the city's population?").middleware(
-        GlobalTrajectoryMiddleware(included=[Tool])
+        trajectory_middleware()
     )
     print(response.answer.text)
 
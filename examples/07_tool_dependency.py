@@ -7,10 +7,9 @@ import asyncio
 
 from beeai_framework.agents.experimental import RequirementAgent
 from beeai_framework.agents.experimental.requirements.conditional import ConditionalRequirement
-from beeai_framework.middleware.trajectory import GlobalTrajectoryMiddleware
-from beeai_framework.tools import Tool, tool
+from beeai_framework.tools import tool
 
-from examples.utils import llm
+from examples.utils import llm, trajectory_middleware
 
 
 @tool
@@ -32,9 +31,9 @@ def book_flight(flight_info: str) -> str:
     return f"Successfully booked: {flight_info}. Confirmation number: ABC123. Check-in opens 24 hours before departure."
 
 
-async def main():
+def create_agent() -> RequirementAgent:
     # Create agent with dependency constraint
-    agent = RequirementAgent(
+    return RequirementAgent(
         llm=llm,
         tools=[search_flights, book_flight],
         requirements=[
@@ -45,10 +44,12 @@ async def main():
         ],
     )
 
+
+async def main():
+    agent = create_agent()
+
     # The agent will search flights before booking
-    response = await agent.run("Book me a flight from New York to Los Angeles.").middleware(
-        GlobalTrajectoryMiddleware(included=[Tool])
-    )
+    response = await agent.run("Book me a flight from New York to Los Angeles.").middleware(trajectory_middleware())
     print(response.answer.text)
 
 
@@ -8,12 +8,15 @@ import asyncio
 
 from beeai_framework.agents.experimental import RequirementAgent
 from beeai_framework.agents.experimental.requirements.conditional import ConditionalRequirement
-from beeai_framework.middleware.trajectory import GlobalTrajectoryMiddleware
-from beeai_framework.tools import Tool, tool
+from beeai_framework.tools import tool
 
-from examples.utils import llm
+from examples.compaction import TableSummary, TextCap, compact
+from examples.utils import llm, trajectory_middleware
 
 
+# Tables of 500+ characters reach the agent as totals and growth rates; this one is shorter and passes unchanged.
+# Add ReadOutputTool() to the agent's tools and `readable=True` here once they get compacted, to read the data back.
+@compact(TableSummary(), TextCap(max_chars=2000))
 @tool
 def get_sales_data() -> str:
     """Tool to retrieve quarterly sales data."""
@@ -42,7 +45,7 @@ async def main():
 
     # The agent must send a summary before providing the final answer
     response = await agent.run("Analyze our quarterly sales data and prepare a report.").middleware(
-        GlobalTrajectoryMiddleware(included=[Tool])
+        trajectory_middleware()
     )
     print(response.answer.text)
 
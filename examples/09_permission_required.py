@@ -2,16 +2,18 @@
 
 Ask user before sending an email to their manager.
 This implements human-in-the-loop for sensitive operations.
+Approvals go through a queue, so a run waiting for a human holds no worker
+thread, and an approval is remembered for 10 minutes per email subject.
 """
 
 import asyncio
 
 from beeai_framework.agents.experimental import RequirementAgent
 from beeai_framework.agents.experimental.requirements.ask_permission import AskPermissionRequirement
-from beeai_framework.middleware.trajectory import GlobalTrajectoryMiddleware
-from beeai_framework.tools import Tool, tool
+from beeai_framework.tools import tool
 
-from examples.utils import llm
+from examples.approvals import ApprovalPolicy, ApprovalQueue, ask_console
+from examples.utils import llm, trajectory_middleware
 
 
 @tool
@@ -26,6 +28,10 @@ def draft_report(topic: str) -> str:
     return "Q4 Sales Report: Revenue $3.2M (+15% YoY), 22K units sold, strong enterprise growth"
 
 
+# Shared by all runs: an approved (tool, subject) pair is not asked again for 10 minutes
+approvals = ApprovalQueue(policy=ApprovalPolicy(ttl=600, arguments={"send_email_to_manager": ["subject"]}))
+
+
 async def main():
     # Create agent with permission requirement for sensitive tool
     agent = RequirementAgent(
@@ -34,14 +40,16 @@ async def main():
         requirements=[
             AskPermissionRequirement(
                 send_email_to_manager,
-                remember_choices=False,  # Ask permission every time
+                handler=approvals.ask,  # Wait in the approval queue instead of blocking on input()
             )
         ],
     )
 
-    response = await agent.run("Please draft a report on Q4 sales performance and send it to manager.").middleware(
-        GlobalTrajectoryMiddleware(included=[Tool])
-    )
+    # Pending approvals are asked on the console, one prompt per batch
+    async with approvals.approver(ask_console):
+        response = await agent.run("Please draft a report on Q4 sales performance and send it to manager.").middleware(
+            trajectory_middleware()
+        )
     print(response.answer.text)
 
 
@@ -8,14 +8,18 @@ import asyncio
 import re
 
 from beeai_framework.agents.experimental import RequirementAgent
-from beeai_framework.agents.experimental.requirements.requirement import Requirement, Rule
+from beeai_framework.agents.experimental.requirements.requirement import Rule
 from beeai_framework.backend import SystemMessage
-from beeai_framework.middleware.trajectory import GlobalTrajectoryMiddleware
-from beeai_framework.tools import Tool, tool
+from beeai_framework.tools import tool
 
-from examples.utils import llm
+from examples.compaction import TextCap, compact
+from examples.incremental import IncrementalRequirement
+from examples.utils import llm, trajectory_middleware
 
 
+# Logs of 500+ characters are cut to their first and last lines (this one is shorter and passes unchanged).
+# With ReadOutputTool() among the tools (and `readable=True`), whatever the agent reads back passes the check below too.
+@compact(TextCap(max_chars=2000))
 @tool
 def log_reviewer(log_file: str) -> str:
     """Tool that reviews payment logs and might accidentally expose credit card numbers."""
@@ -23,7 +27,7 @@ def log_reviewer(log_file: str) -> str:
     return "Payment error found: Failed transaction for card 4532-1234-5678-9012 - insufficient funds"
 
 
-class PrematureStopRequirement(Requirement):
+class PrematureStopRequirement(IncrementalRequirement):
     """Custom requirement to stop agent if sensitive patterns are detected."""
 
     def __init__(self, pattern: str, reason: str):
@@ -32,25 +36,19 @@ class PrematureStopRequirement(Requirement):
         self.reason = reason
         self.enabled = True
 
-    async def run(self, state, **kwargs):
+    async def check(self, state, steps):
         """Check if output contains sensitive patterns and force stop if found."""
-        try:
-            # Check the most recent tool output for sensitive patterns
-            if state.steps:
-                last_step = state.steps[-1].output.get_text_content()
-                if last_step and self.pattern.search(str(last_step)):
-                    # Force immediate stop with direct instruction to agent
-                    await state.memory.add(
-                        SystemMessage(
-                            f"Your ONLY allowed response is exactly this: 'I cannot complete this task because {self.reason}.' Say nothing else. This is a mandatory safety requirement.",
-                            {"tempMessage": True},  # the message gets removed in the next iteration
-                        )
-                    )
-                    return [Rule(target="final_answer", forced=True)]
-                    # raise Exception(f"SAFETY STOP: {self.reason}. Detected pattern in tool output.") # alternatively you can raise
-        except (AttributeError, IndexError):
-            # If we can't access the step content, continue safely
-            pass
+        # Check every tool output since the last check, not just the most recent one
+        if any(step.text and self.pattern.search(step.text) for step in steps):
+            # Force immediate stop with direct instruction to agent
+            await state.memory.add(
+                SystemMessage(
+                    f"Your ONLY allowed response is exactly this: 'I cannot complete this task because {self.reason}.' Say nothing else. This is a mandatory safety requirement.",
+                    {"tempMessage": True},  # the message gets removed in the next iteration
+                )
+            )
+            return [Rule(target="final_answer", forced=True)]
+            # raise Exception(f"SAFETY STOP: {self.reason}. Detected pattern in tool output.") # alternatively you can raise
         return []
 
 
@@ -67,9 +65,7 @@ async def main():
         ],
     )
 
-    response = await agent.run("Review the transaction error logs").middleware(
-        GlobalTrajectoryMiddleware(included=[Tool])
-    )
+    response = await agent.run("Review the transaction error logs").middleware(trajectory_middleware())
     print(response.answer.text)
 
 
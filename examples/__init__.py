@@ -3,4 +3,6 @@
 This package contains practical examples demonstrating the Requirement Agent
 from the BeeAI Framework. Each example shows different constraint patterns
 and use cases.
-"""
\ No newline at end of file
+
+Run them with `python -m examples` (see `examples/runner.py`).
+"""
@@ -0,0 +1,12 @@
+"""Run the examples: `python -m examples --help`"""
+
+import time
+
+_started = time.perf_counter()  # before any other import, for the cold startup metric
+
+import asyncio
+import sys
+
+from examples.runner import main
+
+sys.exit(asyncio.run(main(started=_started)))
@@ -0,0 +1,175 @@
+"""Pooled handoff targets
+
+`HandoffTool` clones its target agent for every handoff, so concurrent
+orchestrators never share a sub-agent's memory, but each handoff pays for
+building the agent again and nothing limits how many sub-agents run at once.
+`AgentPool` keeps up to `size` agents per expert and hands them out one run
+at a time:
+
+* `warm()` builds `prewarm` agents ahead of the first request;
+* an agent is checked out with an empty memory (`memory.reset()`, no
+  rebuild) and returns to the pool when its run ends, successful or not;
+* when all `size` agents are busy, callers wait for one to come back, up to
+  `acquire_timeout` seconds (then `TimeoutError`); that wait is the
+  backpressure on the orchestrators.
+
+`PooledHandoffTool` is a `HandoffTool` that takes its target from a pool:
+
+    destination_pool = AgentPool(destination_expert, size=8, prewarm=2)
+    handoff = PooledHandoffTool(destination_pool, name="transfer_to_destination_expert")
+
+Agents in the pool are clones of the template; the template itself never
+runs.
+"""
+
+import asyncio
+import contextlib
+import copy
+import time
+from collections.abc import AsyncIterator, Sequence
+from dataclasses import asdict, dataclass
+from typing import Any, Self
+
+from beeai_framework.agents import AnyAgent
+from beeai_framework.backend import AnyMessage, AssistantMessage
+from beeai_framework.context import RunContext
+from beeai_framework.memory import BaseMemory
+from beeai_framework.tools import StringToolOutput, ToolError, ToolRunOptions
+from beeai_framework.tools.handoff import HandoffSchema, HandoffTool
+
+
+@dataclass
+class PoolStats:
+    created: int = 0
+    checkouts: int = 0
+    waits: int = 0
+    """Checkouts that found every agent busy."""
+    wait_s: float = 0.0
+    timeouts: int = 0
+    peak_in_use: int = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class AgentPool:
+    def __init__(
+        self,
+        template: AnyAgent,
+        *,
+        size: int = 8,
+        prewarm: int = 0,
+        acquire_timeout: float | None = None,
+    ) -> None:
+        if size < 1:
+            raise ValueError("size must be at least 1")
+        if not 0 <= prewarm <= size:
+            raise ValueError("prewarm must be between 0 and size")
+        self.template = template
+        self.size = size
+        self.prewarm = prewarm
+        self.acquire_timeout = acquire_timeout
+        self.stats = PoolStats()
+        self._idle: list[AnyAgent] = []
+        self._slots = asyncio.Semaphore(size)
+        self._in_use = 0
+
+    @property
+    def idle(self) -> int:
+        return len(self._idle)
+
+    @property
+    def in_use(self) -> int:
+        return self._in_use
+
+    async def _create(self) -> AnyAgent:
+        agent: AnyAgent = await self.template.clone()  # type: ignore[assignment]
+        self.stats.created += 1
+        return agent
+
+    async def warm(self) -> None:
+        """Build agents until `prewarm` of them are available."""
+        missing = min(self.prewarm, self.size - self._in_use) - len(self._idle)
+        if missing > 0:
+            self._idle.extend(await asyncio.gather(*(self._create() for _ in range(missing))))
+
+    async def acquire(self) -> AnyAgent:
+        """Check out an agent with an empty memory, waiting while all of them are busy."""
+        if self._slots.locked():
+            self.stats.waits += 1
+            start = time.perf_counter()
+            try:
+                await asyncio.wait_for(self._slots.acquire(), self.acquire_timeout)
+            except TimeoutError:
+                self.stats.timeouts += 1
+                raise
+            finally:
+                self.stats.wait_s += time.perf_counter() - start
+        else:
+            await self._slots.acquire()
+
+        try:
+            # most recently returned first, its caches are the warmest
+            agent = self._idle.pop() if self._idle else await self._create()
+        except BaseException:
+            self._slots.release()
+            raise
+        agent.memory.reset()
+        self._in_use += 1
+        self.stats.checkouts += 1
+        self.stats.peak_in_use = max(self.stats.peak_in_use, self._in_use)
+        return agent
+
+    def release(self, agent: AnyAgent) -> None:
+        agent.memory.reset()  # do not keep the conversation alive while idle
+        self._idle.append(agent)
+        self._in_use -= 1
+        self._slots.release()
+
+    @contextlib.asynccontextmanager
+    async def checkout(self) -> AsyncIterator[AnyAgent]:
+        agent = await self.acquire()
+        try:
+            yield agent
+        finally:
+            self.release(agent)
+
+
+def handoff_messages(memory: BaseMemory) -> Sequence[AnyMessage]:
+    """The caller's conversation without the pending handoff call, as `HandoffTool` passes it on."""
+    messages = memory.messages
+    last_message = messages[-1] if messages else None
+    if last_message and isinstance(last_message, AssistantMessage) and last_message.get_tool_calls():
+        return messages[:-1]
+    return messages
+
+
+class PooledHandoffTool(HandoffTool):
+    """HandoffTool that runs the task on an agent checked out of a pool."""
+
+    def __init__(self, pool: AgentPool, *, name: str | None = None, description: str | None = None) -> None:
+        super().__init__(pool.template, name=name, description=description)
+        self.pool = pool
+
+    async def _run(self, input: HandoffSchema, options: ToolRunOptions | None, context: RunContext) -> StringToolOutput:
+        memory: BaseMemory = context.context["state"]["memory"]
+        if not memory or not isinstance(memory, BaseMemory):
+            raise ToolError("No memory found in context.")
+
+        try:
+            target = await self.pool.acquire()
+        except TimeoutError as e:
+            raise ToolError(f"All {self.pool.size} agents behind {self.name} are busy, try again later.") from e
+        try:
+            await target.memory.add_many(handoff_messages(memory))
+            response = await target.run(prompt=input.task)
+        finally:
+            self.pool.release(target)
+        return StringToolOutput(response.result.text)
+
+    async def clone(self) -> Self:
+        # clones share the pool, which is what bounds the sub-agents
+        cloned = copy.copy(self)
+        cloned.__dict__.pop("emitter", None)
+        cloned.middlewares = list(self.middlewares)
+        return cloned
@@ -0,0 +1,105 @@
+"""Copy-on-write agent templates
+
+Building a `RequirementAgent` per request repeats work whose result never
+changes: the prompt templates are parsed and filled with the role and
+instructions, every `ConditionalRequirement` resolves and validates its
+targets, and a `CompiledRequirementAgent` compiles its automaton again.
+`agent.clone()` avoids the requirements but still rebuilds the templates and
+clones the model, memory and emitter.
+
+`AgentTemplate` builds the agent once and freezes it. Each `create()` copies
+the agent's attributes into a new instance of the same class, so the clones
+share the immutable parts (model, tools, requirements, prompt templates,
+compiled automaton) and only get what a run writes to:
+
+* a new memory from `memory_factory` (the template's own memory is not
+  copied);
+* their own `middlewares`, `tools` and `requirements` lists, so adding to
+  them does not change the template or other clones;
+* their own emitter, created on first use (listeners registered on the
+  template's agent are not carried over, middlewares are).
+
+    template = AgentTemplate(RequirementAgent(llm=llm, tools=[...], requirements=[...]))
+    agent = template.create()  # or BatchRunner(template), a template is an agent factory
+
+Shared objects must not be changed after the template is built; build
+another template instead.
+"""
+
+import copy
+from collections.abc import Callable, Sequence
+from typing import Any, Generic, TypeVar
+
+from beeai_framework.agents.experimental import RequirementAgent
+from beeai_framework.context import RunMiddlewareType
+from beeai_framework.memory import BaseMemory, UnconstrainedMemory
+
+TAgent = TypeVar("TAgent", bound=RequirementAgent)
+
+# attributes every clone gets its own copy of, see `AgentTemplate.create`
+_PER_CLONE = frozenset({"emitter", "middlewares", "_memory", "_tools", "_requirements", "_is_running"})
+
+
+class AgentTemplate(Generic[TAgent]):
+    def __init__(self, agent: TAgent, *, memory_factory: Callable[[], BaseMemory] = UnconstrainedMemory) -> None:
+        if agent._is_running:
+            raise ValueError("Cannot use a running agent as a template.")
+        self.agent = agent
+        self.memory_factory = memory_factory
+        self.created = 0
+        self._type = type(agent)
+        self._shared = {name: value for name, value in agent.__dict__.items() if name not in _PER_CLONE}
+        self._tools = tuple(agent._tools)
+        self._requirements = tuple(agent._requirements)
+        self._middlewares = tuple(agent.middlewares)
+
+    @classmethod
+    def build(
+        cls,
+        agent_type: type[TAgent] = RequirementAgent,  # type: ignore[assignment]
+        /,
+        *,
+        memory_factory: Callable[[], BaseMemory] = UnconstrainedMemory,
+        **kwargs: Any,
+    ) -> "AgentTemplate[TAgent]":
+        """Build the agent (`agent_type(**kwargs)`) once and wrap it."""
+        return cls(agent_type(**kwargs), memory_factory=memory_factory)
+
+    def create(self, *, memory: BaseMemory | None = None, middlewares: Sequence[RunMiddlewareType] = ()) -> TAgent:
+        """A new agent sharing the template's configuration, with an empty (or the given) memory."""
+        agent: TAgent = object.__new__(self._type)
+        state = agent.__dict__
+        state.update(self._shared)
+        state["_is_running"] = False
+        state["_memory"] = memory if memory is not None else self.memory_factory()
+        state["_tools"] = list(self._tools)
+        state["_requirements"] = list(self._requirements)
+        state["middlewares"] = [*self._middlewares, *middlewares]
+        self.created += 1
+        return agent
+
+    def __call__(self) -> TAgent:
+        return self.create()
+
+
+async def clone_agent(agent: TAgent) -> TAgent:
+    """`agent.clone()` keeping the agent's class and its own settings.
+
+    `RequirementAgent.clone()` always builds a plain `RequirementAgent`, so a
+    subclass's behaviour would be lost on the clones `HandoffTool` and
+    `AgentPool` run. This copies the agent like `clone()` does: the model,
+    memory and emitter are cloned, the lists, templates and meta get their
+    own copy. Any other attribute, including a subclass's own settings, is
+    shared with the original, so treat those as read-only after construction.
+    """
+    cloned = copy.copy(agent)
+    cloned._llm = await agent._llm.clone()
+    cloned._memory = await agent._memory.clone()
+    cloned._tools = agent._tools.copy()
+    cloned._requirements = agent._requirements.copy()
+    cloned.middlewares = agent.middlewares.copy()
+    cloned._templates = agent._templates.model_copy(deep=True)
+    cloned._meta = agent._meta.model_copy(update={"tools": cloned._tools})
+    cloned._is_running = False
+    cloned.emitter = await agent.emitter.clone()
+    return cloned
@@ -0,0 +1,336 @@
+"""Non-blocking approvals for AskPermissionRequirement
+
+The default handler of `AskPermissionRequirement` reads the answer with
+`io_read`, i.e. `input()` in a worker thread: every run waiting for a human
+holds one of the few threads of the default executor (which sync tools and
+other `to_thread` work share), and the prompts of concurrent runs interleave
+on the console. `ApprovalQueue.ask` is a drop-in handler that parks the
+request in a queue instead; the run waits on a future and holds no thread:
+
+    approvals = ApprovalQueue(policy=ApprovalPolicy(ttl=600))
+    requirement = AskPermissionRequirement(send_email_to_manager, handler=approvals.ask)
+
+Decisions come from an approver reading the queue in batches:
+
+* `approvals.approver(callback)` runs a callback (sync or async) on each
+  batch of pending requests, e.g. `ask_console` which asks once per batch;
+* `watch_file(approvals, "decisions.txt")` applies `<id> yes|no` lines (`*`
+  for every pending request) appended to a file;
+* `serve_socket(approvals, port=8765)` accepts `pending`, `approve <id>...`
+  and `deny <id>...` commands over TCP, a stand-in for an approval service.
+
+With an `ApprovalPolicy`, an approval is remembered for `ttl` seconds per
+tool and argument pattern (the arguments listed in `arguments`, all of them
+by default), later identical requests are approved without asking, and
+identical requests already pending share one decision. Without a policy
+every call is asked, as with `remember_choices=False`.
+"""
+
+import asyncio
+import contextlib
+import itertools
+import json
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable, Mapping, Sequence
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from beeai_framework.tools import AnyTool
+from beeai_framework.utils.asynchronous import ensure_async
+from beeai_framework.utils.io import io_read
+from pydantic import BaseModel
+
+from examples.tool_cache import normalize_args
+
+# decisions for a batch: one for all of them, or per request id (missing ids stay pending)
+Decisions = bool | Mapping[str, bool]
+ApprovalCallback = Callable[[list["ApprovalRequest"]], Decisions | Awaitable[Decisions]]
+
+
+@dataclass(eq=False)
+class ApprovalRequest:
+    id: str
+    tool: str
+    input: dict[str, Any]
+    pattern: str
+    """Policy key: the tool and the arguments that matter for the decision."""
+    created_at: float = field(default_factory=time.time)
+    future: "asyncio.Future[bool]" = field(
+        default_factory=lambda: asyncio.get_running_loop().create_future(), repr=False
+    )
+    waiters: int = 1
+    """Runs waiting for this decision."""
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"id": self.id, "tool": self.tool, "input": self.input, "created_at": self.created_at}
+
+
+@dataclass
+class ApprovalStats:
+    requested: int = 0
+    policy_hits: int = 0
+    """Requests decided by the policy cache without asking."""
+    shared: int = 0
+    """Requests that joined an identical pending request."""
+    approved: int = 0
+    denied: int = 0
+    timeouts: int = 0
+    batches: int = 0
+    wait_s: float = 0.0
+    pending: int = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def tool_arguments(input: Any) -> dict[str, Any]:
+    """The tool's arguments from what the handler gets, the run parameters of the tool (`{"input": ..., ...}`)."""
+    args = input.get("input", input) if isinstance(input, Mapping) else input
+    if isinstance(args, BaseModel):
+        return args.model_dump()
+    return dict(args) if isinstance(args, Mapping) else {"input": args}
+
+
+class ApprovalPolicy:
+    """TTL-bounded cache of decisions per (tool, argument pattern)."""
+
+    def __init__(
+        self,
+        ttl: float | None = 300.0,
+        *,
+        arguments: Mapping[str, Sequence[str]] | None = None,
+        casefold: bool = False,
+        cache_denials: bool = False,
+        max_entries: int = 1024,
+    ) -> None:
+        self.ttl = ttl
+        self.arguments = {name: frozenset(keys) for name, keys in (arguments or {}).items()}
+        self.casefold = casefold
+        self.cache_denials = cache_denials
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, bool]] = OrderedDict()
+
+    def pattern(self, tool: str, input: Mapping[str, Any]) -> str:
+        keys = self.arguments.get(tool)
+        args = {key: value for key, value in input.items() if keys is None or key in keys}
+        return f"{tool}:{json.dumps(normalize_args(args, casefold=self.casefold), sort_keys=True, default=str)}"
+
+    def lookup(self, pattern: str) -> bool | None:
+        entry = self._entries.get(pattern)
+        if entry is None:
+            return None
+        expires, approved = entry
+        if expires <= time.monotonic():
+            del self._entries[pattern]
+            return None
+        self._entries.move_to_end(pattern)
+        return approved
+
+    def remember(self, pattern: str, approved: bool) -> None:
+        if not approved and not self.cache_denials:
+            return
+        self._entries[pattern] = (time.monotonic() + self.ttl if self.ttl is not None else float("inf"), approved)
+        self._entries.move_to_end(pattern)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class ApprovalQueue:
+    def __init__(
+        self, *, policy: ApprovalPolicy | None = None, timeout: float | None = None, default: bool = False
+    ) -> None:
+        self.policy = policy
+        self.timeout = timeout
+        """Seconds a run waits for a decision before `default` applies."""
+        self.default = default
+        self.stats = ApprovalStats()
+        self._pending: dict[str, ApprovalRequest] = {}
+        self._by_pattern: dict[str, ApprovalRequest] = {}
+        self._undelivered: dict[str, ApprovalRequest] = {}  # pending requests no approver has seen yet
+        self._arrived = asyncio.Event()
+        self._ids = itertools.count(1)
+
+    @property
+    def pending(self) -> list[ApprovalRequest]:
+        return list(self._pending.values())
+
+    async def ask(self, tool: AnyTool, input: dict[str, Any]) -> bool:
+        """`AskPermissionRequirement` handler: wait for a decision without blocking a thread."""
+        self.stats.requested += 1
+        input = tool_arguments(input)
+        policy = self.policy
+        pattern = policy.pattern(tool.name, input) if policy is not None else f"{tool.name}#{next(self._ids)}"
+        if policy is not None:
+            decision = policy.lookup(pattern)
+            if decision is not None:
+                self.stats.policy_hits += 1
+                return decision
+
+        request = self._by_pattern.get(pattern)
+        if request is not None:
+            request.waiters += 1
+            self.stats.shared += 1
+        else:
+            request = ApprovalRequest(id=str(next(self._ids)), tool=tool.name, input=input, pattern=pattern)
+            self._pending[request.id] = self._by_pattern[pattern] = self._undelivered[request.id] = request
+            self.stats.pending = len(self._pending)
+            self._arrived.set()
+
+        start = time.perf_counter()
+        try:
+            # shield: a cancelled run stops waiting without deciding for the other waiters
+            return await asyncio.wait_for(asyncio.shield(request.future), self.timeout)
+        except TimeoutError:
+            self.stats.timeouts += 1
+            request.waiters -= 1
+            if request.waiters == 0:
+                self._discard(request)
+            return self.default
+        finally:
+            self.stats.wait_s += time.perf_counter() - start
+
+    def resolve(self, request_id: str, approved: bool) -> bool:
+        """Decide a pending request; False if it is no longer pending."""
+        request = self._pending.get(request_id)
+        if request is None:
+            return False
+        self._discard(request)
+        if self.policy is not None:
+            self.policy.remember(request.pattern, approved)
+        if approved:
+            self.stats.approved += 1
+        else:
+            self.stats.denied += 1
+        request.future.set_result(approved)
+        return True
+
+    def resolve_many(self, decisions: Mapping[str, bool]) -> int:
+        return sum(self.resolve(request_id, approved) for request_id, approved in decisions.items())
+
+    def resolve_all(self, approved: bool) -> int:
+        return self.resolve_many(dict.fromkeys(self._pending, approved))
+
+    def _discard(self, request: ApprovalRequest) -> None:
+        self._pending.pop(request.id, None)
+        self._undelivered.pop(request.id, None)
+        if self._by_pattern.get(request.pattern) is request:
+            del self._by_pattern[request.pattern]
+        self.stats.pending = len(self._pending)
+
+    async def next_batch(self, *, max_size: int | None = None, max_wait: float = 0.0) -> list[ApprovalRequest]:
+        """Wait for requests no approver has seen yet and return them, oldest first.
+
+        After the first one arrives, waits up to `max_wait` seconds (or until
+        `max_size` are there) to collect more.
+        """
+        while not self._undelivered:
+            self._arrived.clear()
+            await self._arrived.wait()
+        if max_wait > 0:
+            deadline = time.monotonic() + max_wait
+            while max_size is None or len(self._undelivered) < max_size:
+                self._arrived.clear()
+                with contextlib.suppress(TimeoutError):
+                    await asyncio.wait_for(self._arrived.wait(), deadline - time.monotonic())
+                if time.monotonic() >= deadline:
+                    break
+        ids = list(itertools.islice(self._undelivered, max_size))
+        self.stats.batches += 1
+        return [self._undelivered.pop(request_id) for request_id in ids]
+
+    def apply(self, batch: Iterable[ApprovalRequest], decisions: Decisions) -> int:
+        if isinstance(decisions, bool):
+            return self.resolve_many({request.id: decisions for request in batch})
+        return self.resolve_many(decisions)
+
+    @contextlib.asynccontextmanager
+    async def approver(
+        self, callback: ApprovalCallback, *, max_size: int | None = None, max_wait: float = 0.05
+    ) -> AsyncIterator[None]:
+        """Decide batches with `callback` while the block runs."""
+        decide = ensure_async(callback)
+
+        async def loop() -> None:
+            while True:
+                batch = await self.next_batch(max_size=max_size, max_wait=max_wait)
+                self.apply(batch, await decide(batch))
+
+        task = asyncio.create_task(loop())
+        try:
+            yield
+        finally:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+
+async def ask_console(batch: list[ApprovalRequest]) -> bool:
+    """Ask once for the whole batch via `io_read`."""
+    lines = "\n".join(f"  [{request.id}] {request.tool} {request.input}" for request in batch)
+    response = await io_read(f"The agent wants to use these tools:\n{lines}\nDo you allow it? (yes/no): ")
+    return response.strip().startswith("yes")
+
+
+def _parse_command(queue: ApprovalQueue, verb: str, ids: Sequence[str]) -> int:
+    approved = verb in ("approve", "yes")
+    if list(ids) == ["*"]:
+        return queue.resolve_all(approved)
+    return queue.resolve_many(dict.fromkeys(ids, approved))
+
+
+def _read_from(path: Path, offset: int) -> bytes:
+    with path.open("rb") as file:
+        file.seek(offset)
+        return file.read()
+
+
+async def watch_file(
+    queue: ApprovalQueue, path: str | Path, *, pending_path: str | Path | None = None, poll_interval: float = 0.5
+) -> None:
+    """Apply `<id> yes|no` lines appended to `path` until cancelled.
+
+    With `pending_path`, the pending requests are written there as JSON lines
+    on every poll.
+    """
+    path = Path(path)
+    offset = path.stat().st_size if path.exists() else 0
+    while True:
+        if pending_path is not None:
+            records = [json.dumps(request.to_dict(), default=str) for request in queue.pending]
+            await asyncio.to_thread(Path(pending_path).write_text, "".join(f"{line}\n" for line in records))
+        if path.exists() and path.stat().st_size > offset:
+            data = await asyncio.to_thread(_read_from, path, offset)
+            end = data.rfind(b"\n") + 1  # leave a partially written line for the next poll
+            offset += end
+            for line in data[:end].decode().splitlines():
+                match line.split():
+                    case [request_id, verb]:
+                        _parse_command(queue, verb.lower(), [request_id])
+        await asyncio.sleep(poll_interval)
+
+
+async def serve_socket(queue: ApprovalQueue, *, host: str = "127.0.0.1", port: int = 0) -> asyncio.Server:
+    """Line-based TCP approvals: `pending`, `approve <id>...|*`, `deny <id>...|*`; answers `ok <count>`."""
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while line := await reader.readline():
+                match line.decode().split():
+                    case ["pending"]:
+                        for request in queue.pending:
+                            writer.write(json.dumps(request.to_dict(), default=str).encode() + b"\n")
+                        writer.write(b".\n")
+                    case [("approve" | "deny") as verb, *ids] if ids:
+                        writer.write(f"ok {_parse_command(queue, verb, ids)}\n".encode())
+                    case _:
+                        writer.write(b"error unknown command\n")
+                await writer.drain()
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
@@ -0,0 +1,395 @@
+"""Precompiled requirement automaton
+
+Every iteration, each `ConditionalRequirement` rescans the full step history
+(and `run_with_context` serializes the whole run state for its event). The
+rules only depend on a few facts about that history though: how many steps
+ran (for `force_at_step`), which tool ran last (`force_after`,
+`consecutive_allowed`), how often each source tool ran (`min_invocations`,
+`max_invocations`) and which `only_after` / `only_before` tools were seen.
+
+`RequirementAutomaton` enumerates the reachable combinations of those facts
+once, as states of a finite automaton over tool names, and stores the
+aggregated rules of every state. During a run `AutomatonRequirement` only
+follows one transition per new step, so producing the rules is a dictionary
+lookup. Because the whole state space is known upfront, rule sets that
+cannot finish (or can get stuck) are rejected when the agent is built:
+
+    agent = CompiledRequirementAgent(llm=llm, tools=[...], requirements=[...])  # may raise RequirementCompileError
+
+Requirements with `custom_checks`, `only_success_invocations=False` or that
+are not `ConditionalRequirement`s are kept and evaluated as usual.
+"""
+
+import math
+import weakref
+from collections import deque
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from typing import Any, Self
+
+from beeai_framework.agents.experimental import RequirementAgent
+from beeai_framework.agents.experimental.requirements._utils import _target_seen_in
+from beeai_framework.agents.experimental.requirements.conditional import ConditionalRequirement
+from beeai_framework.agents.experimental.requirements.requirement import Requirement, RequirementError, Rule
+from beeai_framework.agents.experimental.types import RequirementAgentRunState
+from beeai_framework.agents.experimental.utils._tool import FinalAnswerTool
+from beeai_framework.backend import ChatModel
+from beeai_framework.context import Run, RunContext
+from beeai_framework.memory import BaseMemory
+from beeai_framework.tools import AnyTool
+
+FINAL_ANSWER = FinalAnswerTool.name
+
+# (step, last tool class, capped invocation counters, seen watched tools as a bit mask)
+StateKey = tuple[int, int, tuple[int, ...], int]
+
+
+class RequirementCompileError(ValueError):
+    """The requirements contradict each other or cannot be satisfied."""
+
+
+@dataclass(frozen=True)
+class Condition:
+    """A `ConditionalRequirement` with its targets resolved to tool names."""
+
+    name: str
+    source: str
+    after: frozenset[str]
+    before: frozenset[str]
+    force_after: frozenset[str]
+    force_at_step: int | None
+    min_invocations: int
+    max_invocations: float
+    consecutive_allowed: bool
+    force_prevent_stop: bool
+    priority: int
+
+    @property
+    def counter_cap(self) -> int:
+        """Invocation counts above this value are indistinguishable."""
+        return max(self.min_invocations, 0 if math.isinf(self.max_invocations) else int(self.max_invocations))
+
+
+@dataclass
+class AutomatonState:
+    id: int
+    key: StateKey
+    rules: list[Rule]
+    forced: str | None
+    can_stop: bool
+    moves: list[int]
+    """Tool classes the agent may call next (the final answer excluded)."""
+    transitions: dict[int, int] = field(default_factory=dict)
+    conflicts: list[str] = field(default_factory=list)
+
+
+def is_compilable(requirement: Any) -> bool:
+    return (
+        isinstance(requirement, ConditionalRequirement)
+        and requirement.enabled
+        and not requirement._custom_checks
+        and requirement._only_success_invocations
+    )
+
+
+class RequirementAutomaton:
+    def __init__(
+        self, tools: Sequence[AnyTool], requirements: Sequence[Any], *, max_states: int = 100_000, check: bool = True
+    ) -> None:
+        self.compiled = [r for r in requirements if is_compilable(r)]
+        self.uncompiled = [r for r in requirements if not is_compilable(r)]
+        self.max_states = max_states
+
+        # the stand-in only serves name and class matching of `final_answer` targets
+        self._tools: list[AnyTool] = [*tools, FinalAnswerTool(None, state=None)]  # type: ignore[arg-type]
+        self.tool_names = [tool.name for tool in self._tools]
+        self.conditions = [self._resolve(requirement) for requirement in self.compiled]
+        self.priority = max((condition.priority for condition in self.conditions), default=10)
+
+        self._step_cap = max((c.force_at_step or 0 for c in self.conditions), default=0) + 1
+        self._counters = [i for i, condition in enumerate(self.conditions) if condition.counter_cap > 0]
+        watched = sorted({name for condition in self.conditions for name in condition.after | condition.before})
+        self._watched_bits = {name: 1 << i for i, name in enumerate(watched)}
+        self._classify_tools()
+
+        self.states: list[AutomatonState] = []
+        self._ids: dict[StateKey, int] = {}
+        self._rules: dict[tuple[str, bool, bool, bool], Rule] = {}
+        self._parents: dict[int, tuple[int, int] | None] = {}
+        self.initial = self._state_id((1, self._class_of[None], (0,) * len(self._counters), 0), parent=None)
+        self._explore()
+        if check:
+            self.check()
+
+    # compilation
+
+    def _resolve(self, requirement: ConditionalRequirement[Any]) -> Condition:
+        def names(targets: set[Any], role: str) -> frozenset[str]:
+            resolved = frozenset(tool.name for tool in self._tools if _target_seen_in(tool, targets))
+            if len(resolved) < len(targets):
+                # some target matched nothing, find which one for the message
+                for target in targets:
+                    if not any(_target_seen_in(tool, {target}) for tool in self._tools):
+                        raise RequirementCompileError(
+                            f"{requirement.name}: '{role}' references unknown tool {target!r}."
+                        )
+            return resolved
+
+        sources = names({requirement.source}, "source")
+        if len(sources) != 1:
+            raise RequirementCompileError(
+                f"{requirement.name}: source {requirement.source!r} matches {len(sources)} tools."
+            )
+        (source,) = sources
+        force_after = names(requirement._force_after, "force_after")
+        if requirement._consecutive_allowed and source in force_after:
+            raise RequirementCompileError(
+                f"{requirement.name}: '{source}' is forced after itself; set consecutive_allowed=False."
+            )
+
+        return Condition(
+            name=requirement.name,
+            source=source,
+            after=names(requirement._after, "only_after"),
+            before=names(requirement._before, "only_before"),
+            force_after=force_after,
+            force_at_step=requirement._force_at_step,
+            min_invocations=requirement._min_invocations,
+            max_invocations=requirement._max_invocations,
+            consecutive_allowed=requirement._consecutive_allowed,
+            force_prevent_stop=requirement._force_prevent_stop,
+            priority=requirement.priority,
+        )
+
+    def _classify_tools(self) -> None:
+        """Group tools that affect the automaton identically, so hundreds of free tools cost one transition."""
+
+        def effect(name: str | None) -> tuple[Any, ...]:
+            return (
+                tuple((name in c.force_after, name == c.source) for c in self.conditions),
+                tuple(int(name == self.conditions[i].source) for i in self._counters),
+                self._watched_bits.get(name or "", 0),
+            )
+
+        classes: dict[tuple[Any, ...], int] = {}
+        self._class_of: dict[str | None, int] = {}
+        self._class_effects: list[tuple[Any, ...]] = []
+        self._class_members: list[list[str]] = []
+        for name in [None, *self.tool_names]:
+            key = effect(name)
+            if key not in classes:
+                classes[key] = len(classes)
+                self._class_effects.append(key)
+                self._class_members.append([])
+            self._class_of[name] = classes[key]
+            if name is not None:
+                self._class_members[classes[key]].append(name)
+
+    def _successor(self, key: StateKey, tool_class: int) -> StateKey:
+        step, _, counts, seen = key
+        _, increments, bits = self._class_effects[tool_class]
+        counts = tuple(
+            min(count + inc, self.conditions[i].counter_cap)
+            for count, inc, i in zip(counts, increments, self._counters, strict=True)
+        )
+        return min(step + 1, self._step_cap), tool_class, counts, seen | bits
+
+    def _evaluate(self, key: StateKey) -> tuple[list[Rule], str | None, bool, list[int], list[str]]:
+        """Rules of a state, aggregated the way RequirementsReasoner does."""
+        step, last, counts, seen = key
+        last_flags = self._class_effects[last][0]
+        count_of = dict(zip(self._counters, counts, strict=True))
+        conflicts: list[str] = []
+
+        per_tool: dict[str, list[tuple[bool, bool, bool, int]]] = {}
+        for i, c in enumerate(self.conditions):
+            invocations = count_of.get(i, 0)
+            last_triggers, last_is_source = last_flags[i]
+            if not c.consecutive_allowed and last_is_source or invocations >= c.max_invocations:
+                allowed = False
+            elif c.after:
+                # mirrors ConditionalRequirement, which only checks `only_before` together with `only_after`
+                if any(seen & self._watched_bits[name] for name in c.before):
+                    allowed = False
+                else:
+                    allowed = all(seen & self._watched_bits[name] for name in c.after)
+            else:
+                allowed = True
+
+            if not allowed and c.force_at_step == step:
+                conflicts.append(f"{c.name}: '{c.source}' cannot be executed at step {step}")
+            forced = allowed and (last_triggers or c.force_at_step == step)
+            prevent_stop = c.min_invocations > invocations or (forced and c.force_prevent_stop)
+            per_tool.setdefault(c.source, []).append((allowed, forced, prevent_stop, c.priority))
+
+        flags: list[tuple[str, bool, bool]] = []
+        forced_tool: str | None = None
+        forced_level = 0
+        prevent_stop = False
+        disallowed: set[str] = set()
+        for name in self.tool_names:
+            entries = per_tool.get(name)
+            if not entries:
+                continue
+            is_allowed = all(entry[0] for entry in entries)
+            is_forced = any(entry[1] for entry in entries)
+            is_prevent_stop = any(entry[2] for entry in entries)
+            level = max(entry[3] for entry in entries)
+            if is_allowed and is_forced and (forced_tool is None or forced_level < level):
+                forced_tool, forced_level = name, level
+            if not is_allowed:
+                disallowed.add(name)
+            prevent_stop |= is_prevent_stop
+            flags.append((name, is_allowed, is_prevent_stop))
+        rules = [self._rule(name, allowed, name == forced_tool, stop) for name, allowed, stop in flags]
+
+        if forced_tool is not None:
+            can_stop = forced_tool == FINAL_ANSWER
+            moves = [] if can_stop else [self._class_of[forced_tool]]
+        else:
+            can_stop = FINAL_ANSWER not in disallowed and not prevent_stop
+            moves = sorted(
+                {self._class_of[name] for name in self.tool_names if name != FINAL_ANSWER and name not in disallowed}
+            )
+        return rules, forced_tool, can_stop, moves, conflicts
+
+    def _rule(self, target: str, allowed: bool, forced: bool, prevent_stop: bool) -> Rule:
+        # states share identical rules, interning them keeps large automatons small and fast to build
+        key = (target, allowed, forced, prevent_stop)
+        rule = self._rules.get(key)
+        if rule is None:
+            rule = self._rules[key] = Rule(target=target, allowed=allowed, forced=forced, prevent_stop=prevent_stop)
+        return rule
+
+    def _state_id(self, key: StateKey, *, parent: tuple[int, int] | None) -> int:
+        state_id = self._ids.get(key)
+        if state_id is not None:
+            return state_id
+        if len(self.states) >= self.max_states:
+            raise RequirementCompileError(f"The requirements produce more than {self.max_states} states.")
+
+        rules, forced, can_stop, moves, conflicts = self._evaluate(key)
+        state_id = len(self.states)
+        self.states.append(AutomatonState(state_id, key, rules, forced, can_stop, moves, conflicts=conflicts))
+        self._ids[key] = state_id
+        self._parents[state_id] = parent
+        return state_id
+
+    def _explore(self) -> None:
+        queue = deque([self.initial])
+        while queue:
+            state = self.states[queue.popleft()]
+            for tool_class in state.moves:
+                known = len(self.states)
+                target = self._state_id(self._successor(state.key, tool_class), parent=(state.id, tool_class))
+                state.transitions[tool_class] = target
+                if target >= known:
+                    queue.append(target)
+
+    # analysis
+
+    def path_to(self, state_id: int) -> list[str]:
+        """A shortest sequence of tool calls reaching the state (one representative tool per class)."""
+        path: list[str] = []
+        while (parent := self._parents.get(state_id)) is not None:
+            state_id, tool_class = parent
+            path.append(self._class_members[tool_class][0])
+        return path[::-1]
+
+    def _describe(self, state_id: int) -> str:
+        path = self.path_to(state_id)
+        return f"after {' -> '.join(path)}" if path else "at the start"
+
+    def check(self) -> None:
+        """Raise `RequirementCompileError` if a run can fail or never finish because of the rules."""
+        for state in self.states:
+            if state.conflicts:
+                raise RequirementCompileError(f"{state.conflicts[0]} ({self._describe(state.id)}).")
+            if not state.moves and not state.can_stop:
+                raise RequirementCompileError(f"No tool is allowed {self._describe(state.id)}.")
+
+        # backwards reachability from the states that can stop
+        incoming: dict[int, list[int]] = {}
+        for state in self.states:
+            for target in state.transitions.values():
+                incoming.setdefault(target, []).append(state.id)
+        finishing = {state.id for state in self.states if state.can_stop}
+        queue = deque(finishing)
+        while queue:
+            for source in incoming.get(queue.popleft(), []):
+                if source not in finishing:
+                    finishing.add(source)
+                    queue.append(source)
+
+        if self.initial not in finishing:
+            raise RequirementCompileError(
+                "The requirements can never be satisfied: no sequence of tool calls ends the run."
+            )
+        stuck = next((state.id for state in self.states if state.id not in finishing), None)
+        if stuck is not None:
+            raise RequirementCompileError(f"The requirements can no longer be satisfied {self._describe(stuck)}.")
+
+    # runtime
+
+    def step(self, state_id: int, tool_name: str) -> int:
+        """Follow the transition for a successfully executed tool."""
+        state = self.states[state_id]
+        tool_class = self._class_of.get(tool_name, self._class_of[None])
+        target = state.transitions.get(tool_class)
+        if target is None:
+            # a tool the rules did not offer (e.g. an extra parallel call), built on first use
+            target = self._state_id(self._successor(state.key, tool_class), parent=(state_id, tool_class))
+            state.transitions[tool_class] = target
+        return target
+
+
+class AutomatonRequirement(Requirement[RequirementAgentRunState]):
+    """Serves the rules of all compiled requirements from a `RequirementAutomaton`."""
+
+    def __init__(self, automaton: RequirementAutomaton) -> None:
+        super().__init__()
+        self.name = "CompiledRequirements"
+        self.automaton = automaton
+        self.priority = automaton.priority
+        # per run: (steps consumed, automaton state); keyed by the run's memory, which lives as long as the run
+        self._cursors: weakref.WeakKeyDictionary[BaseMemory, tuple[int, int]] = weakref.WeakKeyDictionary()
+
+    def current_state(self, state: RequirementAgentRunState) -> int:
+        consumed, state_id = self._cursors.get(state.memory, (0, self.automaton.initial))
+        for step in state.steps[consumed:]:
+            if step.error is None and step.tool is not None:
+                state_id = self.automaton.step(state_id, step.tool.name)
+        self._cursors[state.memory] = (len(state.steps), state_id)
+        return state_id
+
+    def run(self, state: RequirementAgentRunState) -> Run[list[Rule]]:
+        async def handler(context: RunContext) -> list[Rule]:
+            automaton_state = self.automaton.states[self.current_state(state)]
+            if automaton_state.conflicts:
+                raise RequirementError(automaton_state.conflicts[0], requirement=self)
+            return automaton_state.rules
+
+        # the iteration is enough to identify the call, dumping the whole state is what we avoid
+        return RunContext.enter(self, handler, run_params={"iteration": state.iteration}).middleware(*self.middlewares)
+
+    async def clone(self) -> Self:
+        cloned = type(self)(self.automaton)
+        cloned.enabled = self.enabled
+        return cloned
+
+
+class CompiledRequirementAgent(RequirementAgent):
+    """RequirementAgent whose `ConditionalRequirement`s are compiled (and validated) at construction."""
+
+    def __init__(
+        self,
+        *,
+        llm: ChatModel,
+        tools: Sequence[AnyTool] | None = None,
+        requirements: Sequence[Any] | None = None,
+        **kwargs: Any,
+    ) -> None:
+        automaton = RequirementAutomaton(tools or [], requirements or [])
+        compiled = [AutomatonRequirement(automaton)] if automaton.compiled else []
+        super().__init__(llm=llm, tools=tools, requirements=[*compiled, *automaton.uncompiled], **kwargs)
+        self.automaton = automaton
@@ -0,0 +1,160 @@
+"""Concurrent batch runner
+
+`BatchRunner` pushes many prompts through an agent with bounded concurrency.
+Every prompt gets a fresh agent from the factory, so memory and requirement
+state are never shared between runs. Results are yielded as they complete;
+prompts are pulled from the (possibly async, possibly endless) source only
+when a slot is free.
+
+    runner = BatchRunner(create_agent, concurrency=16)
+    async with aclosing(runner.stream(prompts)) as results:
+        async for result in results:
+            print(result.index, result.latency_s, result.output.answer.text if result.ok else result.error)
+    print(runner.stats.to_dict())
+"""
+
+import asyncio
+import inspect
+import time
+from collections.abc import AsyncGenerator, AsyncIterable, Awaitable, Callable, Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+from beeai_framework.agents import AnyAgent
+from beeai_framework.utils.cancellation import AbortController, AbortSignal, register_signals
+
+from examples.metrics import summarize
+
+AgentFactory = Callable[[], AnyAgent | Awaitable[AnyAgent]]
+
+
+@dataclass
+class BatchResult:
+    index: int
+    prompt: str
+    output: Any = None
+    error: Exception | None = None
+    latency_s: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class BatchStats:
+    completed: int = 0
+    failed: int = 0
+    wall_s: float = 0.0
+    latencies: list[float] = field(default_factory=list)
+
+    @property
+    def throughput(self) -> float:
+        """Finished runs per second of batch wall time."""
+        return (self.completed + self.failed) / self.wall_s if self.wall_s else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "completed": self.completed,
+            "failed": self.failed,
+            "wall_s": round(self.wall_s, 6),
+            "throughput_per_s": round(self.throughput, 3),
+            "latency_s": summarize(self.latencies),
+        }
+
+
+async def _iterate(prompts: Iterable[str] | AsyncIterable[str]) -> AsyncGenerator[str]:
+    if isinstance(prompts, AsyncIterable):
+        async for prompt in prompts:
+            yield prompt
+    else:
+        for prompt in prompts:
+            yield prompt
+
+
+class BatchRunner:
+    def __init__(
+        self, agent_factory: AgentFactory, *, concurrency: int = 8, run_options: dict[str, Any] | None = None
+    ) -> None:
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.agent_factory = agent_factory
+        self.concurrency = concurrency
+        self.run_options = dict(run_options or {})
+        self._signal: AbortSignal | None = self.run_options.pop("signal", None)
+        self.stats = BatchStats()
+
+    async def run_one(self, index: int, prompt: str, *, signal: AbortSignal | None = None) -> BatchResult:
+        """Run a single prompt on a fresh agent. Errors are captured in the result."""
+        start = time.perf_counter()
+        result = BatchResult(index=index, prompt=prompt)
+        try:
+            agent = self.agent_factory()
+            if inspect.isawaitable(agent):
+                agent = await agent
+            result.output = await agent.run(prompt, **{**self.run_options, "signal": signal or self._signal})
+        except Exception as e:  # noqa: BLE001 - one failing prompt must not stop the batch
+            result.error = e
+        result.latency_s = time.perf_counter() - start
+
+        self.stats.latencies.append(result.latency_s)
+        if result.ok:
+            self.stats.completed += 1
+        else:
+            self.stats.failed += 1
+        return result
+
+    async def stream(self, prompts: Iterable[str] | AsyncIterable[str]) -> AsyncGenerator[BatchResult]:
+        """Yield results in completion order. `stats` covers this call only.
+
+        Closing the generator early (e.g. `break` inside `aclosing(...)`) aborts the runs still in flight.
+        """
+        self.stats = BatchStats()
+        started = time.perf_counter()
+        controller = AbortController()
+        if self._signal is not None:
+            register_signals(controller, [self._signal])
+        results: asyncio.Queue[BatchResult | None] = asyncio.Queue()
+        slots = asyncio.Semaphore(self.concurrency)
+        running: set[asyncio.Task[None]] = set()
+
+        async def execute(index: int, prompt: str) -> None:
+            try:
+                result = await self.run_one(index, prompt, signal=controller.signal)
+            finally:
+                slots.release()
+            await results.put(result)
+
+        async def produce() -> None:
+            try:
+                index = 0
+                async for prompt in _iterate(prompts):
+                    await slots.acquire()
+                    task = asyncio.create_task(execute(index, prompt))
+                    running.add(task)
+                    task.add_done_callback(running.discard)
+                    index += 1
+                if running:
+                    # `wait` rather than `gather`, so cancelling the producer leaves the runs to the abort signal
+                    await asyncio.wait(running)
+            finally:
+                await results.put(None)
+
+        producer = asyncio.create_task(produce())
+        try:
+            while (result := await results.get()) is not None:
+                self.stats.wall_s = time.perf_counter() - started
+                yield result
+            await producer
+        finally:
+            # aborting (instead of cancelling) lets the framework tear down each run's internal tasks
+            if running:
+                controller.abort("Batch stream closed")
+            producer.cancel()
+            await asyncio.gather(producer, *running, return_exceptions=True)
+            self.stats.wall_s = time.perf_counter() - started
+
+    async def run(self, prompts: Iterable[str] | AsyncIterable[str]) -> list[BatchResult]:
+        """Run every prompt and return the results in input order."""
+        results = [result async for result in self.stream(prompts)]
+        return sorted(results, key=lambda result: result.index)
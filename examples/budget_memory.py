@@ -0,0 +1,295 @@
+"""Token-budgeted sliding-window memory
+
+The ReAct loop of example 6 adds a think step and a tool step per cycle, and
+RequirementAgent sends the whole run memory with every request, so prompt
+tokens (and with them latency and cost) grow with every iteration.
+
+`TokenBudgetMemory` keeps the full history but serves a window that fits
+`max_tokens` as its `messages`, the list the agent sends to the model:
+
+* user messages and system messages (including the `tempMessage` hints of
+  requirements) are always kept;
+* the latest `keep_last` turns (an assistant message and its tool results)
+  and turns calling a `pinned_tools` tool are kept in full;
+* older turns are collapsed, oldest first, into one summary message per run
+  of consecutive turns, with each call's arguments and the start of its
+  result; if the summaries alone are still over budget, the oldest lines are
+  dropped.
+
+Deletions apply to the full history, so the agent still removes its
+`tempMessage` messages and discarded responses as with `UnconstrainedMemory`.
+The run memory of a RequirementAgent is created inside `run()`;
+`BudgetedRequirementAgent` swaps it for a `TokenBudgetMemory` on the first
+iteration and pins the prerequisites of `ConditionalRequirement(only_after=...)`,
+whose results the later tools depend on. Its clones (the sub-agents
+`HandoffTool` and `AgentPool` run) keep the budget:
+
+    agent = BudgetedRequirementAgent(llm=llm, tools=[...], requirements=[...], max_memory_tokens=2000)
+"""
+
+from collections.abc import Collection, Sequence
+from math import ceil
+from typing import Any, Self
+
+from beeai_framework.agents.experimental import RequirementAgent
+from beeai_framework.agents.experimental.events import RequirementAgentStartEvent
+from beeai_framework.agents.experimental.types import RequirementAgentRunOutput
+from beeai_framework.backend import AnyMessage, AssistantMessage, ToolMessage
+from beeai_framework.backend.message import MessageTextContent, MessageToolCallContent, MessageToolResultContent
+from beeai_framework.context import Run
+from beeai_framework.emitter import EmitterOptions, EventMeta
+from beeai_framework.memory import BaseMemory
+from beeai_framework.tools import AnyTool
+
+from examples.agent_template import clone_agent
+from examples.parallel_tools import ToolDependencyGraph
+
+SUMMARY_META = "summarizedTurns"
+"""Meta key of summary messages: the number of turns the summary stands for."""
+
+
+def message_tokens(msg: AnyMessage) -> int:
+    """Rough token count of a message, including tool-call arguments and tool results."""
+    size = 0
+    for content in msg.content:
+        if isinstance(content, MessageTextContent):
+            size += len(content.text)
+        elif isinstance(content, MessageToolCallContent):
+            size += len(content.tool_name) + len(content.args)
+        elif isinstance(content, MessageToolResultContent):
+            size += len(str(content.result))
+    return ceil(size / 4) + 1
+
+
+def _shorten(text: str, limit: int) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else f"{text[: limit - 1]}…"
+
+
+class _Turn:
+    __slots__ = ("messages", "pinned", "summary", "tokens")
+
+    def __init__(self, messages: list[AnyMessage], pinned: bool) -> None:
+        self.messages = messages
+        self.pinned = pinned
+        self.tokens = 0
+        self.summary = ""
+
+
+class TokenBudgetMemory(BaseMemory):
+    def __init__(
+        self,
+        max_tokens: int,
+        *,
+        keep_last: int = 2,
+        pinned_tools: Collection[str] = (),
+        summary_chars: int = 80,
+    ) -> None:
+        if keep_last < 1:
+            raise ValueError("keep_last must be at least 1, the latest turn may still be waiting for tool results.")
+        self.max_tokens = max_tokens
+        self.keep_last = keep_last
+        self.pinned_tools = set(pinned_tools)
+        self.summary_chars = summary_chars
+        self.collapsed = 0
+        """Turns collapsed in the current window."""
+        self._messages: list[AnyMessage] = []
+        self._tokens: dict[int, int] = {}
+        self._summaries: dict[int, str] = {}  # summary line of a turn, by its assistant message
+        self._view: list[AnyMessage] | None = None
+
+    @property
+    def all_messages(self) -> list[AnyMessage]:
+        """The full history."""
+        return self._messages
+
+    @property
+    def messages(self) -> list[AnyMessage]:
+        """The history as sent to the model, within the token budget."""
+        if self._view is None:
+            self._view = self._window()
+        return self._view
+
+    @property
+    def tokens_used(self) -> int:
+        # summaries are rebuilt with every window, only stored messages have a cached count
+        return sum(message_tokens(msg) if msg.meta.get(SUMMARY_META) else self._count(msg) for msg in self.messages)
+
+    async def add(self, message: AnyMessage, index: int | None = None) -> None:
+        index = len(self._messages) if index is None else max(0, min(index, len(self._messages)))
+        self._messages.insert(index, message)
+        self._view = None
+
+    async def delete(self, message: AnyMessage) -> bool:
+        try:
+            self._messages.remove(message)
+        except ValueError:
+            return False
+        self._tokens.pop(id(message), None)
+        self._summaries.pop(id(message), None)
+        self._view = None
+        return True
+
+    def reset(self) -> None:
+        self._messages.clear()
+        self._tokens.clear()
+        self._summaries.clear()
+        self._view = None
+
+    async def clone(self) -> "TokenBudgetMemory":
+        cloned = TokenBudgetMemory(
+            self.max_tokens,
+            keep_last=self.keep_last,
+            pinned_tools=self.pinned_tools,
+            summary_chars=self.summary_chars,
+        )
+        cloned._messages = self._messages.copy()
+        cloned._tokens = self._tokens.copy()
+        return cloned
+
+    def _count(self, msg: AnyMessage) -> int:
+        tokens = self._tokens.get(id(msg))
+        if tokens is None:
+            tokens = self._tokens[id(msg)] = message_tokens(msg)
+        return tokens
+
+    def _segments(self) -> list[AnyMessage | _Turn]:
+        """Standalone messages and turns, in order."""
+        segments: list[AnyMessage | _Turn] = []
+        turn: _Turn | None = None
+        for msg in self._messages:
+            if isinstance(msg, AssistantMessage) and not msg.meta.get("tempMessage"):
+                pinned = bool(msg.meta.get("pinned")) or any(
+                    call.tool_name in self.pinned_tools for call in msg.get_tool_calls()
+                )
+                turn = _Turn([msg], pinned)
+                segments.append(turn)
+            elif isinstance(msg, ToolMessage) and turn is not None:
+                turn.messages.append(msg)
+            else:
+                turn = None
+                segments.append(msg)
+        return segments
+
+    def _summarize(self, turn: _Turn) -> str:
+        summary = self._summaries.get(id(turn.messages[0]))
+        if summary is None:
+            summary = self._summaries[id(turn.messages[0])] = self._describe(turn)
+        return summary
+
+    def _describe(self, turn: _Turn) -> str:
+        results = {
+            result.tool_call_id: str(result.result)
+            for msg in turn.messages[1:]
+            if isinstance(msg, ToolMessage)
+            for result in msg.get_tool_results()
+        }
+        parts = [_shorten(turn.messages[0].text, self.summary_chars)] if turn.messages[0].text.strip() else []
+        parts += [
+            f"{call.tool_name}({_shorten(call.args, self.summary_chars)}) -> "
+            f"{_shorten(results.get(call.id, ''), self.summary_chars) or '(no result)'}"
+            for call in turn.messages[0].get_tool_calls()
+        ]
+        return "- " + "; ".join(parts)
+
+    def _window(self) -> list[AnyMessage]:
+        segments = self._segments()
+        turns = [segment for segment in segments if isinstance(segment, _Turn)]
+        total = 0
+        for segment in segments:
+            if isinstance(segment, _Turn):
+                segment.tokens = sum(self._count(msg) for msg in segment.messages)
+                total += segment.tokens
+            else:
+                total += self._count(segment)
+
+        self.collapsed = 0
+        if total <= self.max_tokens:
+            return self._messages
+
+        # collapse the oldest turns first, until the window fits
+        candidates = [turn for turn in turns[: max(0, len(turns) - self.keep_last)] if not turn.pinned]
+        for turn in candidates:
+            if total <= self.max_tokens:
+                break
+            turn.summary = self._summarize(turn)
+            total += ceil(len(turn.summary) / 4) - turn.tokens
+            self.collapsed += 1
+
+        window: list[AnyMessage] = []
+        lines: list[str] = []
+        for segment in segments:
+            if isinstance(segment, _Turn) and segment.summary:
+                lines.append(segment.summary)
+                continue
+            if lines:
+                window.append(self._summary_message(lines))
+                lines = []
+            window.extend(segment.messages if isinstance(segment, _Turn) else [segment])
+        if lines:
+            window.append(self._summary_message(lines))
+
+        # still over budget: drop the oldest summary lines
+        excess = total - self.max_tokens
+        for index, msg in enumerate(window):
+            if excess <= 0:
+                break
+            if msg.meta.get(SUMMARY_META):
+                window[index], excess = self._trimmed(msg, excess)
+        return window
+
+    def _summary_message(self, lines: Sequence[str]) -> AssistantMessage:
+        return AssistantMessage(
+            f"Summary of {len(lines)} earlier steps:\n" + "\n".join(lines), {SUMMARY_META: len(lines)}
+        )
+
+    def _trimmed(self, msg: AnyMessage, excess: int) -> tuple[AssistantMessage, int]:
+        header, *lines = msg.text.split("\n")
+        dropped = 0
+        while lines and excess > 0:
+            excess -= ceil(len(lines.pop(0)) / 4)
+            dropped += 1
+        text = "\n".join([header, f"- ({dropped} older steps omitted)", *lines])
+        return AssistantMessage(text, dict(msg.meta)), excess
+
+
+class BudgetedRequirementAgent(RequirementAgent):
+    """RequirementAgent whose run memory stays within `max_memory_tokens` (the system prompt comes on top)."""
+
+    def __init__(
+        self,
+        *,
+        max_memory_tokens: int,
+        keep_last: int = 2,
+        pinned_tools: Collection[str] | None = None,
+        tools: Sequence[AnyTool] | None = None,
+        requirements: Sequence[Any] | None = None,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(tools=tools, requirements=requirements, **kwargs)
+        if pinned_tools is None:
+            graph = ToolDependencyGraph(tools or [], requirements or [])
+            pinned_tools = {name for constraints in graph.constraints.values() for name in constraints.after}
+        self.max_memory_tokens = max_memory_tokens
+        self.keep_last = keep_last
+        self.pinned_tools = set(pinned_tools)
+
+    def run(self, *args: Any, **kwargs: Any) -> Run[RequirementAgentRunOutput[Any]]:
+        # a listener on the run, not on `self.emitter`: agents built by `AgentTemplate` get a fresh emitter,
+        # and the emitter of a clone would carry a copy bound to this instance
+        run = super().run(*args, **kwargs)
+        return run.on("start", self._use_budget, EmitterOptions(is_blocking=True, match_nested=False))
+
+    async def clone(self) -> Self:
+        return await clone_agent(self)
+
+    def create_memory(self) -> TokenBudgetMemory:
+        return TokenBudgetMemory(self.max_memory_tokens, keep_last=self.keep_last, pinned_tools=self.pinned_tools)
+
+    async def _use_budget(self, data: RequirementAgentStartEvent, _: EventMeta) -> None:
+        # emitted right before the request to the model, which reads `state.memory.messages`
+        state = data.state
+        if not isinstance(state.memory, TokenBudgetMemory):
+            memory = self.create_memory()
+            await memory.add_many(state.memory.messages)
+            state.memory = memory
@@ -0,0 +1,367 @@
+"""Persistent, content-addressed LLM response cache
+
+`CachedChatModel` wraps a ChatModel and answers repeated requests from a
+two-tier cache: an in-memory LRU tier backed by an on-disk SQLite tier. Keys
+are derived from the normalized message list (tool-call ids and timestamps
+are ignored), the tool schemas, the tool choice and the model name, so they
+are stable across processes. Both tiers enforce an entry-count and a byte
+budget and evict the least recently used entries first.
+
+    llm = CachedChatModel(llm, cache=TieredCache(path=".cache/llm.sqlite"))
+    ...
+    print(llm.stats)
+"""
+
+import copy
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from collections.abc import AsyncGenerator
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Self
+
+from beeai_framework.backend import AnyMessage, AssistantMessage, ChatModel
+from beeai_framework.backend.message import MessageTextContent, MessageToolCallContent
+from beeai_framework.backend.types import ChatModelInput, ChatModelOutput, ChatModelUsage
+from beeai_framework.cache.base import BaseCache
+from beeai_framework.context import RunContext
+from beeai_framework.tools import AnyTool, Tool
+from pydantic import BaseModel
+
+from examples.wrappers import ChatModelWrapper
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    memory_evictions: int = 0
+    disk_evictions: int = 0
+    memory_entries: int = 0
+    memory_bytes: int = 0
+    disk_entries: int = 0
+    disk_bytes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {**asdict(self), "hit_rate": self.hit_rate}
+
+    def reset_counters(self) -> None:
+        """Zero hit/miss/eviction counters, keeping the size gauges."""
+        self.hits = self.memory_hits = self.disk_hits = self.misses = 0
+        self.memory_evictions = self.disk_evictions = 0
+
+
+def serialize_output(output: ChatModelOutput) -> bytes:
+    return json.dumps(
+        {
+            "messages": [[content.model_dump() for content in msg.content] for msg in output.messages],
+            "usage": output.usage.model_dump() if output.usage else None,
+            "finish_reason": output.finish_reason,
+        },
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def deserialize_output(data: bytes) -> ChatModelOutput:
+    raw = json.loads(data)
+    return ChatModelOutput(
+        messages=[
+            AssistantMessage(
+                [
+                    MessageToolCallContent.model_validate(content)
+                    if content.get("type") == "tool-call"
+                    else MessageTextContent.model_validate(content)
+                    for content in contents
+                ]
+            )
+            for contents in raw["messages"]
+        ],
+        usage=ChatModelUsage.model_validate(raw["usage"]) if raw["usage"] else None,
+        finish_reason=raw["finish_reason"],
+    )
+
+
+class TieredCache(BaseCache[list[ChatModelOutput]]):
+    """In-memory LRU tier in front of an optional SQLite tier.
+
+    Pass `path=None` for a memory-only cache. SQLite calls are synchronous;
+    they are local and short, so they run inline on the event loop.
+
+    Memory hits also count as uses of the disk row, so the disk tier does not
+    evict the hottest entries. Their access times are collected and written
+    in one batch at most every `touch_interval` seconds, before the disk tier
+    evicts, and on `close()`.
+    """
+
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        *,
+        max_memory_entries: int = 256,
+        max_memory_bytes: int = 16 * 1024 * 1024,
+        max_disk_entries: int = 100_000,
+        max_disk_bytes: int = 512 * 1024 * 1024,
+        touch_interval: float = 10.0,
+    ) -> None:
+        super().__init__()
+        self.path = Path(path) if path else None
+        self.max_memory_entries = max_memory_entries
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_entries = max_disk_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.touch_interval = touch_interval
+        self.stats = CacheStats()
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._touched: dict[str, float] = {}  # access time of memory hits not written to disk yet
+        self._touches_written = time.monotonic()
+        self._lock = threading.Lock()
+        self._db: sqlite3.Connection | None = None
+        if self.path is not None:
+            self._open(self.path)
+
+    def _open(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses "
+            "(key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        entries, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        self.stats.disk_entries, self.stats.disk_bytes = entries, size
+
+    def close(self) -> None:
+        if self._db is not None:
+            with self._lock:
+                self._write_touches()
+            self._db.close()
+            self._db = None
+
+    # raw byte access, used by CachedChatModel to skip (de)serialization round trips
+
+    def get_bytes(self, key: str) -> bytes | None:
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self.stats.hits += 1
+                self.stats.memory_hits += 1
+                if self._db is not None:
+                    self._touched[key] = time.time()
+                    if time.monotonic() - self._touches_written >= self.touch_interval:
+                        self._write_touches()
+                return value
+
+            if self._db is not None:
+                row = self._db.execute("SELECT value FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    self._db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (time.time(), key))
+                    self._touched.pop(key, None)
+                    self.stats.hits += 1
+                    self.stats.disk_hits += 1
+                    self._put_memory(key, row[0])
+                    return bytes(row[0])
+
+            self.stats.misses += 1
+            return None
+
+    def set_bytes(self, key: str, value: bytes) -> None:
+        with self._lock:
+            self._put_memory(key, value)
+            if self._db is not None:
+                self._put_disk(key, value)
+
+    def _put_memory(self, key: str, value: bytes) -> None:
+        if len(value) > self.max_memory_bytes:
+            return
+
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self.stats.memory_bytes -= len(previous)
+        self._memory[key] = value
+        self.stats.memory_bytes += len(value)
+
+        while len(self._memory) > self.max_memory_entries or self.stats.memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self.stats.memory_bytes -= len(evicted)
+            self.stats.memory_evictions += 1
+        self.stats.memory_entries = len(self._memory)
+
+    def _write_touches(self) -> None:
+        if self._touched and self._db is not None:
+            self._db.executemany(
+                "UPDATE responses SET accessed = ? WHERE key = ?", [(at, key) for key, at in self._touched.items()]
+            )
+            self._touched.clear()
+        self._touches_written = time.monotonic()
+
+    def _put_disk(self, key: str, value: bytes) -> None:
+        assert self._db is not None
+        if len(value) > self.max_disk_bytes:
+            return
+
+        previous = self._db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+        self._touched.pop(key, None)
+        self._db.execute(
+            "INSERT OR REPLACE INTO responses (key, value, size, accessed) VALUES (?, ?, ?, ?)",
+            (key, value, len(value), time.time()),
+        )
+        if previous is not None:
+            self.stats.disk_bytes -= previous[0]
+        else:
+            self.stats.disk_entries += 1
+        self.stats.disk_bytes += len(value)
+
+        while self.stats.disk_entries > self.max_disk_entries or self.stats.disk_bytes > self.max_disk_bytes:
+            self._write_touches()  # so entries used from memory since the last batch are not evicted as cold
+            overflow = max(1, self.stats.disk_entries - self.max_disk_entries)
+            rows = self._db.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed LIMIT ?) "
+                "RETURNING size",
+                (overflow,),
+            ).fetchall()
+            if not rows:
+                break
+            self.stats.disk_entries -= len(rows)
+            self.stats.disk_bytes -= sum(row[0] for row in rows)
+            self.stats.disk_evictions += len(rows)
+
+    # BaseCache interface
+
+    async def size(self) -> int:
+        return self.stats.disk_entries if self._db is not None else len(self._memory)
+
+    async def set(self, key: str, value: list[ChatModelOutput]) -> None:
+        if value:
+            self.set_bytes(key, serialize_output(ChatModelOutput.from_chunks(value)))
+
+    async def get(self, key: str) -> list[ChatModelOutput] | None:
+        data = self.get_bytes(key)
+        return [deserialize_output(data)] if data is not None else None
+
+    async def has(self, key: str) -> bool:
+        with self._lock:
+            if key in self._memory:
+                return True
+            return self._db is not None and bool(
+                self._db.execute("SELECT 1 FROM responses WHERE key = ?", (key,)).fetchone()
+            )
+
+    async def delete(self, key: str) -> bool:
+        with self._lock:
+            value = self._memory.pop(key, None)
+            if value is not None:
+                self.stats.memory_bytes -= len(value)
+                self.stats.memory_entries = len(self._memory)
+            deleted = value is not None
+            if self._db is not None:
+                row = self._db.execute("DELETE FROM responses WHERE key = ? RETURNING size", (key,)).fetchone()
+                if row is not None:
+                    self.stats.disk_entries -= 1
+                    self.stats.disk_bytes -= row[0]
+                    deleted = True
+            return deleted
+
+    async def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._touched.clear()
+            self.stats.memory_entries = self.stats.memory_bytes = 0
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self.stats.disk_entries = self.stats.disk_bytes = 0
+
+    async def clone(self) -> Self:
+        # all clones share the same storage
+        return self
+
+
+def _normalize_message(msg: AnyMessage) -> dict[str, Any]:
+    contents: list[Any] = []
+    for content in msg.content:
+        if isinstance(content, MessageToolCallContent):
+            contents.append({"tool": content.tool_name, "args": json.loads(content.args or "{}")})
+        elif isinstance(content, BaseModel):
+            contents.append(content.model_dump(exclude={"id", "tool_call_id"}))
+        else:
+            contents.append(str(content))
+    return {"role": str(msg.role), "content": contents}
+
+
+class CachedChatModel(ChatModelWrapper):
+    """ChatModel wrapper that serves repeated requests from a `TieredCache`."""
+
+    def __init__(self, llm: ChatModel, *, cache: TieredCache | None = None) -> None:
+        super().__init__(llm)
+        self.response_cache = cache or TieredCache()
+        self._tool_schemas: weakref.WeakKeyDictionary[AnyTool, dict[str, Any]] = weakref.WeakKeyDictionary()
+
+    @property
+    def stats(self) -> CacheStats:
+        return self.response_cache.stats
+
+    def _tool_schema(self, tool: AnyTool) -> dict[str, Any]:
+        schema = self._tool_schemas.get(tool)
+        if schema is None:
+            schema = {
+                "name": tool.name,
+                "description": tool.description,
+                "schema": tool.input_schema.model_json_schema(mode="validation"),
+            }
+            self._tool_schemas[tool] = schema
+        return schema
+
+    def cache_key(self, input: ChatModelInput) -> str:
+        response_format = input.response_format
+        if isinstance(response_format, type) and issubclass(response_format, BaseModel):
+            response_format = response_format.model_json_schema()
+
+        payload = {
+            "model": f"{self.llm.provider_id}:{self.llm.model_id}",
+            "parameters": self.llm.parameters.model_dump(exclude_none=True),
+            "messages": [_normalize_message(msg) for msg in input.messages],
+            "tools": [self._tool_schema(tool) for tool in input.tools or []],
+            "tool_choice": input.tool_choice.name if isinstance(input.tool_choice, Tool) else input.tool_choice,
+            "response_format": response_format,
+            "stop_sequences": input.stop_sequences,
+        }
+        encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    async def _create(self, input: ChatModelInput, run: RunContext) -> ChatModelOutput:
+        key = self.cache_key(input)
+        cached = self.response_cache.get_bytes(key)
+        if cached is not None:
+            return deserialize_output(cached)
+
+        output = await self.forward(input, stream=False)
+        self.response_cache.set_bytes(key, serialize_output(output))
+        return output
+
+    async def _create_stream(self, input: ChatModelInput, run: RunContext) -> AsyncGenerator[ChatModelOutput]:
+        key = self.cache_key(input)
+        cached = self.response_cache.get_bytes(key)
+        if cached is not None:
+            yield deserialize_output(cached)
+            return
+
+        chunks: list[ChatModelOutput] = []
+        async for chunk in self.forward_stream(input):
+            chunks.append(copy.deepcopy(chunk))  # the caller merges the yielded chunks in place
+            yield chunk
+        self.response_cache.set_bytes(key, serialize_output(ChatModelOutput.from_chunks(chunks)))
@@ -0,0 +1,327 @@
+"""Crash-safe checkpoints of agent runs
+
+A run that fails on its ninth step has to start over: every model call and
+every side-effecting tool runs again. `ResumableRequirementAgent` writes a
+`Checkpoint` after each iteration of a run started with a `checkpoint_id`
+and waits for the write before the next model call:
+
+    agent = ResumableRequirementAgent(llm=llm, tools=[...], requirements=[...], checkpoints="checkpoints/")
+    response = await agent.run("Book me a flight ...", checkpoint_id="order-42")
+
+Running the same call again (in a new process as well) while a checkpoint
+for the id exists resumes the run after the last completed iteration: its
+memory and steps are restored before any requirement is evaluated, so
+`ConditionalRequirement` counters (invocations, `only_after`) continue where
+they were, and the finished model calls and tools are not repeated. The
+checkpoint is removed once the run has its final answer.
+
+A checkpoint holds the run memory, the steps (tool, input, output text,
+error message) and the requirement counters, which are compared with the
+ones recomputed from the restored steps to detect an agent whose
+requirements changed. It is stored as zlib-compressed compact JSON behind a
+magic number, a format version and a CRC32, written to a temporary file and
+renamed over the previous one (after `fsync`, unless disabled), so a crash
+leaves the last complete checkpoint. Tool outputs come back as
+`StringToolOutput`s with the same text, which is what the model and the
+requirements read. A tool that finished in an iteration the process did not
+complete runs again on resume.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import struct
+import time
+import zlib
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from beeai_framework.agents.experimental import RequirementAgent
+from beeai_framework.agents.experimental.events import RequirementAgentSuccessEvent
+from beeai_framework.agents.experimental.requirements._utils import _target_seen_in
+from beeai_framework.agents.experimental.requirements.conditional import ConditionalRequirement
+from beeai_framework.agents.experimental.requirements.requirement import Requirement, Rule
+from beeai_framework.agents.experimental.types import (
+    RequirementAgentRunOutput,
+    RequirementAgentRunState,
+    RequirementAgentRunStateStep,
+)
+from beeai_framework.backend import AnyMessage, AssistantMessage, SystemMessage, ToolMessage, UserMessage
+from beeai_framework.backend.message import (
+    CustomMessage,
+    MessageImageContent,
+    MessageTextContent,
+    MessageToolCallContent,
+    MessageToolResultContent,
+)
+from beeai_framework.context import Run, RunContext
+from beeai_framework.emitter import EmitterOptions, EventMeta
+from beeai_framework.tools import AnyTool, StringToolOutput, ToolError
+from pydantic import BaseModel
+
+CHECKPOINT_ID = "checkpoint_id"  # key of the run context
+
+_MAGIC = b"RACP"
+_VERSION = 1
+_HEADER = struct.Struct(">4sBI")  # magic, version, CRC32 of the payload
+_SAFE_ID = re.compile(r"[\w.-]{1,100}")
+_encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+class CheckpointError(ValueError):
+    """The checkpoint is damaged or does not belong to this agent."""
+
+
+@dataclass
+class Checkpoint:
+    id: str
+    iteration: int
+    """Last completed iteration."""
+    messages: list[dict[str, Any]]
+    steps: list[dict[str, Any]]
+    counters: list[dict[str, Any]]
+    """Per `ConditionalRequirement`: successful invocations of its tool and whether `only_after` is satisfied."""
+    updated_at: float = field(default_factory=time.time)
+
+    @classmethod
+    def capture(
+        cls, checkpoint_id: str, state: RequirementAgentRunState, requirements: Sequence[Requirement[Any]]
+    ) -> "Checkpoint":
+        return cls(
+            id=checkpoint_id,
+            iteration=state.iteration,
+            messages=[encode_message(msg) for msg in state.memory.messages],
+            steps=[encode_step(step) for step in state.steps],
+            counters=requirement_counters(requirements, state.steps),
+        )
+
+    def encode(self) -> bytes:
+        payload = zlib.compress(
+            _encoder.encode(
+                {
+                    "id": self.id,
+                    "iteration": self.iteration,
+                    "messages": self.messages,
+                    "steps": self.steps,
+                    "counters": self.counters,
+                    "updated_at": self.updated_at,
+                }
+            ).encode("utf-8"),
+            level=1,  # written after every step; most of the size is gone at level 1 already
+        )
+        return _HEADER.pack(_MAGIC, _VERSION, zlib.crc32(payload)) + payload
+
+    @classmethod
+    def decode(cls, data: bytes) -> "Checkpoint":
+        if len(data) < _HEADER.size:
+            raise CheckpointError("Checkpoint is truncated.")
+        magic, version, crc = _HEADER.unpack_from(data)
+        payload = data[_HEADER.size :]
+        if magic != _MAGIC:
+            raise CheckpointError("Not a checkpoint file.")
+        if version != _VERSION:
+            raise CheckpointError(f"Unsupported checkpoint version {version}.")
+        if zlib.crc32(payload) != crc:
+            raise CheckpointError("Checkpoint is corrupted (CRC mismatch).")
+        return cls(**json.loads(zlib.decompress(payload)))
+
+    async def restore(
+        self, state: RequirementAgentRunState, tools: Sequence[AnyTool], requirements: Sequence[Requirement[Any]]
+    ) -> None:
+        """Replace the memory and steps of a fresh run state with the checkpoint's."""
+        by_name = {tool.name: tool for tool in tools}
+        steps = [decode_step(raw, by_name) for raw in self.steps]
+        counters = requirement_counters(requirements, steps)
+        if counters != self.counters:
+            raise CheckpointError(f"Checkpoint '{self.id}' was written by an agent with other requirements.")
+        state.memory.reset()
+        await state.memory.add_many([decode_message(raw) for raw in self.messages])
+        state.steps[:] = steps
+        state.iteration = self.iteration + 1  # the iteration being started
+
+
+def encode_message(msg: AnyMessage) -> dict[str, Any]:
+    meta = {key: value for key, value in msg.meta.items() if key != "createdAt"}
+    raw: dict[str, Any] = {"role": str(msg.role), "content": [content.model_dump() for content in msg.content]}
+    if meta:
+        raw["meta"] = meta
+    if msg.id is not None:
+        raw["id"] = msg.id
+    return raw
+
+
+def decode_message(raw: dict[str, Any]) -> AnyMessage:
+    role, contents, meta = raw["role"], raw["content"], raw.get("meta")
+    if role == "assistant":
+        return AssistantMessage(
+            [
+                MessageToolCallContent.model_validate(content)
+                if content.get("type") == "tool-call"
+                else MessageTextContent.model_validate(content)
+                for content in contents
+            ],
+            meta,
+            id=raw.get("id"),
+        )
+    if role == "tool":
+        return ToolMessage([MessageToolResultContent.model_validate(content) for content in contents], meta)
+    if role == "user":
+        return UserMessage(
+            [
+                MessageImageContent.model_validate(content)
+                if content.get("type") == "image_url"
+                else MessageTextContent.model_validate(content)
+                for content in contents
+            ],
+            meta,
+        )
+    if role == "system":
+        return SystemMessage([MessageTextContent.model_validate(content) for content in contents], meta)
+    return CustomMessage(role, contents, meta)
+
+
+def encode_step(step: RequirementAgentRunStateStep) -> dict[str, Any]:
+    return {
+        "id": step.id,
+        "iteration": step.iteration,
+        "tool": step.tool.name if step.tool is not None else None,
+        "input": step.input.model_dump() if isinstance(step.input, BaseModel) else step.input,
+        "output": step.output.get_text_content(),
+        "error": step.error.message if step.error is not None else None,
+    }
+
+
+def decode_step(raw: dict[str, Any], tools: dict[str, AnyTool]) -> RequirementAgentRunStateStep:
+    tool = None
+    if raw["tool"] is not None:
+        tool = tools.get(raw["tool"])
+        if tool is None:
+            raise CheckpointError(f"Checkpoint step uses tool '{raw['tool']}', which the agent does not have.")
+    return RequirementAgentRunStateStep(
+        id=raw["id"],
+        iteration=raw["iteration"],
+        tool=tool,
+        input=raw["input"],
+        output=StringToolOutput(raw["output"]),
+        error=ToolError(raw["error"]) if raw["error"] is not None else None,
+    )
+
+
+def requirement_counters(
+    requirements: Sequence[Requirement[Any]], steps: Sequence[RequirementAgentRunStateStep]
+) -> list[dict[str, Any]]:
+    used = [step.tool for step in steps if step.tool is not None and step.error is None]
+    return [
+        {
+            "requirement": requirement.name,
+            "invocations": sum(1 for tool in used if _target_seen_in(tool, {requirement.source})),
+            "only_after": all(any(_target_seen_in(tool, {target}) for tool in used) for target in requirement._after),
+        }
+        for requirement in requirements
+        if isinstance(requirement, ConditionalRequirement)
+    ]
+
+
+class CheckpointStore:
+    """One file per checkpoint id in `directory`."""
+
+    def __init__(self, directory: str | Path, *, fsync: bool = True) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.fsync = fsync
+
+    def path(self, checkpoint_id: str) -> Path:
+        name = (
+            checkpoint_id
+            if _SAFE_ID.fullmatch(checkpoint_id)
+            else hashlib.blake2b(checkpoint_id.encode(), digest_size=16).hexdigest()
+        )
+        return self.directory / f"{name}.ckpt"
+
+    def save(self, checkpoint: Checkpoint) -> int:
+        """Atomically replace the checkpoint's file; returns the bytes written."""
+        data = checkpoint.encode()
+        path = self.path(checkpoint.id)
+        tmp = path.with_suffix(".tmp")
+        with tmp.open("wb") as file:
+            file.write(data)
+            if self.fsync:
+                file.flush()
+                os.fsync(file.fileno())
+        os.replace(tmp, path)
+        return len(data)
+
+    def load(self, checkpoint_id: str) -> Checkpoint | None:
+        path = self.path(checkpoint_id)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        return Checkpoint.decode(data)
+
+    def delete(self, checkpoint_id: str) -> None:
+        self.path(checkpoint_id).unlink(missing_ok=True)
+
+
+class _CheckpointRestore(Requirement[RequirementAgentRunState]):
+    """First requirement of a `ResumableRequirementAgent`: restores the checkpoint of a resumed run."""
+
+    def __init__(self, store: CheckpointStore) -> None:
+        super().__init__()
+        self.name = "checkpoint_restore"
+        self.store = store
+        self._pending: dict[str, tuple[Checkpoint, list[AnyTool]]] = {}  # agent run id -> checkpoint to restore
+
+    async def init(self, *, tools: list[AnyTool], ctx: RunContext) -> None:
+        await super().init(tools=tools, ctx=ctx)
+        self._pending.pop(ctx.run_id, None)
+        checkpoint_id = ctx.context.get(CHECKPOINT_ID)
+        if checkpoint_id is not None:
+            checkpoint = await asyncio.to_thread(self.store.load, checkpoint_id)
+            if checkpoint is not None:
+                self._pending[ctx.run_id] = (checkpoint, list(tools))
+
+    # evaluated before the other requirements of the first iteration, which then see the restored steps
+    async def run(self, state: RequirementAgentRunState) -> list[Rule]:  # type: ignore[override]
+        if self._pending:
+            context = RunContext.get()
+            pending = self._pending.pop(context.run_id, None)
+            if pending is not None:
+                checkpoint, tools = pending
+                await checkpoint.restore(state, tools, context.instance._requirements)
+        return []
+
+
+class ResumableRequirementAgent(RequirementAgent):
+    """RequirementAgent that checkpoints runs started with a `checkpoint_id` and resumes them."""
+
+    def __init__(
+        self,
+        *,
+        checkpoints: CheckpointStore | str | Path,
+        requirements: Sequence[Requirement[RequirementAgentRunState]] | None = None,
+        **kwargs: Any,
+    ) -> None:
+        self.checkpoints = checkpoints if isinstance(checkpoints, CheckpointStore) else CheckpointStore(checkpoints)
+        super().__init__(requirements=[_CheckpointRestore(self.checkpoints), *(requirements or [])], **kwargs)
+
+    def run(  # type: ignore[override]
+        self, prompt: str | None = None, *, checkpoint_id: str | None = None, **kwargs: Any
+    ) -> Run[RequirementAgentRunOutput[Any]]:
+        run = super().run(prompt, **kwargs)
+        if checkpoint_id is None:
+            return run
+
+        async def on_success(data: RequirementAgentSuccessEvent, _: EventMeta) -> None:
+            if data.state.answer is not None:
+                await asyncio.to_thread(self.checkpoints.delete, checkpoint_id)
+            else:
+                checkpoint = Checkpoint.capture(checkpoint_id, data.state, self._requirements)
+                await asyncio.to_thread(self.checkpoints.save, checkpoint)
+
+        # blocking: the next model call (and tool) waits until the iteration is on disk
+        return run.context({CHECKPOINT_ID: checkpoint_id}).on("success", on_success, EmitterOptions(is_blocking=True))
@@ -0,0 +1,516 @@
+"""Tool output compaction
+
+`get_sales_data` of example 8 returns a table as free text and
+`log_reviewer` of example 10 would return whole logs. Whatever a tool returns
+is added to the run memory and re-sent to the model with every later request.
+`compact` stacks on `@tool` (or wraps any tool instance, e.g. a `memoize`d
+one) and runs the output text through a pipeline of compactors before the
+agent sees it:
+
+    @compact(TableSummary(), TextCap(max_chars=2000), readable=True)
+    @tool
+    def get_sales_data() -> str: ...
+
+    agent = RequirementAgent(llm=llm, tools=[get_sales_data, ReadOutputTool()], ...)
+
+* `TableSummary` parses tabular text (CSV or TSV, Markdown tables, JSON
+  records, or `label: value name, value name | ...` lists like the one of
+  example 8) into columns and replaces it with totals, means, extremes and
+  growth rates per numeric column, per group when a text column has few
+  distinct values;
+* `TextCap` keeps the first and last lines of oversized text;
+* each compactor gets the output of the previous one and can pass (`None`);
+  outputs shorter than `min_chars` are left alone.
+
+The compacted text ends with a note of the original size. With
+`readable=True`, for agents that have `ReadOutputTool`, the full output is
+kept in an `OutputStore` and the note names its handle, which
+`ReadOutputTool` reads back in chunks; without it, the note does not point
+the model at a tool it cannot call. Requirements see the compacted text, as
+the model does, and whatever the model reads back comes through
+`ReadOutputTool`, so checks such as `PiiRequirement` still see every byte the
+model gets.
+"""
+
+import copy
+import csv
+import hashlib
+import itertools
+import json
+import re
+import time
+import typing
+from collections import OrderedDict
+from collections.abc import Callable, Sequence
+from dataclasses import asdict, dataclass
+from math import ceil
+from typing import Any, Protocol, Self
+
+from beeai_framework.context import RunContext
+from beeai_framework.emitter import Emitter
+from beeai_framework.tools import AnyTool, StringToolOutput, Tool, ToolError, ToolOutput, ToolRunOptions
+from beeai_framework.utils.strings import to_safe_word
+from pydantic import BaseModel, Field
+
+_NUMBER = re.compile(r"([-+]?)([$€£]?)(\d[\d,]*(?:\.\d+)?|\.\d+)([kKmMbB%]?)")
+_SCALES = {"": 1.0, "%": 1.0, "k": 1e3, "m": 1e6, "b": 1e9}
+_FIELD = re.compile(
+    rf"^(?:(?P<name1>[^:=]+?)\s*[:=]\s*(?P<value1>{_NUMBER.pattern})|(?P<value2>{_NUMBER.pattern})\s+(?P<name2>.+))$"
+)
+
+
+class Compactor(Protocol):
+    def __call__(self, text: str) -> str | None:
+        """The compacted text, or `None` to leave the text as it is."""
+        ...
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of a text, as `budget_memory.message_tokens` counts it."""
+    return ceil(len(text) / 4)
+
+
+@dataclass
+class CompactionStats:
+    calls: int = 0
+    compacted: int = 0
+    chars_in: int = 0
+    chars_out: int = 0
+    tokens_in: int = 0
+    tokens_out: int = 0
+    compact_s: float = 0.0
+
+    @property
+    def tokens_saved(self) -> int:
+        """Estimated tokens saved each time the outputs are sent to the model."""
+        return self.tokens_in - self.tokens_out
+
+    def to_dict(self) -> dict[str, Any]:
+        return {**asdict(self), "tokens_saved": self.tokens_saved}
+
+
+@dataclass
+class _Unit:
+    currency: str = ""
+    suffix: str = ""
+
+    @property
+    def scale(self) -> float:
+        return _SCALES[self.suffix.lower()]
+
+    def format(self, value: float) -> str:
+        scaled = value / self.scale
+        text = f"{scaled:,.2f}".rstrip("0").rstrip(".") if self.suffix or scaled != int(scaled) else f"{scaled:,.0f}"
+        sign = "-" if text.startswith("-") else ""
+        return f"{sign}{self.currency}{text.lstrip('-')}{self.suffix}"
+
+
+def parse_number(cell: str) -> tuple[float, _Unit] | None:
+    """`"$2.1M"` -> `(2_100_000.0, _Unit("$", "M"))`; `None` if the cell is not a number."""
+    match = _NUMBER.fullmatch(cell.strip())
+    if match is None:
+        return None
+    sign, currency, digits, suffix = match.groups()
+    unit = _Unit(currency, suffix)
+    value = float(digits.replace(",", "")) * unit.scale
+    return (-value if sign == "-" else value), unit
+
+
+def _growth(first: float, last: float) -> str:
+    return f"{(last - first) / abs(first) * 100:+.1f}%" if first else "n/a"
+
+
+class TableSummary:
+    """Replaces tabular text with aggregates per numeric column; passes on anything else."""
+
+    def __init__(self, *, min_rows: int = 5, max_groups: int = 12) -> None:
+        self.min_rows = min_rows
+        self.max_groups = max_groups
+
+    def __call__(self, text: str) -> str | None:
+        table = self.parse(text)
+        if table is None:
+            return None
+        header, rows = table
+        if len(rows) < self.min_rows:
+            return None
+        return self.summarize(header, rows)
+
+    def parse(self, text: str) -> tuple[list[str], list[list[str]]] | None:
+        """Header and rows of the table in `text`, or `None` if it is not tabular."""
+        text = text.strip()
+        for parse in (self._parse_json, self._parse_markdown, self._parse_delimited, self._parse_records):
+            table = parse(text)
+            if table is not None:
+                return table
+        return None
+
+    def summarize(self, header: list[str], rows: list[list[str]]) -> str | None:
+        """Aggregates of the numeric columns, or `None` if there are none."""
+        columns = list(zip(*rows, strict=True))
+        numeric: dict[int, tuple[list[float], _Unit]] = {}
+        for index, column in enumerate(columns):
+            parsed = [parse_number(cell) for cell in column]
+            if all(cell is not None for cell in parsed):
+                values = [cell[0] for cell in parsed if cell is not None]
+                numeric[index] = values, next(cell[1] for cell in parsed if cell is not None)
+        if not numeric:
+            return None
+
+        text_columns = [index for index in range(len(columns)) if index not in numeric]
+        labels = [row[text_columns[0]] if text_columns else f"row {number + 1}" for number, row in enumerate(rows)]
+        group_by = next(
+            (
+                index
+                for index in text_columns
+                if 1 < len(set(columns[index])) <= self.max_groups and len(set(columns[index])) < len(rows)
+            ),
+            None,
+        )
+        lines = [f"Table of {len(rows)} rows ({labels[0]} … {labels[-1]}), columns: {', '.join(header)} [summarized]"]
+        for index, (values, unit) in numeric.items():
+            lowest = min(range(len(values)), key=values.__getitem__)
+            highest = max(range(len(values)), key=values.__getitem__)
+            parts = [] if unit.suffix == "%" else [f"total {unit.format(sum(values))}"]
+            parts += [
+                f"mean {unit.format(sum(values) / len(values))}",
+                f"min {unit.format(values[lowest])} ({labels[lowest]})",
+                f"max {unit.format(values[highest])} ({labels[highest]})",
+            ]
+            if group_by is None:
+                changes = [_growth(a, b) for a, b in itertools.pairwise(values)]
+                parts.append(f"first→last {_growth(values[0], values[-1])}")
+                if len(changes) <= 8:
+                    parts.append(f"per row {' '.join(changes)}")
+            lines.append(f"{header[index]}: {', '.join(parts)}")
+
+        if group_by is not None:
+            groups: dict[str, list[int]] = {}
+            for number, row in enumerate(rows):
+                groups.setdefault(row[group_by], []).append(number)
+            lines.append(f"by {header[group_by]} (total, first→last):")
+            for group, members in groups.items():
+                totals = []
+                for index, (values, unit) in numeric.items():
+                    selected = [values[member] for member in members]
+                    total = "" if unit.suffix == "%" else f"{unit.format(sum(selected))} "
+                    totals.append(f"{header[index]} {total}({_growth(selected[0], selected[-1])})")
+                lines.append(f"  {group}: {', '.join(totals)}")
+        return "\n".join(lines)
+
+    @staticmethod
+    def _parse_json(text: str) -> tuple[list[str], list[list[str]]] | None:
+        if not text.startswith("["):
+            return None
+        try:
+            records = json.loads(text)
+        except ValueError:
+            return None
+        if not records or not all(isinstance(record, dict) for record in records):
+            return None
+        header = list(dict.fromkeys(key for record in records for key in record))
+        return header, [[str(record.get(key, "")) for key in header] for record in records]
+
+    @staticmethod
+    def _parse_markdown(text: str) -> tuple[list[str], list[list[str]]] | None:
+        lines = [line.strip() for line in text.splitlines() if line.strip()]
+        if len(lines) < 3 or not all(line.startswith("|") for line in lines):
+            return None
+        rows = [[cell.strip() for cell in line.strip("|").split("|")] for line in lines]
+        if not all(set(cell) <= set("-: ") for cell in rows[1]):
+            return None
+        header, body = rows[0], rows[2:]
+        return (header, body) if all(len(row) == len(header) for row in body) else None
+
+    @staticmethod
+    def _parse_delimited(text: str) -> tuple[list[str], list[list[str]]] | None:
+        lines = text.splitlines()
+        if len(lines) < 3:
+            return None
+        delimiter = "\t" if "\t" in lines[0] else ","
+        rows = list(csv.reader(lines, delimiter=delimiter))
+        if len(rows[0]) < 2 or any(len(row) != len(rows[0]) for row in rows):
+            return None
+        header = [cell.strip() for cell in rows[0]]
+        if any(parse_number(cell) is not None for cell in header):
+            return None
+        return header, [[cell.strip() for cell in row] for row in rows[1:]]
+
+    @staticmethod
+    def _parse_records(text: str) -> tuple[list[str], list[list[str]]] | None:
+        records = [record.strip() for record in re.split(r"\s+\|\s+|\n", text) if record.strip()]
+        if len(records) < 2:
+            return None
+        header: list[str] = []
+        rows: list[list[str]] = []
+        for record in records:
+            label, _, fields = record.partition(": ")
+            # `Q1: $2.1M revenue, 15,400 units` has a label, `revenue: $2.1M, units: 15,400` has none
+            cells = _parse_fields(fields, {"label": label}) if ", " not in label else None
+            cells = cells or _parse_fields(record, {})
+            if cells is None:
+                return None
+            if not header:
+                header = list(cells)
+            elif list(cells) != header:
+                return None
+            rows.append(list(cells.values()))
+        return header, rows
+
+
+def _parse_fields(text: str, cells: dict[str, str]) -> dict[str, str] | None:
+    """`{**cells, name: value}` for the `value name` or `name: value` fields of `text`."""
+    for field in text.split(", "):
+        match = _FIELD.match(field.strip())
+        if match is None:
+            return None
+        cells[(match["name1"] or match["name2"]).strip()] = match["value1"] or match["value2"]
+    return cells
+
+
+class TextCap:
+    """Keeps the first and last lines of text longer than `max_chars`."""
+
+    def __init__(self, max_chars: int = 2000, *, head: float = 0.6) -> None:
+        if not 0 < head <= 1:
+            raise ValueError("head must be in (0, 1].")
+        self.max_chars = max_chars
+        self.head = head
+
+    def __call__(self, text: str) -> str | None:
+        if len(text) <= self.max_chars:
+            return None
+        head_budget = int(self.max_chars * self.head)
+        tail_budget = self.max_chars - head_budget
+        lines = text.splitlines(keepends=True)
+
+        head_end, size = 0, 0
+        while head_end < len(lines) and size + len(lines[head_end]) <= head_budget:
+            size += len(lines[head_end])
+            head_end += 1
+        tail_start, size = len(lines), 0
+        while tail_start > head_end and size + len(lines[tail_start - 1]) <= tail_budget:
+            tail_start -= 1
+            size += len(lines[tail_start])
+
+        if head_end == 0 and tail_start == len(lines):
+            # a single long line (or lines longer than the budget): cut inside the text
+            omitted = len(text) - head_budget - tail_budget
+            return f"{text[:head_budget]}\n… {omitted:,} chars omitted …\n{text[len(text) - tail_budget :]}"
+        omitted_lines = lines[head_end:tail_start]
+        marker = f"… {len(omitted_lines):,} lines ({sum(map(len, omitted_lines)):,} chars) omitted …\n"
+        return "".join(lines[:head_end]) + marker + "".join(lines[tail_start:])
+
+
+class OutputStore:
+    """Full texts of compacted tool outputs by handle, the least recently used evicted beyond `max_entries`."""
+
+    def __init__(self, max_entries: int = 256) -> None:
+        self.max_entries = max_entries
+        self._texts: OrderedDict[str, str] = OrderedDict()
+
+    def put(self, text: str) -> str:
+        handle = f"out_{hashlib.blake2b(text.encode(), digest_size=6).hexdigest()}"
+        self._texts[handle] = text
+        self._texts.move_to_end(handle)
+        while len(self._texts) > self.max_entries:
+            self._texts.popitem(last=False)
+        return handle
+
+    def get(self, handle: str) -> str | None:
+        text = self._texts.get(handle)
+        if text is not None:
+            self._texts.move_to_end(handle)
+        return text
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+
+_shared_store: OutputStore | None = None
+
+
+def shared_store() -> OutputStore:
+    """The process-wide store used by compacted tools and `ReadOutputTool` created without one."""
+    global _shared_store
+    if _shared_store is None:
+        _shared_store = OutputStore()
+    return _shared_store
+
+
+class CompactedToolOutput(ToolOutput):
+    """Output of a compacted tool: the compacted text, with the tool's own output kept as `original`."""
+
+    def __init__(self, original: ToolOutput, text: str, handle: str | None, original_chars: int) -> None:
+        super().__init__()
+        self.original = original
+        self.text = text
+        self.handle = handle
+        self.original_chars = original_chars
+
+    def get_text_content(self) -> str:
+        return self.text
+
+    def is_empty(self) -> bool:
+        return False
+
+    def to_json_safe(self) -> Any:
+        return {
+            "compacted": {"handle": self.handle, "chars": self.original_chars, "compacted_chars": len(self.text)},
+            "output": self.text,
+        }
+
+
+class CompactedTool(Tool[BaseModel, ToolRunOptions, ToolOutput]):
+    """Tool wrapper passing the tool's output text through `compactors` before it reaches the agent.
+
+    With `readable`, full outputs are stored and the compacted text names
+    their handle for `ReadOutputTool`. The wrapped tool's `_run` is called
+    directly, its own emitter events and middlewares are skipped. Clones share
+    the store and the statistics.
+    """
+
+    def __init__(
+        self,
+        tool: AnyTool,
+        compactors: Sequence[Compactor],
+        *,
+        min_chars: int = 500,
+        readable: bool = False,
+        store: OutputStore | None = None,
+        options: dict[str, Any] | None = None,
+    ) -> None:
+        super().__init__(options)
+        self.tool = tool
+        self.compactors = list(compactors)
+        self.min_chars = min_chars
+        self.readable = readable
+        self.store = store or shared_store()
+        self.stats = CompactionStats()
+
+    @property
+    def name(self) -> str:
+        return self.tool.name
+
+    @property
+    def description(self) -> str:
+        return self.tool.description
+
+    @property
+    def input_schema(self) -> type[BaseModel]:
+        return self.tool.input_schema
+
+    def _create_emitter(self) -> Emitter:
+        return Emitter.root().child(namespace=["tool", "compacted", to_safe_word(self.name)], creator=self)
+
+    def compact(self, text: str) -> str | None:
+        """The compacted text, or `None` when no compactor shortened it."""
+        if len(text) < self.min_chars:
+            return None
+        compacted = text
+        for compactor in self.compactors:
+            compacted = compactor(compacted) or compacted
+        if len(compacted) >= len(text):
+            return None
+        return compacted
+
+    async def _run(self, input: BaseModel, options: ToolRunOptions | None, context: RunContext) -> ToolOutput:
+        output = await self.tool._run(input, options, context)
+        text = output.get_text_content()
+        start = time.perf_counter()
+        compacted = self.compact(text)
+        self.stats.calls += 1
+        self.stats.chars_in += len(text)
+        self.stats.tokens_in += estimate_tokens(text)
+        if compacted is None:
+            self.stats.chars_out += len(text)
+            self.stats.tokens_out += estimate_tokens(text)
+            self.stats.compact_s += time.perf_counter() - start
+            return output
+
+        handle = None
+        if self.readable:
+            handle = self.store.put(text)
+            compacted += (
+                f"\n[compacted from {len(text):,} chars; read_tool_output(handle={handle!r}) for the full output]"
+            )
+        else:
+            compacted += f"\n[compacted from {len(text):,} chars]"
+        self.stats.compacted += 1
+        self.stats.chars_out += len(compacted)
+        self.stats.tokens_out += estimate_tokens(compacted)
+        self.stats.compact_s += time.perf_counter() - start
+        return CompactedToolOutput(output, compacted, handle, len(text))
+
+    async def clone(self) -> Self:
+        cloned = copy.copy(self)
+        cloned.__dict__.pop("emitter", None)
+        cloned.middlewares = list(self.middlewares)
+        return cloned
+
+
+class ReadOutputInput(BaseModel):
+    handle: str = Field(description="Handle of the compacted output, e.g. 'out_0123456789ab'.")
+    chunk: int = Field(default=0, ge=0, description="Index of the chunk to read, starting at 0.")
+
+
+class ReadOutputTool(Tool[ReadOutputInput, ToolRunOptions, StringToolOutput]):
+    """Reads the full output of a compacted tool call back, `chunk_chars` at a time."""
+
+    name = "read_tool_output"
+    description = "Read the full output of an earlier tool call that was compacted, one chunk at a time."
+    input_schema = ReadOutputInput
+
+    def __init__(
+        self, store: OutputStore | None = None, *, chunk_chars: int = 4000, options: dict[str, Any] | None = None
+    ) -> None:
+        super().__init__(options)
+        self.store = store or shared_store()
+        self.chunk_chars = chunk_chars
+
+    def _create_emitter(self) -> Emitter:
+        return Emitter.root().child(namespace=["tool", "read_tool_output"], creator=self)
+
+    async def _run(
+        self, input: ReadOutputInput, options: ToolRunOptions | None, context: RunContext
+    ) -> StringToolOutput:
+        text = self.store.get(input.handle)
+        if text is None:
+            raise ToolError(f"Output '{input.handle}' is not available (unknown or evicted).")
+        chunks = max(1, ceil(len(text) / self.chunk_chars))
+        if input.chunk >= chunks:
+            raise ToolError(f"Output '{input.handle}' has {chunks} chunks, there is no chunk {input.chunk}.")
+        start = input.chunk * self.chunk_chars
+        return StringToolOutput(f"[chunk {input.chunk} of 0..{chunks - 1}]\n{text[start : start + self.chunk_chars]}")
+
+    async def clone(self) -> Self:
+        cloned = type(self)(self.store, chunk_chars=self.chunk_chars, options=self._options)
+        cloned.middlewares = list(self.middlewares)
+        return cloned
+
+
+@typing.overload
+def compact(
+    tool: AnyTool,
+    /,
+    *compactors: Compactor,
+    min_chars: int = ...,
+    readable: bool = ...,
+    store: OutputStore | None = ...,
+) -> CompactedTool: ...
+@typing.overload
+def compact(
+    *compactors: Compactor, min_chars: int = ..., readable: bool = ..., store: OutputStore | None = ...
+) -> Callable[[AnyTool], CompactedTool]: ...
+def compact(*args: Any, min_chars: int = 500, readable: bool = False, store: OutputStore | None = None) -> Any:
+    """Compact a tool's output; use as `@compact(*compactors)` above `@tool` or call `compact(tool, *compactors)`.
+
+    Pass `readable=True` when the agent has `ReadOutputTool`, to keep the full outputs and name their handles.
+    """
+    if args and isinstance(args[0], Tool):
+        return CompactedTool(args[0], args[1:], min_chars=min_chars, readable=readable, store=store)
+
+    def wrap(inner: AnyTool) -> CompactedTool:
+        return CompactedTool(inner, args, min_chars=min_chars, readable=readable, store=store)
+
+    return wrap
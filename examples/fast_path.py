@@ -0,0 +1,98 @@
+"""Skip the model when the requirements already decide the next step
+
+When the active rules leave the agent no choice (the request's `tool_choice`
+is a single tool, e.g. `force_at_step` or `force_after`), the model only
+serves to fill in the arguments. `FastPathChatModel` answers such requests
+itself whenever the arguments can be derived without the model:
+
+- the tool takes no required arguments (`{}`, defaults apply), or
+- its only required argument is a string that is the user's request itself
+  (`task` or `prompt`, see `PROMPT_ARGUMENTS`), which receives the task from
+  the latest user message.
+
+Arguments such as `query` usually hold something the model extracts from the
+task (example 4's rephrase gets "New York City", not the whole sentence), so
+they are left to the model; pass `prompt_arguments` to opt in other names
+for tools that really take the task verbatim.
+
+The response is a regular assistant tool call, so the agent records the
+step exactly as if the model had chosen it. Everything else is forwarded
+to the inner model. The behaviour is opt-in (`LLM_FAST_PATH=1`).
+"""
+
+from collections.abc import AsyncGenerator
+from typing import Any
+
+from beeai_framework.agents.experimental.utils._tool import FinalAnswerTool
+from beeai_framework.backend import AssistantMessage, ChatModel, UserMessage
+from beeai_framework.backend.message import MessageToolCallContent
+from beeai_framework.backend.types import ChatModelInput, ChatModelOutput
+from beeai_framework.context import RunContext
+from beeai_framework.tools import AnyTool, Tool
+from beeai_framework.utils.strings import generate_random_string, to_json
+
+from examples.wrappers import ChatModelWrapper
+
+TASK_PREFIX = "Your task: "  # last line of RequirementAgent's task prompt
+PROMPT_ARGUMENTS = frozenset({"task", "prompt"})
+
+
+def latest_task(input: ChatModelInput) -> str | None:
+    """Text of the latest user message, without the task prompt's context preamble."""
+    msg = next((msg for msg in reversed(input.messages) if isinstance(msg, UserMessage)), None)
+    if msg is None:
+        return None
+    text = msg.text
+    _, found, task = text.rpartition(TASK_PREFIX)
+    return task if found else text
+
+
+class FastPathChatModel(ChatModelWrapper):
+    def __init__(self, llm: ChatModel, *, prompt_arguments: frozenset[str] = PROMPT_ARGUMENTS) -> None:
+        super().__init__(llm)
+        self.prompt_arguments = prompt_arguments
+        self.hits = 0
+        self.misses = 0
+
+    def derive_arguments(self, tool: AnyTool, input: ChatModelInput) -> dict[str, Any] | None:
+        """Arguments for the forced tool, or None when only the model can provide them."""
+        required = [(name, field) for name, field in tool.input_schema.model_fields.items() if field.is_required()]
+        if not required:
+            return {}
+        if len(required) == 1:
+            name, field = required[0]
+            task = latest_task(input)
+            if task and field.annotation is str and name in self.prompt_arguments:
+                return {name: task}
+        return None
+
+    def shortcut(self, input: ChatModelInput) -> ChatModelOutput | None:
+        tool = input.tool_choice
+        if not isinstance(tool, Tool) or isinstance(tool, FinalAnswerTool):
+            self.misses += 1
+            return None
+
+        args = self.derive_arguments(tool, input)
+        if args is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        call = MessageToolCallContent(
+            id=f"call_{generate_random_string(8).lower()}",
+            tool_name=tool.name,
+            args=to_json(args, sort_keys=False),
+        )
+        return ChatModelOutput(messages=[AssistantMessage(call, {"fastPath": True})], finish_reason="tool_calls")
+
+    async def _create(self, input: ChatModelInput, run: RunContext) -> ChatModelOutput:
+        return self.shortcut(input) or await self.forward(input, stream=False)
+
+    async def _create_stream(self, input: ChatModelInput, run: RunContext) -> AsyncGenerator[ChatModelOutput]:
+        output = self.shortcut(input)
+        if output is not None:
+            yield output
+            return
+
+        async for chunk in self.forward_stream(input):
+            yield chunk
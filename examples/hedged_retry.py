@@ -0,0 +1,182 @@
+"""Hedged rephrase-and-search
+
+Example 4 retries serially: search, get an empty result, rephrase, search
+again, so every failed attempt costs another rephrase call, another search
+and two more model turns. In the hedged mode the retry asks the model for
+several rephrasings at once, as parallel calls of the search tool in a single
+turn, and the calls race each other:
+
+    search = HedgedTool(wikipedia_search_tool)
+    search_limit = ConditionalRequirement(search, max_invocations=3)
+    agent = ParallelRequirementAgent(
+        llm=llm,
+        tools=[search],
+        requirements=[HedgedRetry(search, fan_out=3, limit=search_limit), search_limit],
+    )
+
+* `HedgedRetry` forces the search tool after an empty result and asks for as
+  many rephrasings as the `max_invocations` of its `limit` still allows,
+  counting the calls that requirement counts;
+* `HedgedTool` runs the calls of the same turn as a race: the first
+  non-empty result wins and the other executions are cancelled (calls that
+  start after the race is decided do not run at all). Losing calls answer
+  with a short note instead of an empty result, so they do not trigger
+  another retry.
+
+Every hedged call is still a separate agent step, so `ConditionalRequirement`
+counts it, and `ParallelRequirementAgent` drops the calls of a turn that
+would exceed `max_invocations`.
+"""
+
+import asyncio
+import copy
+from collections.abc import Sequence
+from dataclasses import asdict, dataclass
+from typing import Any, Self
+
+from beeai_framework.agents.experimental.requirements.conditional import ConditionalRequirement
+from beeai_framework.agents.experimental.requirements.requirement import Rule
+from beeai_framework.agents.experimental.types import RequirementAgentRunState
+from beeai_framework.backend import SystemMessage
+from beeai_framework.context import RunContext
+from beeai_framework.emitter import Emitter
+from beeai_framework.tools import AnyTool, StringToolOutput, Tool, ToolOutput, ToolRunOptions
+from beeai_framework.utils.strings import to_json, to_safe_word
+from pydantic import BaseModel
+
+from examples.incremental import IncrementalRequirement, StepView
+
+
+@dataclass
+class HedgeStats:
+    calls: int = 0
+    wins: int = 0
+    """Races decided by a non-empty result."""
+    cancelled: int = 0
+    """Executions cancelled because another call of the turn won."""
+    skipped: int = 0
+    """Calls that started after their race was decided and did not run."""
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class _Race:
+    __slots__ = ("cancelled", "members", "winner")
+
+    def __init__(self) -> None:
+        self.members: set[asyncio.Task[ToolOutput]] = set()
+        self.cancelled: set[asyncio.Task[ToolOutput]] = set()
+        self.winner: str | None = None
+
+
+class HedgedTool(Tool[BaseModel, ToolRunOptions, ToolOutput]):
+    """Tool wrapper that races the concurrent calls of one agent turn and keeps the first non-empty result.
+
+    Calls belong to the same race when they run at the same time under the
+    same parent run (the agent run that issued them).
+    """
+
+    def __init__(
+        self,
+        tool: AnyTool,
+        *,
+        skipped: str = "Not needed: the parallel call with {winner} already found a result.",
+        options: dict[str, Any] | None = None,
+    ) -> None:
+        super().__init__(options)
+        self.tool = tool
+        self.skipped = skipped
+        self.stats = HedgeStats()
+        self._races: dict[str, _Race] = {}
+
+    @property
+    def name(self) -> str:
+        return self.tool.name
+
+    @property
+    def description(self) -> str:
+        return self.tool.description
+
+    @property
+    def input_schema(self) -> type[BaseModel]:
+        return self.tool.input_schema
+
+    def _create_emitter(self) -> Emitter:
+        return Emitter.root().child(namespace=["tool", "hedged", to_safe_word(self.name)], creator=self)
+
+    async def _run(self, input: BaseModel, options: ToolRunOptions | None, context: RunContext) -> ToolOutput:
+        self.stats.calls += 1
+        key = context.parent_id or context.run_id
+        race = self._races.setdefault(key, _Race())
+        if race.winner is not None:
+            self.stats.skipped += 1
+            return StringToolOutput(self.skipped.format(winner=race.winner))
+
+        task = asyncio.ensure_future(self.tool._run(input, options, context))
+        race.members.add(task)
+        try:
+            output = await task
+        except asyncio.CancelledError:
+            current = asyncio.current_task()
+            if task not in race.cancelled or (current is not None and current.cancelling()):
+                raise
+            return StringToolOutput(self.skipped.format(winner=race.winner))
+        finally:
+            race.members.discard(task)
+            if not race.members and self._races.get(key) is race:
+                del self._races[key]
+
+        if race.winner is None and not output.is_empty():
+            race.winner = to_json(input.model_dump(), sort_keys=False)
+            self.stats.wins += 1
+            for other in race.members:
+                other.cancel()
+                race.cancelled.add(other)
+                self.stats.cancelled += 1
+        return output
+
+    async def clone(self) -> Self:
+        cloned = copy.copy(self)
+        cloned.__dict__.pop("emitter", None)
+        cloned.middlewares = list(self.middlewares)
+        cloned._races = {}
+        return cloned
+
+
+class HedgedRetry(IncrementalRequirement):
+    """After an empty search result, forces the search tool and asks for several rephrasings in parallel."""
+
+    def __init__(
+        self, target_tool: AnyTool, *, fan_out: int = 3, limit: ConditionalRequirement[Any] | None = None
+    ) -> None:
+        super().__init__()
+        if fan_out < 1:
+            raise ValueError("fan_out must be at least 1.")
+        self.target_tool = target_tool
+        self.fan_out = fan_out
+        self.limit = limit
+
+    async def check(self, state: RequirementAgentRunState, steps: Sequence[StepView]) -> list[Rule]:
+        searches = [step for step in steps if step.tool_name == self.target_tool.name and not step.failed]
+        if not searches or any(step.text != "" for step in searches):
+            return []
+
+        count = self.fan_out
+        if self.limit is not None:
+            # the calls the limit counts, failed ones only with `only_success_invocations=False`
+            counted = [s for s in state.steps if not s.error] if self.limit._only_success_invocations else state.steps
+            used = sum(1 for step in counted if step.tool is not None and step.tool.name == self.target_tool.name)
+            count = min(count, self.limit._max_invocations - used)
+        if count < 1:
+            return []
+
+        tried = ", ".join(to_json(step.step.input, sort_keys=False) for step in searches)
+        await state.memory.add(
+            SystemMessage(
+                f"The search with {tried} returned nothing. Call {self.target_tool.name} {count} times in parallel "
+                f"in your next response, each call with a different rephrasing of the query.",
+                {"tempMessage": True},
+            )
+        )
+        return [Rule(target=self.target_tool.name, forced=True)]
@@ -0,0 +1,230 @@
+"""Local stand-in for the OpenMeteo and Wikipedia APIs
+
+A small HTTP/1.1 server (keep-alive, no dependencies) answering the
+endpoints the HTTP tools of `examples/http_tools.py` call, with made-up but
+deterministic data and the latency of a remote API, so tool throughput and
+connection reuse can be measured offline:
+
+* `GET /v1/search?name=...`: OpenMeteo geocoding;
+* `GET /v1/forecast?latitude=...&longitude=...`: OpenMeteo forecast;
+* `GET /w/api.php?action=query&list=search&srsearch=...`: Wikipedia search;
+* `GET /stats`: connections accepted and requests served so far.
+
+Every response takes `latency` seconds plus an exponentially distributed
+`jitter`; the first request on a new connection takes another `handshake`
+seconds, standing in for the TCP and TLS setup a reused connection saves.
+
+    async with StandInServer(latency=0.05) as server:
+        weather = OpenMeteoWeatherTool(geocoding_url=server.url, forecast_url=server.url)
+
+or, in a process of its own:
+
+    python -m examples.http_standin --port 8080 --latency 0.05
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import zlib
+from dataclasses import asdict, dataclass
+from typing import Any, Self
+from urllib.parse import parse_qs, urlsplit
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found"}
+
+
+@dataclass
+class StandInStats:
+    connections: int = 0
+    open_connections: int = 0
+    requests: int = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def _fraction(*parts: Any) -> float:
+    """A deterministic number in [0, 1) derived from the parts."""
+    return zlib.crc32(json.dumps(parts).encode()) / 2**32
+
+
+def geocode(name: str) -> dict[str, Any]:
+    return {
+        "results": [
+            {
+                "name": name.strip().title(),
+                "latitude": round(_fraction("lat", name.casefold()) * 140 - 70, 4),
+                "longitude": round(_fraction("lon", name.casefold()) * 360 - 180, 4),
+                "country": "Standinia",
+            }
+        ]
+        if name.strip()
+        else []
+    }
+
+
+def forecast(latitude: str, longitude: str) -> dict[str, Any]:
+    def value(name: str, low: float, high: float) -> float:
+        return round(low + _fraction(name, latitude, longitude) * (high - low), 1)
+
+    return {
+        "latitude": float(latitude),
+        "longitude": float(longitude),
+        "current_units": {
+            "temperature_2m": "°C",
+            "relative_humidity_2m": "%",
+            "wind_speed_10m": "km/h",
+            "rain": "mm",
+        },
+        "current": {
+            "temperature_2m": value("temperature", -10, 35),
+            "relative_humidity_2m": value("humidity", 20, 95),
+            "wind_speed_10m": value("wind", 0, 40),
+            "rain": value("rain", 0, 4),
+        },
+    }
+
+
+def search(query: str) -> dict[str, Any]:
+    title = query.strip().title()
+    hits = [
+        {
+            "title": title,
+            "pageid": zlib.crc32(title.encode()),
+            "snippet": f'<span class="searchmatch">{title}</span> is a topic with an article of '
+            f"{int(_fraction('size', title) * 90_000) + 1000} bytes on this stand-in wiki.",
+        }
+    ]
+    return {"query": {"searchinfo": {"totalhits": 1 if title else 0}, "search": hits if title else []}}
+
+
+class StandInServer:
+    """OpenMeteo and Wikipedia stand-in listening on `host`:`port` (0 picks a free port)."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        *,
+        latency: float = 0.05,
+        jitter: float = 0.02,
+        handshake: float = 0.05,
+        seed: int = 0,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.handshake = handshake
+        self.stats = StandInStats()
+        self._random = random.Random(seed)
+        self._server: asyncio.Server | None = None
+        self._connections: dict[asyncio.StreamWriter, asyncio.Task[None]] = {}
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        # end idle keep-alive connections instead of leaving their handlers to be cancelled
+        handlers = list(self._connections.values())
+        for writer in self._connections:
+            writer.close()
+        await asyncio.gather(*handlers, return_exceptions=True)
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        assert self._server is not None
+        await self._server.serve_forever()
+
+    async def __aenter__(self) -> Self:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *_: object) -> None:
+        await self.close()
+
+    def respond(self, path: str, query: dict[str, str]) -> tuple[int, Any]:
+        if path == "/v1/search":
+            return 200, geocode(query.get("name", ""))
+        if path == "/v1/forecast":
+            if "latitude" not in query or "longitude" not in query:
+                return 400, {"error": True, "reason": "Parameter 'latitude' and 'longitude' are required"}
+            return 200, forecast(query["latitude"], query["longitude"])
+        if path == "/w/api.php":
+            return 200, search(query.get("srsearch", ""))
+        if path == "/stats":
+            return 200, self.stats.to_dict()
+        return 404, {"error": True, "reason": f"No route for {path}"}
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.stats.connections += 1
+        self.stats.open_connections += 1
+        self._connections[writer] = asyncio.current_task()  # type: ignore[assignment]
+        delay = self.handshake
+        try:
+            while request_line := await reader.readline():
+                headers: dict[str, str] = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                if length := int(headers.get("content-length", 0)):
+                    await reader.readexactly(length)
+
+                _, target, version = request_line.decode("latin-1").split(" ", 2)
+                url = urlsplit(target)
+                query = {name: values[0] for name, values in parse_qs(url.query).items()}
+                if url.path != "/stats":
+                    self.stats.requests += 1
+                    delay += self.latency + (self._random.expovariate(1 / self.jitter) if self.jitter else 0.0)
+                    await asyncio.sleep(delay)
+                    delay = 0.0
+                status, payload = self.respond(url.path, query)
+
+                body = json.dumps(payload).encode()
+                keep_alive = headers.get("connection", "").lower() != "close" and version.strip() == "HTTP/1.1"
+                writer.write(
+                    f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode()
+                    + body
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            self.stats.open_connections -= 1
+            self._connections.pop(writer, None)
+            writer.close()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080, help="0 picks a free port")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per response")
+    parser.add_argument("--jitter", type=float, default=0.02, help="mean of the random extra latency")
+    parser.add_argument("--handshake", type=float, default=0.05, help="extra seconds for a new connection")
+    args = parser.parse_args()
+
+    server = StandInServer(args.host, args.port, latency=args.latency, jitter=args.jitter, handshake=args.handshake)
+    await server.start()
+    print(f"Serving on {server.url}", flush=True)
+    await server.serve_forever()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,325 @@
+"""HTTP tools over a shared, pooled client
+
+The tools of the examples return canned strings. Real ones, like the
+framework's `OpenMeteoTool`, open a new `httpx.AsyncClient` (a new TCP and
+TLS connection) for every request, and a sync function tool doing I/O blocks
+the event loop, with it every other run. `HttpTool` is the base of tools
+whose work is HTTP requests; all of them go through one process-wide
+`HttpClient`:
+
+    weather = OpenMeteoWeatherTool()             # uses shared_client()
+    search = WikipediaSearchTool(client=HttpClient(max_per_host=4))
+
+* keep-alive connections are pooled and reused across tools and runs, up to
+  `max_connections` (`max_keepalive` of them idle);
+* at most `max_per_host` requests per host are in flight at once, further
+  ones wait for a slot;
+* `timeout` bounds a request including the wait for a slot;
+* concurrent identical GET requests are coalesced: the first one is sent, the
+  others wait for its response. A cancelled caller stops waiting without
+  cancelling the request the others share.
+
+Failed requests surface as a `ToolError`. `OpenMeteoWeatherTool` and
+`WikipediaSearchTool` are drop-in replacements for the `weather_tool` and
+`wikipedia_search_tool` of the examples; point them at the stand-in server of
+`examples/http_standin.py` to run offline.
+"""
+
+import asyncio
+import copy
+import html
+import re
+from abc import abstractmethod
+from dataclasses import asdict, dataclass
+from typing import Any, Self, TypeVar
+
+import httpx
+from beeai_framework.context import RunContext
+from beeai_framework.emitter import Emitter
+from beeai_framework.tools import StringToolOutput, Tool, ToolError, ToolOutput, ToolRunOptions
+from beeai_framework.utils.strings import to_safe_word
+from pydantic import BaseModel, Field
+
+GEOCODING_URL = "https://geocoding-api.open-meteo.com"
+FORECAST_URL = "https://api.open-meteo.com"
+WIKIPEDIA_URL = "https://en.wikipedia.org/w/api.php"
+USER_AGENT = "beeai-requirement-agent-examples"
+
+_COALESCED_METHODS = frozenset({"GET", "HEAD"})
+_TAGS = re.compile(r"<[^>]+>")
+
+InputT = TypeVar("InputT", bound=BaseModel)
+
+
+@dataclass
+class HttpClientStats:
+    requests: int = 0
+    """Requests sent; coalesced ones are not counted."""
+    coalesced: int = 0
+    """Requests answered with the response of an identical request in flight."""
+    connections: int = 0
+    """Connections opened."""
+    host_waits: int = 0
+    """Requests that waited for a slot because their host was at `max_per_host`."""
+    timeouts: int = 0
+    errors: int = 0
+    in_flight: int = 0
+
+    @property
+    def connection_reuse(self) -> float:
+        """Share of the sent requests that did not open a connection."""
+        return 1 - self.connections / self.requests if self.requests else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {**asdict(self), "connection_reuse": self.connection_reuse}
+
+
+class HttpClient:
+    """Pooled keep-alive HTTP client with per-host concurrency limits and request coalescing."""
+
+    def __init__(
+        self,
+        *,
+        max_connections: int = 100,
+        max_keepalive: int = 20,
+        keepalive_expiry: float = 30.0,
+        max_per_host: int = 10,
+        timeout: float = 10.0,
+        connect_timeout: float = 5.0,
+        coalesce: bool = True,
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        if max_per_host < 1:
+            raise ValueError("max_per_host must be at least 1.")
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.max_per_host = max_per_host
+        self.coalesce = coalesce
+        self.headers = {"User-Agent": USER_AGENT, **(headers or {})}
+        self.stats = HttpClientStats()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._http: httpx.AsyncClient | None = None
+        self._hosts: dict[str, asyncio.Semaphore] = {}
+        self._in_flight: dict[str, asyncio.Future[httpx.Response]] = {}
+
+    def _client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._http is None or self._loop is not loop:
+            # connections and semaphores belong to the event loop they were created in; a client used from
+            # a new loop (another `asyncio.run`) starts over, the old connections died with their loop
+            self._loop = loop
+            self._hosts = {}
+            self._in_flight = {}
+            self._http = httpx.AsyncClient(
+                limits=self.limits,
+                timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+                headers=self.headers,
+            )
+        return self._http
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        params: dict[str, Any] | None = None,
+        headers: dict[str, str] | None = None,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """Send a request; identical GET and HEAD requests in flight share one response."""
+        client = self._client()
+        request = client.build_request(
+            method, url, params=params, headers=headers, extensions={"trace": self._trace}, **kwargs
+        )
+        if not self.coalesce or request.method not in _COALESCED_METHODS:
+            return await self._send(client, request)
+
+        key = f"{request.method} {request.url} {sorted(headers.items()) if headers else ''}"
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.stats.coalesced += 1
+        else:
+            # a task of its own, so cancelling the first caller does not fail the callers waiting for it
+            future = self._in_flight[key] = asyncio.ensure_future(self._send(client, request))
+            future.add_done_callback(lambda done: self._settle(key, done))
+        # shield: a cancelled caller stops waiting without cancelling the shared request
+        return await asyncio.shield(future)
+
+    async def get(
+        self, url: str, *, params: dict[str, Any] | None = None, headers: dict[str, str] | None = None
+    ) -> httpx.Response:
+        return await self.request("GET", url, params=params, headers=headers)
+
+    async def get_json(
+        self, url: str, *, params: dict[str, Any] | None = None, headers: dict[str, str] | None = None
+    ) -> Any:
+        """GET a JSON document; raises `httpx.HTTPStatusError` for error responses."""
+        response = await self.get(url, params=params, headers=headers)
+        response.raise_for_status()
+        return response.json()
+
+    async def aclose(self) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    async def _send(self, client: httpx.AsyncClient, request: httpx.Request) -> httpx.Response:
+        host = request.url.netloc.decode()
+        slots = self._hosts.get(host)
+        if slots is None:
+            slots = self._hosts[host] = asyncio.Semaphore(self.max_per_host)
+        self.stats.requests += 1
+        try:
+            async with asyncio.timeout(self.timeout):
+                if slots.locked():
+                    self.stats.host_waits += 1
+                async with slots:
+                    self.stats.in_flight += 1
+                    try:
+                        return await client.send(request)
+                    finally:
+                        self.stats.in_flight -= 1
+        except (TimeoutError, httpx.TimeoutException):
+            self.stats.timeouts += 1
+            raise
+        except httpx.HTTPError:
+            self.stats.errors += 1
+            raise
+
+    def _settle(self, key: str, future: asyncio.Future[httpx.Response]) -> None:
+        if self._in_flight.get(key) is future:
+            del self._in_flight[key]
+        # retrieve the error even when every caller has been cancelled
+        if not future.cancelled():
+            future.exception()
+
+    async def _trace(self, event: str, info: dict[str, Any]) -> None:
+        if event == "connection.connect_tcp.complete":
+            self.stats.connections += 1
+
+
+_shared_client: HttpClient | None = None
+
+
+def shared_client() -> HttpClient:
+    """The process-wide client used by HTTP tools created without one."""
+    global _shared_client
+    if _shared_client is None:
+        _shared_client = HttpClient()
+    return _shared_client
+
+
+class HttpTool(Tool[InputT, ToolRunOptions, ToolOutput]):
+    """Base of tools doing their work over HTTP; subclasses implement `fetch` with `self.client`.
+
+    Clones (e.g. made for handoff sub-agents) share the client.
+    """
+
+    def __init__(self, *, client: HttpClient | None = None, options: dict[str, Any] | None = None) -> None:
+        super().__init__(options)
+        self._client = client
+
+    @property
+    def client(self) -> HttpClient:
+        return self._client or shared_client()
+
+    def _create_emitter(self) -> Emitter:
+        return Emitter.root().child(namespace=["tool", "http", to_safe_word(self.name)], creator=self)
+
+    @abstractmethod
+    async def fetch(self, input: InputT, context: RunContext) -> ToolOutput:
+        pass
+
+    async def _run(self, input: InputT, options: ToolRunOptions | None, context: RunContext) -> ToolOutput:
+        try:
+            return await self.fetch(input, context)
+        except (httpx.HTTPError, TimeoutError) as error:
+            raise ToolError(f"Request of {self.name} failed: {error!r}", cause=error) from error
+
+    async def clone(self) -> Self:
+        cloned = copy.copy(self)
+        cloned.__dict__.pop("emitter", None)
+        cloned.middlewares = list(self.middlewares)
+        return cloned
+
+
+class WeatherInput(BaseModel):
+    location: str = Field(description="Name of the location, e.g. a city.")
+
+
+class OpenMeteoWeatherTool(HttpTool[WeatherInput]):
+    """Current weather from OpenMeteo: geocodes the location, then fetches the forecast."""
+
+    name = "weather_tool"
+    description = "Tool to fetch weather data from OpenMeteo API."
+    input_schema = WeatherInput
+
+    def __init__(
+        self,
+        *,
+        geocoding_url: str = GEOCODING_URL,
+        forecast_url: str = FORECAST_URL,
+        client: HttpClient | None = None,
+        options: dict[str, Any] | None = None,
+    ) -> None:
+        super().__init__(client=client, options=options)
+        self.geocoding_url = geocoding_url.rstrip("/")
+        self.forecast_url = forecast_url.rstrip("/")
+
+    async def fetch(self, input: WeatherInput, context: RunContext) -> ToolOutput:
+        places = await self.client.get_json(
+            f"{self.geocoding_url}/v1/search", params={"name": input.location, "count": 1, "format": "json"}
+        )
+        if not places.get("results"):
+            return StringToolOutput(f"Location '{input.location}' was not found.")
+        place = places["results"][0]
+
+        weather = await self.client.get_json(
+            f"{self.forecast_url}/v1/forecast",
+            params={
+                "latitude": place["latitude"],
+                "longitude": place["longitude"],
+                "current": "temperature_2m,relative_humidity_2m,wind_speed_10m,rain",
+                "timezone": "UTC",
+            },
+        )
+        current, units = weather["current"], weather["current_units"]
+        return StringToolOutput(
+            f"Weather for {place['name']}: {current['temperature_2m']}{units['temperature_2m']}, "
+            f"humidity {current['relative_humidity_2m']}{units['relative_humidity_2m']}, "
+            f"wind {current['wind_speed_10m']} {units['wind_speed_10m']}, rain {current['rain']} {units['rain']}"
+        )
+
+
+class SearchInput(BaseModel):
+    query: str = Field(description="Search query.")
+
+
+class WikipediaSearchTool(HttpTool[SearchInput]):
+    """Best matching Wikipedia page for a query; an empty result when nothing matches."""
+
+    name = "wikipedia_search_tool"
+    description = "Tool to search Wikipedia."
+    input_schema = SearchInput
+
+    def __init__(
+        self, *, api_url: str = WIKIPEDIA_URL, client: HttpClient | None = None, options: dict[str, Any] | None = None
+    ) -> None:
+        super().__init__(client=client, options=options)
+        self.api_url = api_url
+
+    async def fetch(self, input: SearchInput, context: RunContext) -> ToolOutput:
+        found = await self.client.get_json(
+            self.api_url,
+            params={"action": "query", "list": "search", "srsearch": input.query, "srlimit": 1, "format": "json"},
+        )
+        hits = found.get("query", {}).get("search", [])
+        if not hits:
+            return StringToolOutput("")
+        snippet = html.unescape(_TAGS.sub("", hits[0]["snippet"]))
+        return StringToolOutput(f"Wikipedia page for '{hits[0]['title']}': {snippet}")
@@ -0,0 +1,102 @@
+"""Incremental evaluation for custom requirements
+
+The agent runs every requirement once per iteration with the complete run
+state. A requirement that inspects `state.steps[-1]` re-reads (and, for JSON
+outputs, re-serializes) a tool output on every iteration, and silently skips
+steps whenever several tools ran since its previous call (parallel calls or
+iterations in which it was not consulted).
+
+`IncrementalRequirement` keeps a cursor per run and passes `check()` only the
+steps appended since its previous call, each wrapped in a `StepView` whose
+text is computed once per tool output and shared by all requirements. The
+cost of a check is proportional to the new output, not to the history, and
+no step is ever missed:
+
+    class NoEmptyResults(IncrementalRequirement):
+        async def check(self, state, steps):
+            if any(step.tool_name == "search" and not step.text for step in steps):
+                return [Rule(target="rephrase", forced=True)]
+            return []
+"""
+
+import copy
+import weakref
+from abc import abstractmethod
+from collections.abc import Sequence
+from typing import Self
+
+from beeai_framework.agents.experimental.requirements.requirement import Requirement, Rule
+from beeai_framework.agents.experimental.types import RequirementAgentRunState, RequirementAgentRunStateStep
+from beeai_framework.memory import BaseMemory
+from beeai_framework.tools import ToolOutput
+
+_texts: weakref.WeakKeyDictionary[ToolOutput, str] = weakref.WeakKeyDictionary()
+
+
+def output_text(output: ToolOutput) -> str:
+    """Text content of a tool output, computed once per output object."""
+    text = _texts.get(output)
+    if text is None:
+        text = _texts[output] = output.get_text_content()
+    return text
+
+
+class StepView:
+    """Read-only view of one agent step with a cached text of its output."""
+
+    __slots__ = ("index", "step")
+
+    def __init__(self, index: int, step: RequirementAgentRunStateStep) -> None:
+        self.index = index
+        self.step = step
+
+    @property
+    def tool_name(self) -> str | None:
+        return self.step.tool.name if self.step.tool is not None else None
+
+    @property
+    def failed(self) -> bool:
+        return self.step.error is not None
+
+    @property
+    def text(self) -> str:
+        return output_text(self.step.output)
+
+    def __repr__(self) -> str:
+        return f"StepView(index={self.index}, tool_name={self.tool_name!r}, failed={self.failed})"
+
+
+class IncrementalRequirement(Requirement[RequirementAgentRunState]):
+    """Requirement that is handed only the steps appended since its previous run."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        if not getattr(self, "name", None):
+            self.name = type(self).__name__
+        # per run: number of steps already checked; keyed by the run's memory, which lives as long as the run
+        self._cursors: weakref.WeakKeyDictionary[BaseMemory, int] = weakref.WeakKeyDictionary()
+
+    @abstractmethod
+    async def check(self, state: RequirementAgentRunState, steps: Sequence[StepView]) -> list[Rule]:
+        """Rules for the current iteration, given the steps that are new since the previous call."""
+
+    def new_steps(self, state: RequirementAgentRunState) -> list[StepView]:
+        """Advance the cursor of the run and return the steps it moved over."""
+        consumed = self._cursors.get(state.memory, 0)
+        if consumed > len(state.steps):
+            # the history was replaced (e.g. a restored run), start over
+            consumed = 0
+        self._cursors[state.memory] = len(state.steps)
+        return [StepView(index, state.steps[index]) for index in range(consumed, len(state.steps))]
+
+    # a plain coroutine like the hand-written requirements, a traced run would cost more than the check itself
+    async def run(self, state: RequirementAgentRunState) -> list[Rule]:  # type: ignore[override]
+        return await self.check(state, self.new_steps(state))
+
+    async def clone(self) -> Self:
+        cloned = copy.copy(self)
+        cloned.__dict__.pop("emitter", None)
+        cloned.state = self.state.copy()
+        cloned.middlewares = self.middlewares.copy()
+        cloned._cursors = weakref.WeakKeyDictionary()
+        return cloned
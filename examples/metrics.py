@@ -0,0 +1,121 @@
+"""Run metrics middleware
+
+Collects wall time spent in model calls, tool calls, requirement checks and
+agent runs, plus the number of agent iterations. Attach it to a single run
+with `.middleware(RunMetrics())` or to every run in the process with
+`RunMetrics().observe(Emitter.root())`.
+
+Times are inclusive: a `HandoffTool` call also contains the model and tool
+time of the sub-agent it delegates to.
+"""
+
+import math
+import statistics
+import time
+from collections.abc import Callable, Sequence
+from typing import Any
+
+from beeai_framework.agents import BaseAgent
+from beeai_framework.agents.experimental.events import RequirementAgentSuccessEvent
+from beeai_framework.agents.experimental.requirements.requirement import Requirement
+from beeai_framework.backend import ChatModel
+from beeai_framework.context import RunContext, RunMiddlewareProtocol
+from beeai_framework.emitter import Emitter, EmitterOptions, EventMeta
+from beeai_framework.tools import Tool
+
+CATEGORIES: dict[str, type] = {"agent": BaseAgent, "llm": ChatModel, "tool": Tool, "requirement": Requirement}
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile, `q` in [0, 100]."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(q / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def summarize(values: Sequence[float]) -> dict[str, float]:
+    if not values:
+        return {}
+    return {
+        "mean": statistics.fmean(values),
+        "min": min(values),
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": max(values),
+    }
+
+
+def categorize(meta: EventMeta) -> str | None:
+    """Map an internal run event to one of the metric categories."""
+    target = meta.creator.instance if isinstance(meta.creator, RunContext) else meta.creator
+    return next((name for name, kind in CATEGORIES.items() if isinstance(target, kind)), None)
+
+
+class RunMetrics(RunMiddlewareProtocol):
+    def __init__(self) -> None:
+        super().__init__()
+        self.durations: dict[str, float] = {}
+        self.calls: dict[str, int] = {}
+        self.iterations = 0
+        self._started: dict[str, tuple[str, float]] = {}
+        self._cleanups: list[Callable[[], None]] = []
+        self.reset()
+
+    def reset(self) -> None:
+        self.durations = dict.fromkeys(CATEGORIES, 0.0)
+        self.calls = dict.fromkeys(CATEGORIES, 0)
+        self.iterations = 0
+        self._started.clear()
+
+    def bind(self, ctx: RunContext) -> None:
+        self.observe(ctx.emitter)
+
+    def observe(self, emitter: Emitter) -> Callable[[], None]:
+        """Start collecting events from the emitter. Returns a cleanup function."""
+        options = EmitterOptions(match_nested=True, is_blocking=True, persistent=True)
+        cleanups = [
+            emitter.match(
+                lambda event: event.name in ("start", "finish") and bool(event.context.get("internal")),
+                self._on_internal,
+                options,
+            ),
+            emitter.match(lambda event: event.name == "success", self._on_success, options),
+        ]
+        self._cleanups.extend(cleanups)
+
+        def cleanup() -> None:
+            for fn in cleanups:
+                fn()
+
+        return cleanup
+
+    def close(self) -> None:
+        while self._cleanups:
+            self._cleanups.pop()()
+
+    def _on_internal(self, _: Any, meta: EventMeta) -> None:
+        if not meta.trace:
+            return
+
+        if meta.name == "start":
+            category = categorize(meta)
+            if category is not None:
+                self._started[meta.trace.run_id] = (category, time.perf_counter())
+        elif started := self._started.pop(meta.trace.run_id, None):
+            category, start = started
+            self.durations[category] += time.perf_counter() - start
+            self.calls[category] += 1
+
+    def _on_success(self, data: Any, _: EventMeta) -> None:
+        if isinstance(data, RequirementAgentSuccessEvent):
+            self.iterations += 1
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "iterations": self.iterations,
+            **{f"{name}_s": round(value, 6) for name, value in self.durations.items()},
+            **{f"{name}_calls": value for name, value in self.calls.items()},
+        }
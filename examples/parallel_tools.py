@@ -0,0 +1,279 @@
+"""Parallel execution of independent tool calls
+
+RequirementAgent runs every tool call of a single model response
+concurrently, but it evaluates the requirements once per turn, so calls made
+in the same turn are never checked against each other (and most providers
+only return one call per turn unless asked for more).
+
+`ToolDependencyGraph` derives the ordering constraints between tools from the
+agent's `ConditionalRequirement`s (`only_after`, `only_before`, `force_after`,
+`max_invocations`, `consecutive_allowed`). `DependencyAwareChatModel` asks the
+model for parallel tool calls and keeps only the calls of a response that are
+independent of each other; a call that must wait for another call of the
+same turn, or that would exceed its invocation limit (and a final answer
+sent alongside other calls), is dropped so the model can request it again in
+a later turn. `ParallelRequirementAgent` wires both
+into a RequirementAgent, and `ToolOverlapTimings` shows per step how much wall
+time the overlap saved.
+
+    agent = ParallelRequirementAgent(llm=llm, tools=[...], requirements=[...])
+    timings = ToolOverlapTimings()
+    await agent.run("...").middleware(timings)
+    print(timings.saved_s)
+"""
+
+import copy
+import time
+from collections import Counter
+from collections.abc import AsyncGenerator, Callable, Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+from beeai_framework.agents.experimental import RequirementAgent
+from beeai_framework.agents.experimental.events import RequirementAgentSuccessEvent
+from beeai_framework.agents.experimental.requirements._utils import _target_seen_in
+from beeai_framework.agents.experimental.requirements.conditional import ConditionalRequirement
+from beeai_framework.agents.experimental.utils._tool import FinalAnswerTool
+from beeai_framework.backend import AnyMessage, AssistantMessage, ChatModel, MessageToolCallContent, ToolMessage
+from beeai_framework.backend.types import ChatModelInput, ChatModelOutput
+from beeai_framework.context import RunContext, RunMiddlewareProtocol
+from beeai_framework.emitter import EmitterOptions, EventMeta
+from beeai_framework.tools import AnyTool, Tool
+
+from examples.wrappers import ChatModelWrapper
+
+
+@dataclass
+class ToolConstraints:
+    """Ordering constraints of one tool, merged from all requirements targeting it."""
+
+    after: set[str] = field(default_factory=set)
+    before: set[str] = field(default_factory=set)
+    forced_by: set[str] = field(default_factory=set)
+    max_invocations: float = float("inf")
+    consecutive_allowed: bool = True
+
+
+@dataclass
+class RejectedCall:
+    tool_name: str
+    reason: str
+
+
+class ToolDependencyGraph:
+    def __init__(self, tools: Sequence[AnyTool], requirements: Sequence[Any]) -> None:
+        self.tools = [tool.name for tool in tools]
+        self.constraints: dict[str, ToolConstraints] = {}
+        for requirement in requirements:
+            if isinstance(requirement, ConditionalRequirement):
+                self._add(requirement, tools)
+
+    def _add(self, requirement: ConditionalRequirement[Any], tools: Sequence[AnyTool]) -> None:
+        def resolve(targets: set[Any]) -> set[str]:
+            return {tool.name for tool in tools if _target_seen_in(tool, targets)}
+
+        for target in resolve({requirement.source}):
+            constraints = self.constraints.setdefault(target, ToolConstraints())
+            constraints.after |= resolve(requirement._after)
+            constraints.before |= resolve(requirement._before)
+            constraints.forced_by |= resolve(requirement._force_after) - {target}
+            constraints.max_invocations = min(constraints.max_invocations, requirement._max_invocations)
+            constraints.consecutive_allowed &= requirement._consecutive_allowed
+
+    def predecessors(self, tool_name: str, history: Sequence[str] = ()) -> set[str]:
+        """Tools that must finish before `tool_name` may start, given the tools already run."""
+        constraints = self.constraints.get(tool_name, ToolConstraints())
+        pending_after = constraints.after - set(history)
+        runs_before = {name for name, other in self.constraints.items() if tool_name in other.before}
+        return (pending_after | constraints.forced_by | runs_before) - {tool_name}
+
+    def forced_targets(self, tool_name: str) -> set[str]:
+        """Tools that the requirements force right after `tool_name`."""
+        return {name for name, constraints in self.constraints.items() if tool_name in constraints.forced_by}
+
+    def plan(
+        self, calls: Sequence[MessageToolCallContent], history: Sequence[str] = ()
+    ) -> tuple[list[MessageToolCallContent], list[RejectedCall]]:
+        """Split the calls of one turn into ones that can run concurrently now and ones that must wait.
+
+        Accepted calls keep their order, except that calls triggering a `force_after`
+        rule are moved last so the forced tool still follows them.
+        """
+        counts = Counter(history)
+        batch = {call.tool_name for call in calls}
+        accepted: list[MessageToolCallContent] = []
+        rejected: list[RejectedCall] = []
+        forced_target: set[str] | None = None
+
+        for call in calls:
+            name = call.tool_name
+            constraints = self.constraints.get(name, ToolConstraints())
+            waits_for = self.predecessors(name, history) & (batch | constraints.after)
+            forces = self.forced_targets(name)
+
+            reason: str | None = None
+            if name == FinalAnswerTool.name:
+                reason = "the final answer must be the only call of its turn"
+            elif waits_for:
+                reason = f"must run after {', '.join(sorted(waits_for))}"
+            elif counts[name] >= constraints.max_invocations:
+                reason = f"max_invocations ({int(constraints.max_invocations)}) reached"
+            elif not constraints.consecutive_allowed and any(other.tool_name == name for other in accepted):
+                reason = "cannot be invoked consecutively"
+            elif forces and forced_target is not None and not forces & forced_target:
+                reason = f"would cancel the forced call of {', '.join(sorted(forced_target))}"
+
+            if reason is not None:
+                rejected.append(RejectedCall(tool_name=name, reason=reason))
+                continue
+
+            counts[name] += 1
+            accepted.append(call)
+            if forces and forced_target is None:
+                forced_target = forces
+
+        accepted.sort(key=lambda call: bool(self.forced_targets(call.tool_name)))
+        return accepted, rejected
+
+
+def tool_history(messages: Sequence[AnyMessage]) -> list[str]:
+    """Names of the tools whose results are in the conversation, oldest first."""
+    return [result.tool_name for msg in messages if isinstance(msg, ToolMessage) for result in msg.get_tool_results()]
+
+
+class DependencyAwareChatModel(ChatModelWrapper):
+    def __init__(self, llm: ChatModel, graph: ToolDependencyGraph) -> None:
+        super().__init__(llm)
+        self.graph = graph
+        self.parallel_turns = 0
+        self.rejected: list[RejectedCall] = []
+
+    def filter_output(self, input: ChatModelInput, output: ChatModelOutput) -> ChatModelOutput:
+        calls = output.get_tool_calls()
+        if len(calls) < 2:
+            return output
+
+        accepted, rejected = self.graph.plan(calls, tool_history(input.messages))
+        if not accepted:
+            # nothing is runnable, leave it to the agent's own validation and retries
+            return output
+        if len(accepted) > 1:
+            self.parallel_turns += 1
+        if not rejected and accepted == calls:
+            return output
+
+        self.rejected.extend(rejected)
+        other_content = [
+            content
+            for msg in output.messages
+            for content in msg.content
+            if not isinstance(content, MessageToolCallContent)
+        ]
+        meta = output.messages[0].meta if output.messages else None
+        return ChatModelOutput(
+            messages=[AssistantMessage([*other_content, *accepted], meta)],
+            usage=output.usage,
+            finish_reason=output.finish_reason,
+        )
+
+    async def _create(self, input: ChatModelInput, run: RunContext) -> ChatModelOutput:
+        output = await self.forward(input, stream=False, parallel_tool_calls=True)
+        return self.filter_output(input, output)
+
+    async def _create_stream(self, input: ChatModelInput, run: RunContext) -> AsyncGenerator[ChatModelOutput]:
+        # the plan needs every call of the turn, so the response is buffered
+        chunks: list[ChatModelOutput] = []
+        async for chunk in self.forward_stream(input, parallel_tool_calls=True):
+            chunks.append(copy.deepcopy(chunk))
+        yield self.filter_output(input, ChatModelOutput.from_chunks(chunks))
+
+
+class ParallelRequirementAgent(RequirementAgent):
+    """RequirementAgent that runs independent tool calls of the same turn concurrently."""
+
+    def __init__(
+        self,
+        *,
+        llm: ChatModel,
+        tools: Sequence[AnyTool] | None = None,
+        requirements: Sequence[Any] | None = None,
+        **kwargs: Any,
+    ) -> None:
+        graph = ToolDependencyGraph(tools or [], requirements or [])
+        super().__init__(llm=DependencyAwareChatModel(llm, graph), tools=tools, requirements=requirements, **kwargs)
+        self.dependency_graph = graph
+
+
+@dataclass
+class StepTiming:
+    iteration: int
+    tools: list[str]
+    tool_s: float
+    """Sum of the tool durations."""
+    wall_s: float
+    """From the first tool start to the last tool finish."""
+
+    @property
+    def saved_s(self) -> float:
+        return max(0.0, self.tool_s - self.wall_s)
+
+
+class ToolOverlapTimings(RunMiddlewareProtocol):
+    """Per-step tool timings of an agent run (nested runs, e.g. handoffs, are not included)."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.steps: list[StepTiming] = []
+        self._run_id: str | None = None
+        self._started: dict[str, tuple[str, float]] = {}
+        self._finished: list[tuple[str, float, float]] = []
+        self._cleanups: list[Callable[[], None]] = []
+
+    @property
+    def saved_s(self) -> float:
+        return sum(step.saved_s for step in self.steps)
+
+    def bind(self, ctx: RunContext) -> None:
+        self._run_id = ctx.run_id
+        options = EmitterOptions(match_nested=True, is_blocking=True, persistent=True)
+        self._cleanups += [
+            ctx.emitter.match(
+                lambda event: event.name in ("start", "finish") and bool(event.context.get("internal")),
+                self._on_tool,
+                options,
+            ),
+            ctx.emitter.match(lambda event: event.name == "success", self._on_step, options),
+        ]
+
+    def close(self) -> None:
+        while self._cleanups:
+            self._cleanups.pop()()
+
+    def _on_tool(self, _: Any, meta: EventMeta) -> None:
+        creator = meta.creator
+        if not meta.trace or meta.trace.parent_run_id != self._run_id or not isinstance(creator, RunContext):
+            return
+        if not isinstance(creator.instance, Tool):
+            return
+
+        if meta.name == "start":
+            self._started[meta.trace.run_id] = (creator.instance.name, time.perf_counter())
+        elif started := self._started.pop(meta.trace.run_id, None):
+            name, start = started
+            self._finished.append((name, start, time.perf_counter()))
+
+    def _on_step(self, data: Any, meta: EventMeta) -> None:
+        if not isinstance(data, RequirementAgentSuccessEvent) or not meta.trace or meta.trace.run_id != self._run_id:
+            return
+        if not self._finished:
+            return
+
+        self.steps.append(
+            StepTiming(
+                iteration=data.state.iteration,
+                tools=[name for name, _, _ in self._finished],
+                tool_s=sum(end - start for _, start, end in self._finished),
+                wall_s=max(end for _, _, end in self._finished) - min(start for _, start, _ in self._finished),
+            )
+        )
+        self._finished.clear()
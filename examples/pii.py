@@ -0,0 +1,246 @@
+"""Multi-pattern PII scanner
+
+Example 10 runs a single credit-card regex over the whole text, without a
+checksum, so order numbers and timestamps that look like card numbers stop
+the agent too. `PiiScanner` scans bytes-like data (`bytes`, `bytearray`,
+`memoryview`, or chunks of them) for a set of patterns at once:
+
+* patterns are ASCII byte patterns, so there is no decoding and `re` works on
+  the buffer in place;
+* patterns that start with the same character class (`anchor`) are factored
+  into a single pass, `anchor(?:(card)|(ssn)|...)`; patterns starting with a
+  literal (`AKIA`, `ghp_`, ...) keep their own pass, where `re` skips ahead
+  with a fast literal search (one alternation over all patterns would lose
+  that and is several times slower);
+* checksums (issuer prefix and Luhn for cards, mod-97 for IBANs) run only on
+  candidate hits. A card hit that fails is cut at its separators and the
+  prefixes are checked again, longest first, since the greedy match also
+  takes digit groups after the number (`4532 0151 1283 0366 10 USD`).
+
+`scan_chunks()` only copies `max_match_length` bytes around chunk borders,
+so it can scan large tool outputs or log files as they are read:
+
+    scanner = PiiScanner()
+    with open("app.log", "rb") as file:
+        for match in scanner.scan_chunks(iter(lambda: file.read(1 << 20), b"")):
+            print(match.name, match.start)
+
+`PiiRequirement` stops an agent when a tool output contains PII, like the
+requirement in example 10.
+"""
+
+import re
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from dataclasses import dataclass, field
+
+from beeai_framework.agents.experimental.requirements.requirement import Rule
+from beeai_framework.agents.experimental.types import RequirementAgentRunState
+from beeai_framework.backend import SystemMessage
+
+from examples.incremental import IncrementalRequirement, StepView
+
+BytesLike = bytes | bytearray | memoryview
+
+# first character of a token: not preceded by a word character (`\b` without Unicode tables)
+DIGIT = rb"[0-9](?<![0-9A-Za-z_][0-9])"
+UPPER = rb"[A-Z](?<![0-9A-Za-z_][A-Z])"
+END = rb"(?![0-9A-Za-z_])"
+
+_DOUBLED = (0, 2, 4, 6, 8, 1, 3, 5, 7, 9)
+
+
+def luhn_valid(value: bytes) -> bool:
+    digits = value.translate(None, b" -")
+    if not 13 <= len(digits) <= 19:
+        return False
+    total = sum(digit - 48 for digit in digits[-1::-2]) + sum(_DOUBLED[digit - 48] for digit in digits[-2::-2])
+    return total % 10 == 0
+
+
+# issuer prefixes of the major card networks (Visa, Mastercard, Amex, Discover, JCB, Diners, UnionPay)
+_CARD_PREFIX = re.compile(rb"4|5[1-5]|2[2-7]|3[47]|6(?:011|5|4[4-9]|2)|35|3[068]")
+
+
+def card_valid(value: bytes) -> bool:
+    return _CARD_PREFIX.match(value) is not None and luhn_valid(value)
+
+
+def iban_valid(value: bytes) -> bool:
+    iban = value.replace(b" ", b"")
+    if not 15 <= len(iban) <= 34:
+        return False
+    rearranged = (iban[4:] + iban[:4]).decode("ascii")
+    return int("".join(str(int(char, 36)) for char in rearranged)) % 97 == 1
+
+
+def ssn_valid(value: bytes) -> bool:
+    area, group, serial = value.split(b"-")
+    return area not in (b"000", b"666") and not area.startswith(b"9") and group != b"00" and serial != b"0000"
+
+
+@dataclass(frozen=True)
+class PiiPattern:
+    name: str
+    regex: bytes
+    """The pattern after the anchor (or the whole pattern without one)."""
+    validator: Callable[[bytes], bool] | None = None
+    """Runs on candidate hits only; a hit counts when it returns True."""
+    anchor: bytes | None = None
+    """Pattern of the first character; patterns with the same anchor share a pass."""
+    cut_at: bytes = b""
+    """Separators where a hit failing validation is cut to retry its prefixes, longest first."""
+
+
+DEFAULT_PATTERNS: tuple[PiiPattern, ...] = (
+    PiiPattern("US social security number", rb"[0-9]{2}-[0-9]{2}-[0-9]{4}" + END, ssn_valid, anchor=DIGIT),
+    PiiPattern("credit card number", rb"(?:[ -]?[0-9]){12,18}" + END, card_valid, anchor=DIGIT, cut_at=b" -"),
+    PiiPattern("IBAN", rb"[A-Z][0-9]{2}(?: ?[A-Z0-9]{4}){2,7}(?: ?[A-Z0-9]{1,3})?" + END, iban_valid, anchor=UPPER),
+    PiiPattern("AWS access key", rb"(?:AKIA|ASIA)[A-Z0-9]{16}" + END),
+    PiiPattern("GitHub token", rb"gh[pousr]_[A-Za-z0-9]{36}" + END),
+    PiiPattern("GitLab token", rb"glpat-[A-Za-z0-9_-]{20}" + END),
+    PiiPattern("Slack token", rb"xox[abposr]-[A-Za-z0-9-]{10,72}"),
+    PiiPattern("Stripe key", rb"(?:sk|rk)_(?:live|test)_[A-Za-z0-9]{24,99}" + END),
+    PiiPattern("Google API key", rb"AIza[0-9A-Za-z_-]{35}"),
+    PiiPattern("OpenAI API key", rb"sk-(?:proj-)?[A-Za-z0-9_-]{20,200}"),
+    PiiPattern("JSON web token", rb"eyJ[A-Za-z0-9_-]{8,1000}\.eyJ[A-Za-z0-9_-]{8,2000}\.[A-Za-z0-9_-]{8,500}"),
+    PiiPattern("private key", rb"-----BEGIN (?:RSA |EC |DSA |OPENSSH |ENCRYPTED )?PRIVATE KEY-----"),
+)
+
+
+@dataclass(frozen=True)
+class PiiMatch:
+    name: str
+    start: int
+    """Byte offset in the scanned data (the whole stream for `scan_chunks`)."""
+    end: int
+    value: bytes = field(repr=False)
+
+
+@dataclass
+class _Pass:
+    regex: re.Pattern[bytes]
+    patterns: dict[int, PiiPattern]
+    """Group number of each branch; a pass without anchor has a single pattern under 0."""
+
+
+class PiiScanner:
+    def __init__(self, patterns: Sequence[PiiPattern] = DEFAULT_PATTERNS, *, max_match_length: int = 4096) -> None:
+        if not patterns:
+            raise ValueError("At least one pattern is required.")
+        self.patterns = list(patterns)
+        self.max_match_length = max_match_length
+        self.candidates = 0
+        """Hits seen before validation, to compare with the validated matches."""
+
+        anchored: dict[bytes, list[PiiPattern]] = {}
+        self._passes: list[_Pass] = []
+        for pattern in self.patterns:
+            if pattern.anchor is None:
+                self._passes.append(_Pass(re.compile(pattern.regex), {0: pattern}))
+            else:
+                anchored.setdefault(pattern.anchor, []).append(pattern)
+
+        for anchor, group in anchored.items():
+            branches: dict[int, PiiPattern] = {}
+            parts: list[bytes] = []
+            number = 1
+            for pattern in group:
+                branches[number] = pattern
+                parts.append(b"(" + pattern.regex + b")")
+                number += 1 + re.compile(pattern.regex).groups
+            self._passes.append(_Pass(re.compile(anchor + b"(?:" + b"|".join(parts) + b")"), branches))
+
+    def scan(self, data: BytesLike | str) -> list[PiiMatch]:
+        """All matches in `data`, ordered by position; text is scanned as UTF-8."""
+        buffer = data.encode() if isinstance(data, str) else data
+        return sorted(self._validated(buffer, self._find(buffer), 0), key=lambda match: match.start)
+
+    def scan_chunks(self, chunks: Iterable[BytesLike]) -> Iterator[PiiMatch]:
+        """Matches in a stream of chunks, also across chunk borders.
+
+        Each chunk is scanned in place. Matches touching a border are found in
+        a small window around it (the last `max_match_length` bytes before the
+        border and as many after it), which `max_match_length` must be able to
+        hold. Matches are ordered by chunk, not strictly by position.
+        """
+        limit = self.max_match_length
+        tail = b""  # the last bytes of the stream before the current chunk
+        offset = 0
+        iterator = iter(chunks)
+        current = next(iterator, None)
+        while current is not None:
+            upcoming = next(iterator, None)
+            last = upcoming is None
+            view = memoryview(current)
+
+            if tail:
+                window = tail + view[:limit]
+                border = len(tail)
+                hits = [
+                    (pattern, start, end)
+                    for pattern, start, end in self._find(window)
+                    # only matches containing the border, one still growing into the next chunk comes later
+                    if start <= border <= end and (last or end < len(window))
+                ]
+                yield from self._validated(window, hits, offset - border)
+
+            hits = [
+                (pattern, start, end)
+                for pattern, start, end in self._find(view)
+                if (start > 0 or not tail) and (end < len(view) or last)
+            ]
+            yield from self._validated(view, hits, offset)
+
+            tail = (tail + view[-limit:])[-limit:]
+            offset += len(view)
+            current = upcoming
+
+    def _find(self, buffer: BytesLike) -> Iterator[tuple[PiiPattern, int, int]]:
+        for scan in self._passes:
+            for match in scan.regex.finditer(buffer):
+                pattern = scan.patterns[match.lastindex or 0]
+                yield pattern, match.start(), match.end()
+
+    def _validated(
+        self, buffer: BytesLike, hits: Iterable[tuple[PiiPattern, int, int]], offset: int
+    ) -> Iterator[PiiMatch]:
+        for pattern, start, end in hits:
+            self.candidates += 1
+            value = bytes(buffer[start:end])
+            if pattern.validator is None or pattern.validator(value):
+                yield PiiMatch(pattern.name, offset + start, offset + end, value)
+                continue
+
+            # the greedy match may have taken what follows the value (`... 0366 10 USD`): retry its prefixes
+            if not pattern.cut_at or len(value.translate(None, pattern.cut_at)) == len(value):
+                continue
+            for cut in range(len(value) - 1, 0, -1):
+                separated = value[cut] in pattern.cut_at and value[cut - 1] not in pattern.cut_at
+                if separated and pattern.validator(value[:cut]):
+                    yield PiiMatch(pattern.name, offset + start, offset + start + cut, value[:cut])
+                    break
+
+
+class PiiRequirement(IncrementalRequirement):
+    """Stops the agent when a tool output contains PII."""
+
+    def __init__(self, scanner: PiiScanner | None = None) -> None:
+        super().__init__()
+        self.scanner = scanner or PiiScanner()
+        self.findings: list[PiiMatch] = []
+
+    async def check(self, state: RequirementAgentRunState, steps: Sequence[StepView]) -> list[Rule]:
+        matches = [match for step in steps for match in self.scanner.scan(step.text)]
+        if not matches:
+            return []
+
+        self.findings.extend(matches)
+        names = ", ".join(sorted({match.name for match in matches}))
+        await state.memory.add(
+            SystemMessage(
+                f"Your ONLY allowed response is exactly this: 'I cannot complete this task because the tool output "
+                f"contains sensitive data ({names}).' Say nothing else. This is a mandatory safety requirement.",
+                {"tempMessage": True},
+            )
+        )
+        return [Rule(target="final_answer", forced=True)]
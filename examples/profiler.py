@@ -0,0 +1,247 @@
+"""Span profiler for agent runs
+
+`RunMetrics` adds up time per category; `SpanProfiler` keeps the tree of
+where it went. Each run of an agent, model, tool or requirement becomes a
+span nested under the run that started it, and the runs of an agent are
+grouped into one span per iteration:
+
+    agent RequirementAgent
+      iteration 1
+        requirement ConditionalRequirement
+        llm gpt-5-nano
+        tool transfer_to_destination_expert
+          agent RequirementAgent
+            iteration 1
+              llm gpt-5-nano
+              tool get_destination_info
+
+Time of a span not covered by its children is spent in the span itself, e.g.
+the agent's own bookkeeping between the model call and the tools.
+
+Bound to a run, the profiler follows every run of the same group, which
+includes sub-agents started by a `HandoffTool` (their events do not pass
+through the run that called them). `observe(Emitter.root())` profiles every
+run in the process instead.
+
+    profiler = SpanProfiler()
+    await agent.run("...").middleware(profiler)
+    profiler.write("trace.json")  # Chrome trace for Perfetto or chrome://tracing
+    profiler.write("stacks.txt")  # collapsed stacks for speedscope or flamegraph.pl
+"""
+
+import json
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from beeai_framework.agents import BaseAgent
+from beeai_framework.agents.experimental.events import RequirementAgentSuccessEvent
+from beeai_framework.agents.experimental.requirements.requirement import Requirement
+from beeai_framework.backend import ChatModel
+from beeai_framework.context import RunContext, RunMiddlewareProtocol
+from beeai_framework.emitter import Emitter, EmitterOptions, EventMeta
+from beeai_framework.tools import Tool
+
+from examples.metrics import CATEGORIES
+
+
+@dataclass(slots=True, eq=False)
+class Span:
+    name: str
+    category: str
+    start: float
+    """Seconds since the epoch."""
+    end: float | None = None
+    parent: "Span | None" = field(default=None, repr=False)
+    children: list["Span"] = field(default_factory=list, repr=False)
+
+    @property
+    def duration(self) -> float:
+        return 0.0 if self.end is None else self.end - self.start
+
+    @property
+    def self_time(self) -> float:
+        """Time not covered by a child; overlapping children (parallel tools) are counted once."""
+        covered = 0.0
+        reach = self.start
+        for child in sorted(self.children, key=lambda span: span.start):
+            end = child.start + child.duration
+            if end > reach:
+                covered += end - max(child.start, reach)
+                reach = end
+        return max(0.0, self.duration - covered)
+
+    def path(self) -> list[str]:
+        names = []
+        span: Span | None = self
+        while span is not None:
+            names.append(span.name)
+            span = span.parent
+        return names[::-1]
+
+
+def span_name(category: str, instance: Any) -> str:
+    if isinstance(instance, BaseAgent):
+        label = instance.meta.name
+    elif isinstance(instance, ChatModel):
+        label = instance.model_id
+    elif isinstance(instance, Tool | Requirement):
+        label = instance.name
+    else:
+        label = type(instance).__name__
+    return f"{category} {label}"
+
+
+class SpanProfiler(RunMiddlewareProtocol):
+    def __init__(self) -> None:
+        super().__init__()
+        self.roots: list[Span] = []
+        self._open: dict[str, Span] = {}  # run id -> span
+        self._iterations: dict[str, Span] = {}  # agent run id -> current iteration
+        self._cleanups: list[Callable[[], None]] = []
+
+    def bind(self, ctx: RunContext) -> None:
+        group_id, run_id = ctx.group_id, ctx.run_id
+
+        async def on_event(data: Any, meta: EventMeta) -> None:
+            await self._on_event(data, meta)
+            if meta.name == "finish" and meta.trace is not None and meta.trace.run_id == run_id:
+                release()
+
+        cleanup = Emitter.root().match(
+            lambda event: event.trace is not None and event.trace.id == group_id and self._matches(event),
+            on_event,
+            EmitterOptions(match_nested=True),
+        )
+
+        def release() -> None:
+            cleanup()
+            if release in self._cleanups:
+                self._cleanups.remove(release)
+
+        self._cleanups.append(release)
+
+    def observe(self, emitter: Emitter) -> Callable[[], None]:
+        """Profile every run below the emitter. Returns a cleanup function."""
+        cleanup = emitter.match(self._matches, self._on_event, EmitterOptions(match_nested=True, persistent=True))
+        self._cleanups.append(cleanup)
+        return cleanup
+
+    def close(self) -> None:
+        while self._cleanups:
+            self._cleanups.pop()()
+
+    def reset(self) -> None:
+        self.roots.clear()
+        self._open.clear()
+        self._iterations.clear()
+
+    @staticmethod
+    def _matches(event: EventMeta) -> bool:
+        if event.name in ("start", "finish"):
+            return isinstance(event.creator, RunContext) and bool(event.context.get("internal"))
+        return event.name == "success" and isinstance(event.creator, BaseAgent)
+
+    async def _on_event(self, data: Any, meta: EventMeta) -> None:
+        # a coroutine on purpose: the emitter runs plain functions in a worker thread
+        trace = meta.trace
+        if trace is None:
+            return
+        now = meta.created_at.timestamp()
+
+        if isinstance(data, RequirementAgentSuccessEvent):
+            if iteration := self._iterations.get(trace.run_id):
+                iteration.end = now
+                self._iterations[trace.run_id] = self._open_span(
+                    f"iteration {data.state.iteration + 1}", "iteration", now, iteration.parent
+                )
+            return
+
+        if not isinstance(meta.creator, RunContext):
+            return
+        if meta.name == "start":
+            instance = meta.creator.instance
+            category = next((name for name, kind in CATEGORIES.items() if isinstance(instance, kind)), None)
+            if category is None:
+                return
+            parent_id = trace.parent_run_id or ""
+            parent = self._iterations.get(parent_id) or self._open.get(parent_id)
+            start = meta.creator.created_at.timestamp()
+            span = self._open[trace.run_id] = self._open_span(span_name(category, instance), category, start, parent)
+            if category == "agent":
+                self._iterations[trace.run_id] = self._open_span("iteration 1", "iteration", start, span)
+        elif span := self._open.pop(trace.run_id, None):
+            span.end = now
+            if iteration := self._iterations.pop(trace.run_id, None):
+                # the run ends right after the success event that opened the next iteration
+                if iteration.children:
+                    iteration.end = now
+                else:
+                    span.children.remove(iteration)
+
+    def _open_span(self, name: str, category: str, start: float, parent: Span | None) -> Span:
+        span = Span(name, category, start, parent=parent)
+        (parent.children if parent is not None else self.roots).append(span)
+        return span
+
+    def spans(self) -> list[Span]:
+        """Every finished span, parents before their children."""
+        result: list[Span] = []
+        stack = self.roots[::-1]
+        while stack:
+            span = stack.pop()
+            if span.end is not None:
+                result.append(span)
+            stack.extend(span.children[::-1])
+        return result
+
+    def to_chrome_trace(self) -> dict[str, Any]:
+        """Complete ("X") events in the Trace Event Format, one thread per lane of non-overlapping spans."""
+        spans = self.spans()
+        epoch = min((span.start for span in spans), default=0.0)
+        lanes: dict[int, int] = {}  # id(span) -> lane
+        lane_ends: dict[tuple[int, int], float] = {}  # (parent, lane) -> end of the last child on it
+        lane_names: dict[int, str] = {}
+        events: list[dict[str, Any]] = []
+        for span in spans:
+            # a span stays on the lane of its parent unless it overlaps an earlier sibling there (parallel tools)
+            lane = lanes.get(id(span.parent), 0) if span.parent is not None else len(lane_names)
+            if span.parent is not None and lane_ends.get((id(span.parent), lane), 0.0) > span.start:
+                lane = len(lane_names)
+            if span.parent is not None:
+                lane_ends[(id(span.parent), lane)] = max(lane_ends.get((id(span.parent), lane), 0.0), span.end or 0.0)
+            lanes[id(span)] = lane
+            lane_names.setdefault(lane, span.name)
+            events.append(
+                {
+                    "name": span.name,
+                    "cat": span.category,
+                    "ph": "X",
+                    "ts": round((span.start - epoch) * 1e6, 1),
+                    "dur": round(span.duration * 1e6, 1),
+                    "pid": 1,
+                    "tid": lane,
+                }
+            )
+        metadata = [
+            {"name": "thread_name", "ph": "M", "pid": 1, "tid": lane, "args": {"name": name}}
+            for lane, name in lane_names.items()
+        ]
+        return {"traceEvents": metadata + events, "displayTimeUnit": "ms"}
+
+    def to_collapsed(self) -> list[str]:
+        """`frame;frame;frame microseconds` lines of self time, identical stacks merged."""
+        stacks: Counter[str] = Counter()
+        for span in self.spans():
+            stacks[";".join(name.replace(";", ",") for name in span.path())] += round(span.self_time * 1e6)
+        return [f"{stack} {value}" for stack, value in stacks.items() if value > 0]
+
+    def write(self, path: str | Path) -> None:
+        """Write a Chrome trace for `.json` files, collapsed stacks otherwise."""
+        path = Path(path)
+        if path.suffix == ".json":
+            path.write_text(json.dumps(self.to_chrome_trace()), encoding="utf-8")
+        else:
+            path.write_text("".join(f"{line}\n" for line in self.to_collapsed()), encoding="utf-8")
@@ -0,0 +1,359 @@
+"""Structured trajectory recorder
+
+`GlobalTrajectoryMiddleware` pretty-prints every run event to stdout while
+the agent waits, which serializes concurrent runs on the console and leaves
+nothing to analyze afterwards. `TrajectoryRecorder` keeps one compact
+`StepRecord` per agent step instead:
+
+    run id, agent, iteration, step index, tool name, argument hash, output
+    size, error flag, and the iteration's model, tool and requirement time
+
+Records go into a preallocated `RingBuffer`; a background task drains it in
+batches (every `flush_interval` seconds or once `batch_size` records are
+waiting) and writes them to JSONL, or to Parquet with `pyarrow` installed,
+from a worker thread. When the buffer is full the oldest records are
+overwritten and counted in `dropped`.
+
+    recorder = TrajectoryRecorder("trajectories.jsonl")
+    await agent.run("...").middleware(recorder)  # or recorder.observe(Emitter.root())
+    ...
+    await recorder.aclose()  # or recorder.close() once the event loop is gone
+
+Requirement time is measured from the end of the previous iteration (or the
+start of the run) to the request for the model, which covers every
+requirement check, also the ones that do not open a run of their own. Model
+and tool times come from the runs the agent starts directly; their nested
+runs are part of them. The sub-agent of a `HandoffTool` emits its events
+outside the run it was called from, so only a recorder observing
+`Emitter.root()` records its steps too.
+"""
+
+import asyncio
+import contextlib
+import hashlib
+import json
+import threading
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from datetime import datetime
+from operator import itemgetter
+from pathlib import Path
+from typing import Any, Generic, Protocol, TypeVar
+
+from beeai_framework.agents.experimental import RequirementAgent
+from beeai_framework.agents.experimental.events import RequirementAgentSuccessEvent
+from beeai_framework.backend import ChatModel
+from beeai_framework.context import RunContext, RunMiddlewareProtocol
+from beeai_framework.emitter import Emitter, EmitterOptions, EventMeta
+from beeai_framework.tools import Tool
+
+from examples.incremental import output_text
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True, slots=True)
+class StepRecord:
+    run_id: str
+    agent: str
+    iteration: int
+    step: int
+    """Index of the step in the run."""
+    tool: str | None
+    args_hash: str
+    output_size: int
+    """Characters of the tool output as the model sees it."""
+    error: bool
+    llm_s: float
+    """Model time of the iteration that produced the step."""
+    tool_s: float | None
+    requirements_s: float
+    """Requirement evaluation time of the iteration that produced the step."""
+    timestamp: float
+
+    def to_dict(self) -> dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+# json.dumps() builds a new encoder for every call with options
+_args_encoder = json.JSONEncoder(sort_keys=True, ensure_ascii=False, default=str)
+_record_encoder = json.JSONEncoder(ensure_ascii=False)
+
+
+def args_hash(value: Any) -> str:
+    return hashlib.blake2b(_args_encoder.encode(value).encode(), digest_size=8).hexdigest()
+
+
+class RingBuffer(Generic[T]):
+    """Fixed-size FIFO that overwrites its oldest items when full."""
+
+    def __init__(self, capacity: int) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1.")
+        self._items: list[T | None] = [None] * capacity
+        self._start = 0
+        self._size = 0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def capacity(self) -> int:
+        return len(self._items)
+
+    def push(self, item: T) -> None:
+        capacity = len(self._items)
+        self._items[(self._start + self._size) % capacity] = item
+        if self._size < capacity:
+            self._size += 1
+        else:
+            self._start = (self._start + 1) % capacity
+            self.dropped += 1
+
+    def drain(self) -> list[T]:
+        """Remove and return every item, oldest first."""
+        capacity = len(self._items)
+        end = self._start + self._size
+        items = self._items[self._start : min(end, capacity)] + self._items[: max(0, end - capacity)]
+        for index in range(self._size):
+            self._items[(self._start + index) % capacity] = None
+        self._start = self._size = 0
+        return items  # type: ignore[return-value]
+
+
+class RecordSink(Protocol):
+    def write(self, records: Sequence[dict[str, Any]]) -> None: ...
+
+    def close(self) -> None: ...
+
+
+class JsonlSink:
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = self.path.open("a", encoding="utf-8")
+
+    def write(self, records: Sequence[dict[str, Any]]) -> None:
+        self._file.write("".join(_record_encoder.encode(record) + "\n" for record in records))
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class ParquetSink:
+    """Appends each batch as a row group; needs `pyarrow` (`pip install -e .[parquet]`)."""
+
+    def __init__(self, path: str | Path) -> None:
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Writing Parquet requires pyarrow, install it with `pip install -e .[parquet]`.") from e
+
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._pa = pa
+        self._writer: Any = None
+        self._pq = pq
+
+    def write(self, records: Sequence[dict[str, Any]]) -> None:
+        table = self._pa.Table.from_pylist(list(records))
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self.path, table.schema)
+        self._writer.write_table(table)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+
+
+def open_sink(path: str | Path) -> RecordSink:
+    """A Parquet sink for `.parquet` files, JSONL otherwise."""
+    return ParquetSink(path) if Path(path).suffix == ".parquet" else JsonlSink(path)
+
+
+class _AgentRun:
+    __slots__ = ("agent", "llm_s", "mark", "model_start", "steps", "tools")
+
+    def __init__(self, agent: str, mark: datetime) -> None:
+        self.agent = agent
+        self.mark = mark  # end of the previous iteration
+        self.model_start: datetime | None = None  # first model request of the iteration
+        self.llm_s = 0.0
+        self.steps = 0  # steps already recorded
+        self.tools: list[tuple[datetime, float]] = []  # (start, duration) of the tool runs of the iteration
+
+
+class TrajectoryRecorder(RunMiddlewareProtocol):
+    def __init__(
+        self,
+        sink: str | Path | RecordSink,
+        *,
+        capacity: int = 8192,
+        batch_size: int = 512,
+        flush_interval: float = 1.0,
+    ) -> None:
+        super().__init__()
+        self.sink = open_sink(sink) if isinstance(sink, str | Path) else sink
+        self.buffer = RingBuffer[StepRecord](capacity)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self._write_lock = threading.Lock()
+        self._runs: dict[str, _AgentRun] = {}
+        self._task: asyncio.Task[None] | None = None
+        self._wake: asyncio.Event | None = None
+        self._cleanups: list[Callable[[], None]] = []
+        self._closed = False
+
+    @property
+    def dropped(self) -> int:
+        return self.buffer.dropped
+
+    def bind(self, ctx: RunContext) -> None:
+        # the emitter of the run goes away with it, and the run itself is known already
+        if isinstance(ctx.instance, RequirementAgent):
+            self._runs[ctx.run_id] = _AgentRun(ctx.instance.meta.name, ctx.created_at)
+        ctx.emitter.match(self._matches_run, self._on_event, EmitterOptions(match_nested=True))
+
+    def observe(self, emitter: Emitter) -> Callable[[], None]:
+        """Start recording every agent run below the emitter. Returns a cleanup function."""
+        cleanup = emitter.match(self._matches, self._on_event, EmitterOptions(match_nested=True, persistent=True))
+        self._cleanups.append(cleanup)
+        return cleanup
+
+    # Every matched event costs a handler task, so durations are taken from the start time of the run context
+    # when it finishes; only agent runs need their start event, to tell which runs are agents.
+
+    @staticmethod
+    def _matches_run(event: EventMeta) -> bool:
+        name = event.name
+        if name == "finish":
+            creator = event.creator
+            return isinstance(creator, RunContext) and isinstance(creator.instance, (RequirementAgent, ChatModel, Tool))
+        return name == "success" and isinstance(event.creator, RequirementAgent)
+
+    @classmethod
+    def _matches(cls, event: EventMeta) -> bool:
+        if event.name == "start":
+            creator = event.creator
+            return isinstance(creator, RunContext) and isinstance(creator.instance, RequirementAgent)
+        return cls._matches_run(event)
+
+    async def _on_event(self, data: Any, meta: EventMeta) -> None:
+        # a coroutine on purpose: the emitter runs plain functions in a worker thread
+        trace = meta.trace
+        if trace is None:
+            return
+        creator = meta.creator
+
+        if isinstance(creator, RunContext):
+            if isinstance(creator.instance, RequirementAgent):
+                if meta.name == "start":
+                    self._runs[trace.run_id] = _AgentRun(creator.instance.meta.name, creator.created_at)
+                else:
+                    self._runs.pop(trace.run_id, None)
+                return
+
+            run = self._runs.get(trace.parent_run_id or "")
+            if run is None:
+                return  # nested below a tool or another model, accounted to its parent
+            duration = (meta.created_at - creator.created_at).total_seconds()
+            if isinstance(creator.instance, Tool):
+                run.tools.append((creator.created_at, duration))
+            else:
+                run.llm_s += duration
+                if run.model_start is None or creator.created_at < run.model_start:
+                    run.model_start = creator.created_at
+            return
+
+        run = self._runs.get(trace.run_id)
+        if run is not None and isinstance(data, RequirementAgentSuccessEvent):
+            self._record(trace.run_id, run, data)
+            run.mark = meta.created_at
+
+    def _record(self, run_id: str, run: _AgentRun, data: RequirementAgentSuccessEvent) -> None:
+        steps = data.state.steps
+        timestamp = time.time()
+        requirements_s = (run.model_start - run.mark).total_seconds() if run.model_start is not None else 0.0
+        run.tools.sort(key=itemgetter(0))  # the order the agent started them, which is the order of the steps
+        for index in range(run.steps, len(steps)):
+            step = steps[index]
+            slot = index - run.steps
+            self.buffer.push(
+                StepRecord(
+                    run_id=run_id,
+                    agent=run.agent,
+                    iteration=step.iteration,
+                    step=index,
+                    tool=step.tool.name if step.tool is not None else None,
+                    args_hash=args_hash(step.input),
+                    output_size=len(output_text(step.output)),
+                    error=step.error is not None,
+                    llm_s=run.llm_s,
+                    tool_s=run.tools[slot][1] if slot < len(run.tools) else None,
+                    requirements_s=requirements_s,
+                    timestamp=timestamp,
+                )
+            )
+        run.steps = len(steps)
+        run.llm_s = 0.0
+        run.model_start = None
+        run.tools.clear()
+
+        if self._task is None or self._task.done():
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._flush_loop())
+        if len(self.buffer) >= self.batch_size and self._wake is not None:
+            self._wake.set()
+
+    async def _flush_loop(self) -> None:
+        assert self._wake is not None
+        try:
+            while True:
+                with contextlib.suppress(TimeoutError):
+                    await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+                self._wake.clear()
+                await self.flush()
+        finally:
+            # the event loop is shutting down (or `aclose()` was called): write what is left synchronously, the sink
+            # stays open for a later loop until `close()`
+            self._write(self.buffer.drain())
+
+    async def flush(self) -> None:
+        """Write the buffered records now."""
+        if batch := self.buffer.drain():
+            await asyncio.to_thread(self._write, batch)
+
+    def _write(self, batch: list[StepRecord]) -> None:
+        if batch:
+            with self._write_lock:  # the final write at shutdown may overlap one still running in a thread
+                self.sink.write([record.to_dict() for record in batch])
+                self.written += len(batch)
+
+    async def aclose(self) -> None:
+        """Stop recording, write the remaining records and close the sink."""
+        while self._cleanups:
+            self._cleanups.pop()()
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+        await self.flush()
+        self.close()
+
+    def close(self) -> None:
+        """`aclose()` without an event loop, e.g. from `atexit` once the loop is gone; closing twice is a no-op.
+
+        The sink must be closed for the file to be complete: Parquet writes its footer only then.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        while self._cleanups:
+            self._cleanups.pop()()
+        self._write(self.buffer.drain())
+        self.sink.close()
@@ -0,0 +1,257 @@
+"""Per-step model routing with latency hedging
+
+`examples/utils.py` binds one model to every step of every agent, yet many
+steps leave the model little to decide: the forced `ThinkTool` of example 6
+or the forced `final_answer` of example 10 only need their arguments filled
+in. `RoutingChatModel` picks the model for each request from `Route` rules,
+the first matching one wins:
+
+    llm = RoutingChatModel(
+        get_llm("openai:gpt-5-mini"),
+        routes=[
+            Route(get_llm("openai:gpt-5-nano"), name="constrained", max_choices=1),  # a single forced tool
+            Route(get_llm("openai:gpt-5"), name="long", min_prompt_tokens=20_000),
+            Route(get_llm("ollama:granite3.3:8b"), name="weather", role="weather expert"),
+        ],
+        hedge=get_llm("anthropic:claude-haiku-4-5"),
+    )
+
+* `max_choices`: at most this many tools to choose from (1 when the
+  requirements force a tool, `final_answer` included);
+* `min_prompt_tokens` / `max_prompt_tokens`: estimated size of the request;
+* `role`: text the agent's system prompt contains (its role or instructions);
+* `when`: any other predicate over the `Step`.
+
+With a `hedge` model (per route or for all of them), a request the chosen
+model has not answered after its recent p95 latency (or a fixed
+`hedge_delay`) is sent to the hedge model as well. The first response
+wins, the other request is aborted. A model that fails before the hedge
+fires is replaced by the hedge at once. Streamed requests are routed but not
+hedged.
+"""
+
+import asyncio
+import time
+from collections import deque
+from collections.abc import AsyncGenerator, Callable, Sequence
+from dataclasses import asdict, dataclass, field
+from typing import Any, Self
+
+from beeai_framework.backend import ChatModel, SystemMessage
+from beeai_framework.backend.types import ChatModelInput, ChatModelOutput
+from beeai_framework.context import RunContext
+from beeai_framework.tools import Tool
+from beeai_framework.utils.cancellation import AbortController, register_signals
+
+from examples.budget_memory import message_tokens
+from examples.metrics import percentile
+from examples.wrappers import ChatModelWrapper
+
+_ROLE_PREFIX = "Assume the role of "  # first line of RequirementAgent's system prompt
+
+
+@dataclass(frozen=True)
+class Step:
+    """What the router knows about a request."""
+
+    choices: int
+    """Tools the model can choose from; 1 when a tool is forced."""
+    forced: str | None
+    """Name of the forced tool."""
+    prompt_tokens: int
+    system: str
+    """The agent's system prompt, casefolded."""
+
+    @classmethod
+    def of(cls, input: ChatModelInput) -> Self:
+        forced = input.tool_choice.name if isinstance(input.tool_choice, Tool) else None
+        return cls(
+            choices=1 if forced is not None else len(input.tools or []),
+            forced=forced,
+            prompt_tokens=sum(message_tokens(msg) for msg in input.messages),
+            system="\n".join(msg.text for msg in input.messages if isinstance(msg, SystemMessage)).casefold(),
+        )
+
+    @property
+    def role(self) -> str | None:
+        line = next((line for line in self.system.splitlines() if line.startswith(_ROLE_PREFIX.casefold())), None)
+        return line[len(_ROLE_PREFIX) :].rstrip(".") if line is not None else None
+
+
+@dataclass
+class Route:
+    model: ChatModel
+    name: str = ""
+    max_choices: int | None = None
+    min_prompt_tokens: int | None = None
+    max_prompt_tokens: int | None = None
+    role: str | None = None
+    when: Callable[[Step], bool] | None = None
+    hedge: ChatModel | None = None
+    """Hedge model of this route; the router's when not set."""
+
+    def __post_init__(self) -> None:
+        if not self.name:
+            self.name = self.model.model_id
+
+    def matches(self, step: Step) -> bool:
+        return (
+            (self.max_choices is None or step.choices <= self.max_choices)
+            and (self.min_prompt_tokens is None or step.prompt_tokens >= self.min_prompt_tokens)
+            and (self.max_prompt_tokens is None or step.prompt_tokens <= self.max_prompt_tokens)
+            and (self.role is None or self.role.casefold() in step.system)
+            and (self.when is None or self.when(step))
+        )
+
+
+@dataclass
+class RouterStats:
+    requests: int = 0
+    routes: dict[str, int] = field(default_factory=dict)
+    """Requests per route; the default model counts as "default"."""
+    hedged: int = 0
+    """Requests also sent to the hedge model."""
+    hedge_wins: int = 0
+    failovers: int = 0
+    """Requests the hedge answered because the chosen model failed."""
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class LatencyWindow:
+    """Latencies of a model's latest responses."""
+
+    def __init__(self, size: int = 200) -> None:
+        self.samples: deque[float] = deque(maxlen=size)
+
+    def add(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def percentile(self, q: float) -> float:
+        return percentile(list(self.samples), q)
+
+
+class RoutingChatModel(ChatModelWrapper):
+    """Sends each request to the model of the first matching route (the default model otherwise)."""
+
+    def __init__(
+        self,
+        llm: ChatModel,
+        routes: Sequence[Route] = (),
+        *,
+        hedge: ChatModel | None = None,
+        hedge_delay: float | None = None,
+        hedge_percentile: float = 95.0,
+        warmup: int = 20,
+        warmup_delay: float = 2.0,
+    ) -> None:
+        super().__init__(llm)
+        self.routes = list(routes)
+        self.hedge = hedge
+        self.hedge_delay = hedge_delay
+        self.hedge_percentile = hedge_percentile
+        self.warmup = warmup
+        self.warmup_delay = warmup_delay
+        self.stats = RouterStats()
+        self._latencies: dict[int, LatencyWindow] = {}
+
+    def select(self, input: ChatModelInput) -> tuple[str, ChatModel, ChatModel | None]:
+        """Name, model and hedge model for the request."""
+        step = Step.of(input)
+        route = next((route for route in self.routes if route.matches(step)), None)
+        if route is None:
+            return "default", self.llm, self.hedge
+        return route.name, route.model, route.hedge or self.hedge
+
+    def latency(self, model: ChatModel) -> LatencyWindow:
+        window = self._latencies.get(id(model))
+        if window is None:
+            window = self._latencies[id(model)] = LatencyWindow()
+        return window
+
+    def delay(self, model: ChatModel) -> float:
+        """Seconds to wait for the model before hedging."""
+        if self.hedge_delay is not None:
+            return self.hedge_delay
+        window = self.latency(model)
+        if len(window.samples) < self.warmup:
+            return self.warmup_delay
+        return window.percentile(self.hedge_percentile)
+
+    async def _create(self, input: ChatModelInput, run: RunContext) -> ChatModelOutput:
+        _, model, hedge = self._route(input)
+        if hedge is None:
+            return await self._timed(model, input, None)
+        return await self._hedged(model, hedge, input)
+
+    async def _create_stream(self, input: ChatModelInput, run: RunContext) -> AsyncGenerator[ChatModelOutput]:
+        _, model, _ = self._route(input)
+        async for chunk in self.forward_stream(input, model):
+            yield chunk
+
+    def _route(self, input: ChatModelInput) -> tuple[str, ChatModel, ChatModel | None]:
+        name, model, hedge = self.select(input)
+        self.stats.requests += 1
+        self.stats.routes[name] = self.stats.routes.get(name, 0) + 1
+        return name, model, hedge
+
+    async def _timed(
+        self, model: ChatModel, input: ChatModelInput, controller: AbortController | None
+    ) -> ChatModelOutput:
+        if controller is not None:
+            input = input.model_copy(update={"abort_signal": controller.signal})
+        start = time.perf_counter()
+        try:
+            output = await self.forward(input, model, stream=False)
+        except BaseException:
+            if controller is not None and controller.signal.aborted:
+                # the loser of a race: it took at least this long, leaving it out would pull the p95 down
+                self.latency(model).add(time.perf_counter() - start)
+            raise
+        self.latency(model).add(time.perf_counter() - start)
+        return output
+
+    async def _hedged(self, primary: ChatModel, hedge: ChatModel, input: ChatModelInput) -> ChatModelOutput:
+        racers: dict[asyncio.Future[ChatModelOutput], AbortController] = {}
+
+        def launch(model: ChatModel) -> asyncio.Future[ChatModelOutput]:
+            # each request gets a signal of its own, aborting it lets the framework unwind the loser's run
+            controller = AbortController()
+            register_signals(controller, [input.abort_signal] if input.abort_signal else [])
+            task = asyncio.ensure_future(self._timed(model, input, controller))
+            racers[task] = controller
+            return task
+
+        first = launch(primary)
+        try:
+            done, _ = await asyncio.wait([first], timeout=self.delay(primary))
+            aborted = input.abort_signal is not None and input.abort_signal.aborted
+            if first in done and (first.exception() is None or aborted):
+                return first.result()
+
+            if first in done:
+                self.stats.failovers += 1
+            else:
+                self.stats.hedged += 1
+            second = launch(hedge)
+            pending = {task for task in racers if not task.done()}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winner = next((task for task in done if task.exception() is None), None)
+                if winner is not None:
+                    if winner is second:
+                        self.stats.hedge_wins += 1
+                    return winner.result()
+            raise first.exception() or second.exception()  # type: ignore[misc]
+        finally:
+            for task, controller in racers.items():
+                if not task.done():
+                    controller.abort("Another model answered first.")
+            await asyncio.gather(*racers, return_exceptions=True)
+
+    async def clone(self) -> Self:
+        # clones share the models, their latency windows and the stats (HandoffTool clones agents per call)
+        cloned = await super().clone()
+        cloned.llm = self.llm
+        return cloned
@@ -0,0 +1,482 @@
+"""Run deadlines and budgets
+
+Nothing limits how long `agent.run(...)` takes: a ReAct loop that keeps
+thinking and searching (example 6) or a chain of handoffs (example 5) holds
+its worker until the framework's `max_iterations` (20 by default) fails it.
+`RunBudgetAgent` runs under a `RunBudget`:
+
+    agent = RunBudgetAgent(llm=llm, tools=[...], requirements=[...], budget=RunBudget(timeout=30))
+    response = await agent.run(prompt)  # or agent.run(prompt, budget=RunBudget(max_iterations=8, max_tokens=20_000))
+
+* `max_iterations`, `max_tokens` (as reported by the model) and
+  `max_tool_calls` are checked before every model request; once one is
+  reached, the request forces `final_answer` with a note to answer with what
+  the agent has, so the run still ends with a best-effort answer. The limits
+  are soft: the answering request comes on top of them.
+* `timeout` is wall-clock time. `reserve` seconds before it the run wraps
+  up: the model request in flight is aborted (through its abort signal, so
+  the provider call is cancelled) and replaced by the answering request,
+  which gets the rest of the time. A model that misses the deadline as well
+  is replaced by an answer made up of the latest tool results. If the run is
+  still going `grace` seconds (by default `reserve`) after the deadline,
+  e.g. stuck in a tool that ignores cancellation, it is aborted.
+* The budget travels in the run context, so handoff sub-agents share it:
+  clones of a `RunBudgetAgent` (which is what `HandoffTool` and
+  `AgentPool` run) count their iterations, tokens and tool calls against the
+  budget of the run that started them and wrap up with it. Tools wrapped with
+  `bounded` are cancelled at the wrap-up time together with the runs they
+  started (a handoff's sub-agent) and fail with a `ToolError` the agent sees
+  as a tool result.
+
+A run whose requirements disallow `final_answer` outright cannot answer
+early; it ends at the framework's `max_iterations` or the hard deadline.
+The made-up answer suits the default `final_answer` schema only.
+"""
+
+import asyncio
+import copy
+import textwrap
+from collections.abc import Sequence
+from dataclasses import asdict, dataclass
+from typing import Any, Self
+
+from beeai_framework.agents import AgentExecutionConfig
+from beeai_framework.agents.experimental import RequirementAgent
+from beeai_framework.agents.experimental.requirements.requirement import Requirement, Rule
+from beeai_framework.agents.experimental.types import RequirementAgentRunOutput, RequirementAgentRunState
+from beeai_framework.backend import AssistantMessage, ChatModel, SystemMessage, ToolMessage
+from beeai_framework.backend.message import MessageToolCallContent
+from beeai_framework.backend.types import ChatModelInput, ChatModelOutput
+from beeai_framework.context import Run, RunContext
+from beeai_framework.emitter import Emitter
+from beeai_framework.errors import AbortError
+from beeai_framework.tools import AnyTool, Tool, ToolError, ToolOutput, ToolRunOptions
+from beeai_framework.utils.cancellation import AbortController, AbortSignal, register_signals
+from beeai_framework.utils.strings import to_json, to_safe_word
+from pydantic import BaseModel
+
+from examples.agent_template import clone_agent
+from examples.incremental import IncrementalRequirement, StepView
+from examples.wrappers import ChatModelWrapper
+
+BUDGET = "run_budget"  # key of the run context
+FINAL_ANSWER = "final_answer"
+
+
+@dataclass
+class BudgetUsage:
+    iterations: int = 0
+    """Agent iterations, those of sub-agents included."""
+    tokens: int = 0
+    tool_calls: int = 0
+    cut_requests: int = 0
+    """Model requests aborted at the wrap-up time or the deadline."""
+    cut_tools: int = 0
+    """Calls of `bounded` tools cancelled at the wrap-up time."""
+    fallback_answers: int = 0
+    """Answers made up of tool results because the answering request missed the deadline."""
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class RunBudget:
+    """Limits of one agent run (with its sub-agents) and what the run has used of them."""
+
+    def __init__(
+        self,
+        *,
+        timeout: float | None = None,
+        max_iterations: int | None = None,
+        max_tokens: int | None = None,
+        max_tool_calls: int | None = None,
+        reserve: float | None = None,
+        grace: float | None = None,
+    ) -> None:
+        for name, value in (
+            ("timeout", timeout),
+            ("max_iterations", max_iterations),
+            ("max_tokens", max_tokens),
+            ("max_tool_calls", max_tool_calls),
+        ):
+            if value is not None and value <= 0:
+                raise ValueError(f"{name} must be positive.")
+        if reserve is None:
+            reserve = min(timeout * 0.2, 5.0) if timeout is not None else 0.0
+        if timeout is not None and not 0 <= reserve < timeout:
+            raise ValueError("reserve must be at least 0 and less than timeout.")
+        if grace is not None and grace < 0:
+            raise ValueError("grace must be at least 0.")
+        self.timeout = timeout
+        self.max_iterations = max_iterations
+        self.max_tokens = max_tokens
+        self.max_tool_calls = max_tool_calls
+        self.reserve = reserve
+        self.grace = grace if grace is not None else reserve
+        self.usage = BudgetUsage()
+        self.exceeded: str | None = None
+        """The first limit the run reached: "timeout", "iterations", "tokens" or "tool_calls"."""
+        self.started_at: float | None = None  # event loop time
+        self.finished_at: float | None = None
+        self._controller = AbortController()
+        self._hard_stop: asyncio.TimerHandle | None = None
+
+    def fresh(self) -> Self:
+        """An unused budget with the same limits."""
+        return type(self)(
+            timeout=self.timeout,
+            max_iterations=self.max_iterations,
+            max_tokens=self.max_tokens,
+            max_tool_calls=self.max_tool_calls,
+            reserve=self.reserve,
+            grace=self.grace,
+        )
+
+    @property
+    def signal(self) -> AbortSignal:
+        """Aborted `grace` seconds after the deadline."""
+        return self._controller.signal
+
+    @property
+    def deadline(self) -> float | None:
+        if self.timeout is None or self.started_at is None:
+            return None
+        return self.started_at + self.timeout
+
+    @property
+    def wrap_up_at(self) -> float | None:
+        deadline = self.deadline
+        return None if deadline is None else deadline - self.reserve
+
+    @property
+    def elapsed(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        end = self.finished_at if self.finished_at is not None else asyncio.get_running_loop().time()
+        return end - self.started_at
+
+    def start(self, signal: AbortSignal | None = None) -> None:
+        if self.started_at is not None:
+            raise RuntimeError("A budget bounds a single run, use fresh() for the next one.")
+        loop = asyncio.get_running_loop()
+        self.started_at = loop.time()
+        if signal is not None:
+            register_signals(self._controller, [signal])
+        deadline = self.deadline
+        if deadline is not None:
+            self._hard_stop = loop.call_at(deadline + self.grace, self._abort)
+
+    def stop(self) -> None:
+        if self._hard_stop is not None:
+            self._hard_stop.cancel()
+            self._hard_stop = None
+        if self.started_at is not None and self.finished_at is None:
+            self.finished_at = asyncio.get_running_loop().time()
+
+    def _abort(self) -> None:
+        self._hard_stop = None
+        self.cut()
+        self._controller.abort(f"The run exceeded its timeout of {self.timeout}s.")
+
+    def charge(self, output: ChatModelOutput) -> ChatModelOutput:
+        if output.usage is not None:
+            self.usage.tokens += output.usage.total_tokens
+        return output
+
+    def check(self) -> str | None:
+        """The limit the run has reached, if any; once reached, it stays reached."""
+        if self.exceeded is None:
+            wrap_up_at = self.wrap_up_at
+            if wrap_up_at is not None and asyncio.get_running_loop().time() >= wrap_up_at:
+                self.exceeded = "timeout"
+            elif self.max_iterations is not None and self.usage.iterations >= self.max_iterations:
+                self.exceeded = "iterations"
+            elif self.max_tokens is not None and self.usage.tokens >= self.max_tokens:
+                self.exceeded = "tokens"
+            elif self.max_tool_calls is not None and self.usage.tool_calls >= self.max_tool_calls:
+                self.exceeded = "tool_calls"
+        return self.exceeded
+
+    def cut(self) -> None:
+        """Record a request or tool call cut at the wrap-up time (or the deadline)."""
+        if self.exceeded is None:
+            self.exceeded = "timeout"
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "timeout": self.timeout,
+            "max_iterations": self.max_iterations,
+            "max_tokens": self.max_tokens,
+            "max_tool_calls": self.max_tool_calls,
+            "reserve": self.reserve,
+            "grace": self.grace,
+            "exceeded": self.exceeded,
+            "elapsed_s": self.elapsed,
+            **self.usage.to_dict(),
+        }
+
+
+def current_budget() -> RunBudget | None:
+    """The budget of the run the caller is part of."""
+    try:
+        return RunContext.get().context.get(BUDGET)
+    except RuntimeError:
+        return None
+
+
+def wrap_up_message(reason: str) -> str:
+    return (
+        f"The run has used up its {reason.replace('_', ' ')} budget. Do not call any other tool: give your final "
+        "answer now with the information you have and say what you could not finish."
+    )
+
+
+def fallback_answer(reason: str, results: Sequence[str]) -> str:
+    text = f"I could not finish within the {reason.replace('_', ' ')} budget of this run."
+    if results:
+        text += " What I found so far:\n" + "\n".join(
+            f"- {textwrap.shorten(result, 300, placeholder=' ...')}" for result in results
+        )
+    return text
+
+
+class BudgetRequirement(IncrementalRequirement):
+    """Counts iterations and tool calls against the run budget and forces `final_answer` once it is used up."""
+
+    def __init__(self, *, priority: int = 100) -> None:
+        super().__init__()
+        self.name = "run_budget"
+        # above the forced tools of other requirements (10 by default)
+        self.priority = priority
+
+    async def check(self, state: RequirementAgentRunState, steps: Sequence[StepView]) -> list[Rule]:
+        budget = current_budget()
+        if budget is None:
+            return []
+        budget.usage.iterations += 1
+        budget.usage.tool_calls += sum(1 for step in steps if step.tool_name not in (None, FINAL_ANSWER))
+        reason = budget.check()
+        if reason is None:
+            return []
+        await state.memory.add(SystemMessage(wrap_up_message(reason), {"tempMessage": True}))
+        return [Rule(target=FINAL_ANSWER, forced=True)]
+
+
+class BudgetedChatModel(ChatModelWrapper):
+    """Charges the tokens of every request to the run budget and aborts requests at its deadlines.
+
+    A request cut at the wrap-up time is replaced by one forcing
+    `final_answer`, also when the agent forced another tool; a request that
+    may not answer (a requirement prevents stopping) is left to finish.
+    Streamed requests are served in one chunk while a timeout applies.
+    """
+
+    async def _create(self, input: ChatModelInput, run: RunContext) -> ChatModelOutput:
+        budget: RunBudget | None = run.context.get(BUDGET)
+        if budget is None or budget.deadline is None:
+            output = await self.forward(input, stream=False)
+            return budget.charge(output) if budget is not None else output
+
+        final_answer = next((tool for tool in input.tools or [] if tool.name == FINAL_ANSWER), None)
+        if final_answer is None:
+            # there is no answering instead, the request finishes (or the run is stopped)
+            return budget.charge(await self.forward(input, stream=False))
+
+        answering = isinstance(input.tool_choice, Tool) and input.tool_choice.name == FINAL_ANSWER
+        output = await self._forward_until(input, budget, budget.deadline if answering else budget.wrap_up_at)
+        if output is None and not answering:
+            wrap_up = input.model_copy(
+                update={
+                    "messages": [*input.messages, SystemMessage(wrap_up_message(budget.check() or "timeout"))],
+                    "tools": [final_answer],
+                    "tool_choice": final_answer,
+                }
+            )
+            output = await self._forward_until(wrap_up, budget, budget.deadline)
+        return output if output is not None else self._fallback(input, budget)
+
+    def _assert_tool_response(self, *, input: ChatModelInput, output: ChatModelOutput) -> None:
+        tool_calls = output.get_tool_calls()
+        if tool_calls and all(tool_call.tool_name == FINAL_ANSWER for tool_call in tool_calls):
+            # a request cut by the budget answers instead of calling the tool the agent forced; the inner
+            # model has validated its response against the request it was sent
+            return
+        super()._assert_tool_response(input=input, output=output)
+
+    async def _create_stream(self, input: ChatModelInput, run: RunContext) -> Any:
+        if run.context.get(BUDGET) is None:
+            async for chunk in super()._create_stream(input, run):
+                yield chunk
+        else:
+            yield await self._create(input, run)
+
+    async def _forward_until(self, input: ChatModelInput, budget: RunBudget, at: float) -> ChatModelOutput | None:
+        """The response of the inner model, or None when it was not there by `at` (loop time)."""
+        controller = AbortController()
+        register_signals(controller, [input.abort_signal] if input.abort_signal else [])
+        cut = False
+
+        def expire() -> None:
+            nonlocal cut
+            cut = True
+            controller.abort("The run budget is used up.")
+
+        handle = asyncio.get_running_loop().call_at(at, expire)
+        try:
+            output = await self.forward(input.model_copy(update={"abort_signal": controller.signal}), stream=False)
+        except AbortError:
+            if not cut:
+                raise
+            budget.usage.cut_requests += 1
+            budget.cut()
+            return None
+        finally:
+            handle.cancel()
+        return budget.charge(output)
+
+    @staticmethod
+    def _fallback(input: ChatModelInput, budget: RunBudget) -> ChatModelOutput:
+        results = [
+            text
+            for msg in input.messages
+            if isinstance(msg, ToolMessage)
+            for content in msg.get_tool_results()
+            if (text := str(content.result).strip())
+        ]
+        budget.usage.fallback_answers += 1
+        response = fallback_answer(budget.exceeded or "timeout", results[-3:])
+        return ChatModelOutput(
+            messages=[
+                AssistantMessage(
+                    MessageToolCallContent(
+                        id=f"call_budget_{budget.usage.fallback_answers}",
+                        tool_name=FINAL_ANSWER,
+                        args=to_json({"response": response}, sort_keys=False),
+                    )
+                )
+            ],
+            finish_reason="stop",
+        )
+
+
+class BoundedTool(Tool[BaseModel, ToolRunOptions, ToolOutput]):
+    """Tool wrapper that cancels the tool, and the runs it started, at the wrap-up time of the run budget."""
+
+    def __init__(self, tool: AnyTool, *, options: dict[str, Any] | None = None) -> None:
+        super().__init__(options)
+        self.tool = tool
+
+    @property
+    def name(self) -> str:
+        return self.tool.name
+
+    @property
+    def description(self) -> str:
+        return self.tool.description
+
+    @property
+    def input_schema(self) -> type[BaseModel]:
+        return self.tool.input_schema
+
+    def _create_emitter(self) -> Emitter:
+        return Emitter.root().child(namespace=["tool", "bounded", to_safe_word(self.name)], creator=self)
+
+    async def _run(self, input: BaseModel, options: ToolRunOptions | None, context: RunContext) -> ToolOutput:
+        budget: RunBudget | None = context.context.get(BUDGET)
+        wrap_up_at = budget.wrap_up_at if budget is not None else None
+        if budget is None or wrap_up_at is None:
+            return await self.tool._run(input, options, context)
+
+        controller = AbortController()
+        cut = False
+
+        def expire() -> None:
+            nonlocal cut
+            cut = True
+            controller.abort("The run budget is used up.")
+
+        handle = asyncio.get_running_loop().call_at(wrap_up_at, expire)
+        try:
+            # a run of its own: the runs the tool starts (a handoff's sub-agent) are its children and are aborted
+            # with it, while aborting the tool's own run would fail the agent
+            return await RunContext.enter(
+                self, lambda ctx: self.tool._run(input, options, ctx), signal=controller.signal
+            )
+        except AbortError as error:
+            if not cut:
+                raise
+            budget.usage.cut_tools += 1
+            budget.cut()
+            raise ToolError(f"{self.name} was cancelled, the run is out of time.", cause=error) from error
+        finally:
+            handle.cancel()
+
+    async def clone(self) -> Self:
+        cloned = copy.copy(self)
+        cloned.__dict__.pop("emitter", None)
+        cloned.middlewares = list(self.middlewares)
+        return cloned
+
+
+def bounded(tool: AnyTool) -> BoundedTool:
+    """Cancel a tool at the wrap-up time of the run budget; use as `@bounded` above `@tool` or call it on a tool."""
+    return BoundedTool(tool)
+
+
+class RunBudgetAgent(RequirementAgent):
+    """RequirementAgent whose runs are bounded by a `RunBudget`.
+
+    `budget` is the default for runs started without one; each run gets a
+    fresh copy. A run started from within a budgeted run (a sub-agent)
+    shares the budget of that run unless it is given one.
+    """
+
+    def __init__(
+        self,
+        *,
+        llm: ChatModel,
+        budget: RunBudget | None = None,
+        requirements: Sequence[Requirement[RequirementAgentRunState]] | None = None,
+        **kwargs: Any,
+    ) -> None:
+        self.budget = budget
+        super().__init__(
+            llm=llm if isinstance(llm, BudgetedChatModel) else BudgetedChatModel(llm),
+            requirements=[BudgetRequirement(), *(requirements or [])],
+            **kwargs,
+        )
+
+    async def clone(self) -> Self:
+        return await clone_agent(self)
+
+    def run(  # type: ignore[override]
+        self,
+        prompt: str | None = None,
+        *,
+        budget: RunBudget | None = None,
+        execution: AgentExecutionConfig | None = None,
+        signal: AbortSignal | None = None,
+        **kwargs: Any,
+    ) -> Run[RequirementAgentRunOutput[Any]]:
+        if budget is None and self.budget is not None and current_budget() is None:
+            budget = self.budget.fresh()
+        if budget is None:
+            return super().run(prompt, execution=execution, signal=signal, **kwargs)
+
+        if execution is None and budget.max_iterations is not None:
+            # room for the answering iteration, the framework's limit is the last resort
+            execution = AgentExecutionConfig(
+                max_retries_per_step=3, total_max_retries=3, max_iterations=max(20, budget.max_iterations + 2)
+            )
+        run = super().run(prompt, execution=execution, signal=budget.signal, **kwargs)
+        handler = run.handler
+
+        async def budgeted() -> RequirementAgentRunOutput[Any]:
+            budget.start(signal)
+            try:
+                return await handler()
+            finally:
+                budget.stop()
+
+        run.handler = budgeted
+        return run.context({BUDGET: budget})
@@ -0,0 +1,404 @@
+"""Runner for the numbered examples
+
+`python -m examples` runs the selected `examples/0X_*.py` scenarios, each
+imported only when selected (the model itself is built by the first
+request), any number of times and with bounded concurrency, and reports
+run times, failures and the model, tool and requirement totals as JSON:
+
+    python -m examples 6 10 --repeat 20 --concurrency 4 --output runs.json
+    python -m examples --model scripted --yes --repeat 5  # offline, with the benchmark scripts
+
+Scenarios are given by number (`6`), name (`06_react_loop`) or part of
+the name (`react`); all of them by default. `--yes` answers the permission
+prompt of example 9.
+
+With `--soak RUNS`, the scenarios run round-robin for that many runs in
+total while `tracemalloc` traces allocations. Every `--sample-every` runs
+the runner collects garbage and samples the RSS, the traced bytes and the
+live agents, memories and run contexts. After `--warmup` runs (caches and
+pools filled) it reports their growth per thousand runs and the source
+lines whose allocations grew the most. Traced growth above
+`--leak-threshold` counts as a leak, like an agent memory, a trajectory
+middleware or a handoff sub-agent kept alive by every run; the exit status
+is then 1, as it is when a run fails.
+
+Cold startup is part of the metrics: the seconds from interpreter start
+(Linux only) and from the runner's first line until it is ready to run,
+the import time of each scenario, and the time of the first run.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import gc
+import io
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+
+EXAMPLES_DIR = Path(__file__).resolve().parent
+SCENARIOS = sorted(path.stem for path in EXAMPLES_DIR.glob("[0-9][0-9]_*.py"))
+
+# allocations of the runner itself (its run times) and of the tracer are not the examples' growth
+_UNTRACKED = (__file__, tracemalloc.__file__, "<frozen importlib._bootstrap>", "<frozen importlib._bootstrap_external>")
+
+
+def resolve(selectors: Sequence[str]) -> list[str]:
+    """Scenario names for numbers, names or parts of names; all scenarios when empty."""
+    if not selectors:
+        return list(SCENARIOS)
+    names: list[str] = []
+    for selector in selectors:
+        if selector.isdigit():
+            matches = [name for name in SCENARIOS if int(name[:2]) == int(selector)]
+        else:
+            matches = [name for name in SCENARIOS if selector.casefold() in name.casefold()]
+        if not matches:
+            raise ValueError(f"No scenario matches {selector!r}, choose from: {', '.join(SCENARIOS)}")
+        names.extend(name for name in matches if name not in names)
+    return names
+
+
+def process_age() -> float | None:
+    """Seconds since the interpreter started (Linux only, clock tick resolution)."""
+    try:
+        with open("/proc/self/stat", encoding="ascii") as f:
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime", encoding="ascii") as f:
+            uptime = float(f.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+    return max(0.0, uptime - start_ticks / os.sysconf("SC_CLK_TCK"))
+
+
+def rss_bytes() -> int:
+    """Resident set size of the process; the peak where the current size is not available."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+@dataclass
+class ScenarioStats:
+    runs: int = 0
+    failed: int = 0
+    import_s: float = 0.0
+    durations: list[float] = field(default_factory=list)
+    errors: Counter[str] = field(default_factory=Counter)
+    """Failed runs per exception type."""
+
+    def to_dict(self) -> dict[str, Any]:
+        from examples.metrics import summarize
+
+        return {
+            "runs": self.runs,
+            "failed": self.failed,
+            "import_s": round(self.import_s, 6),
+            "wall_s": summarize(self.durations),
+            "errors": dict(self.errors),
+        }
+
+
+@dataclass
+class MemorySample:
+    runs: int
+    rss_bytes: int
+    traced_bytes: int
+    objects: dict[str, int]
+    """Live instances per tracked type."""
+
+
+class SoakMonitor:
+    """Samples memory while the scenarios run and estimates its growth per thousand runs."""
+
+    def __init__(self, *, warmup: int = 100, top: int = 10) -> None:
+        from beeai_framework.agents import BaseAgent
+        from beeai_framework.context import RunContext
+        from beeai_framework.memory import BaseMemory
+
+        self.warmup = warmup
+        self.top = top
+        self.tracked: dict[str, type] = {"agents": BaseAgent, "memories": BaseMemory, "run_contexts": RunContext}
+        self.samples: list[MemorySample] = []
+        self._baseline: tracemalloc.Snapshot | None = None
+        self._latest: tracemalloc.Snapshot | None = None
+        self.sample_s = 0.0
+        """Time spent sampling, left out of the wall time."""
+
+    def sample(self, runs: int) -> MemorySample:
+        start = time.perf_counter()
+        gc.collect()
+        snapshot = self._snapshot()
+        counts = dict.fromkeys(self.tracked, 0)
+        for obj in gc.get_objects():
+            for name, kind in self.tracked.items():
+                if isinstance(obj, kind):
+                    counts[name] += 1
+        sample = MemorySample(
+            runs=runs,
+            rss_bytes=rss_bytes(),
+            traced_bytes=sum(stat.size for stat in snapshot.statistics("filename")),
+            objects=counts,
+        )
+        self.samples.append(sample)
+        if self._baseline is None and runs >= self.warmup:
+            self._baseline = snapshot
+        self._latest = snapshot
+        self.sample_s += time.perf_counter() - start
+        return sample
+
+    @staticmethod
+    def _snapshot() -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, filename) for filename in _UNTRACKED]
+        )
+
+    def growth(self) -> dict[str, float]:
+        """Least-squares slope of each measure over the samples after the warmup, per thousand runs."""
+        samples = [sample for sample in self.samples if sample.runs >= self.warmup]
+        if len(samples) < 2:
+            return {}
+        runs = [sample.runs for sample in samples]
+        series = {
+            "rss_bytes": [sample.rss_bytes for sample in samples],
+            "traced_bytes": [sample.traced_bytes for sample in samples],
+            **{name: [sample.objects[name] for sample in samples] for name in self.tracked},
+        }
+        return {name: statistics.linear_regression(runs, values).slope * 1000 for name, values in series.items()}
+
+    def top_growth(self) -> list[dict[str, Any]]:
+        """Source lines whose allocations grew the most since the warmup."""
+        if self._baseline is None or self._latest is None:
+            return []
+        stats = self._latest.compare_to(self._baseline, "lineno")
+        return [
+            {
+                "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                "size_diff_bytes": stat.size_diff,
+                "count_diff": stat.count_diff,
+            }
+            for stat in stats[: self.top]
+            if stat.size_diff > 0
+        ]
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "samples": [sample.__dict__ for sample in self.samples],
+            "sample_s": self.sample_s,
+            "growth_per_1000_runs": self.growth(),
+            "top_growth": self.top_growth(),
+        }
+
+
+async def _auto_approve(_: str) -> str:
+    return "yes"
+
+
+def _load_scripts() -> None:
+    from examples.utils import get_llm
+    from examples.wrappers import ChatModelWrapper
+
+    # the offline scripts live with the benchmarks, which are not part of the installed package
+    try:
+        from benchmarks.scenarios import all_scripts
+    except ImportError as e:
+        raise SystemExit("--model scripted needs the benchmarks package; use MODEL=scripted:<file> instead") from e
+    llm = get_llm()
+    while isinstance(llm, ChatModelWrapper):  # LLM_CACHE, LLM_FAST_PATH, ... wrap the scripted model
+        llm = llm.llm
+    llm.scripts = all_scripts()
+
+
+class Runner:
+    def __init__(self, names: Sequence[str], *, concurrency: int = 1) -> None:
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.names = list(names)
+        self.concurrency = concurrency
+        self.stats = {name: ScenarioStats() for name in self.names}
+        self.first_run_s: float | None = None
+        self._modules: dict[str, ModuleType] = {}
+        self._next = 0
+
+    def load(self) -> None:
+        """Import the selected scenarios, timing each import."""
+        import importlib
+
+        for name in self.names:
+            start = time.perf_counter()
+            self._modules[name] = importlib.import_module(f"examples.{name}")
+            self.stats[name].import_s = time.perf_counter() - start
+
+    async def run_one(self, name: str) -> None:
+        stats = self.stats[name]
+        start = time.perf_counter()
+        try:
+            await self._modules[name].main()
+        except Exception as e:  # noqa: BLE001 - one failed run is reported, not fatal
+            stats.failed += 1
+            stats.errors[type(e).__name__] += 1
+            if stats.errors[type(e).__name__] == 1:  # the first of each kind, a soak may fail thousands of times
+                print(f"{name}: {type(e).__name__}: {e}", file=sys.stderr)
+        elapsed = time.perf_counter() - start
+        stats.runs += 1
+        stats.durations.append(elapsed)
+        if self.first_run_s is None:
+            self.first_run_s = elapsed
+
+    async def run(self, total: int) -> None:
+        """Run `total` runs round-robin over the scenarios, at most `concurrency` at a time."""
+        started = 0
+
+        async def worker() -> None:
+            nonlocal started
+            while started < total:
+                name = self.names[self._next % len(self.names)]
+                self._next += 1
+                started += 1
+                await self.run_one(name)
+
+        await asyncio.gather(*(worker() for _ in range(min(self.concurrency, total))))
+
+    @property
+    def failed(self) -> int:
+        return sum(stats.failed for stats in self.stats.values())
+
+
+def _print_summary(runner: Runner, monitor: SoakMonitor | None, startup: dict[str, Any]) -> None:
+    out = sys.stderr
+    print(
+        f"startup: runner ready {startup['runner_s'] * 1000:.1f}ms, imports {startup['import_s'] * 1000:.1f}ms",
+        file=out,
+    )
+    for name, stats in runner.stats.items():
+        wall = stats.to_dict()["wall_s"]
+        print(
+            f"{name:<28} runs {stats.runs:6d}  failed {stats.failed:4d}  "
+            f"p50 {wall.get('p50', 0) * 1000:8.2f}ms  p99 {wall.get('p99', 0) * 1000:8.2f}ms",
+            file=out,
+        )
+    if monitor is not None:
+        for measure, slope in monitor.growth().items():
+            unit = "KiB" if measure.endswith("_bytes") else ""
+            value = slope / 1024 if unit else slope
+            print(f"growth per 1000 runs: {measure:<14} {value:+10.1f}{unit}", file=out)
+        for site in monitor.top_growth()[:5]:
+            print(f"  {site['size_diff_bytes'] / 1024:+9.1f}KiB  {site['location']}", file=out)
+
+
+async def main(argv: Sequence[str] | None = None, *, started: float | None = None) -> int:
+    started = time.perf_counter() if started is None else started
+    parser = argparse.ArgumentParser(
+        prog="python -m examples", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("scenarios", nargs="*", help="numbers, names or parts of names (default: all)")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per scenario")
+    parser.add_argument("--concurrency", type=int, default=1, help="runs in flight at once")
+    parser.add_argument("--soak", type=int, default=0, metavar="RUNS", help="total runs with memory tracking")
+    parser.add_argument("--sample-every", type=int, default=100, help="runs between memory samples")
+    parser.add_argument("--warmup", type=int, default=200, help="runs before growth is measured")
+    parser.add_argument("--trace-frames", type=int, default=1, help="frames tracemalloc keeps per allocation")
+    parser.add_argument(
+        "--leak-threshold", type=float, default=256.0, help="traced KiB per 1000 runs that count as a leak"
+    )
+    parser.add_argument("--model", default=None, help="overrides $MODEL; `scripted` replays the benchmark scripts")
+    parser.add_argument("--yes", action="store_true", help="answer yes to the permission prompt of example 9")
+    parser.add_argument("--quiet", action="store_true", help="hide the examples' output")
+    parser.add_argument("--output", default=None, help="JSON metrics file, `-` for stdout")
+    args = parser.parse_args(argv)
+    try:
+        names = resolve(args.scenarios)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.model:
+        os.environ["MODEL"] = args.model
+    runner = Runner(names, concurrency=args.concurrency)
+    ready_s = time.perf_counter() - started
+    process_s = process_age()
+    runner.load()
+    if args.model == "scripted":
+        _load_scripts()
+
+    monitor: SoakMonitor | None = None
+    total = args.soak or args.repeat * len(names)
+    if args.soak:
+        tracemalloc.start(args.trace_frames)
+        monitor = SoakMonitor(warmup=args.warmup)
+
+    from beeai_framework.emitter import Emitter
+    from beeai_framework.utils.io import setup_io_context
+
+    from examples.metrics import RunMetrics
+
+    metrics = RunMetrics()
+    cleanup = metrics.observe(Emitter.root())
+    restore_io = setup_io_context(read=_auto_approve) if args.yes else None
+    quiet = args.quiet or args.soak or args.output == "-"
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext():
+            if monitor is None:
+                await runner.run(total)
+            else:
+                # samples are taken between batches, so no run's time includes a pause for one
+                monitor.sample(0)
+                for done in range(0, total, args.sample_every):
+                    await runner.run(min(args.sample_every, total - done))
+                    monitor.sample(min(done + args.sample_every, total))
+    finally:
+        wall_s = time.perf_counter() - start - (monitor.sample_s if monitor is not None else 0.0)
+        cleanup()
+        if restore_io is not None:
+            restore_io()
+
+    startup = {
+        "process_s": process_s,
+        "runner_s": ready_s,
+        "import_s": sum(stats.import_s for stats in runner.stats.values()),
+        "first_run_s": runner.first_run_s,
+        "modules": len(sys.modules),
+    }
+    leak = None
+    if monitor is not None:
+        leak = monitor.growth().get("traced_bytes", 0.0) > args.leak_threshold * 1024
+        tracemalloc.stop()
+    results = {
+        "startup": startup,
+        "runs": total,
+        "concurrency": args.concurrency,
+        "wall_s": wall_s,
+        "throughput_per_s": total / wall_s if wall_s else 0.0,
+        "scenarios": {name: stats.to_dict() for name, stats in runner.stats.items()},
+        "totals": metrics.to_dict(),
+        "soak": {**monitor.to_dict(), "leak_suspected": leak} if monitor is not None else None,
+    }
+
+    _print_summary(runner, monitor, startup)
+    if leak:
+        print(
+            f"leak suspected: traced memory grows by more than {args.leak_threshold}KiB per 1000 runs", file=sys.stderr
+        )
+    if args.output == "-":
+        print(json.dumps(results, indent=2))
+    elif args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"Metrics written to {args.output}", file=sys.stderr)
+    return 1 if runner.failed or leak else 0
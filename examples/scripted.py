@@ -0,0 +1,268 @@
+"""Deterministic offline ChatModel
+
+A local stand-in for the `llm` from `examples/utils.py` that replays scripted
+(or recorded) tool-call sequences instead of calling a provider. It lets you
+run every example offline and measure framework overhead without network
+latency or model noise.
+"""
+
+import asyncio
+import json
+from collections.abc import AsyncGenerator, Sequence
+from math import ceil
+from pathlib import Path
+from typing import Any, Self
+
+from beeai_framework.backend import AnyMessage, AssistantMessage, ChatModel, ToolMessage, UserMessage
+from beeai_framework.backend.errors import ChatModelError
+from beeai_framework.backend.message import MessageToolCallContent
+from beeai_framework.backend.types import (
+    ChatModelInput,
+    ChatModelOutput,
+    ChatModelStructureInput,
+    ChatModelStructureOutput,
+    ChatModelUsage,
+)
+from beeai_framework.context import RunContext
+from beeai_framework.utils.strings import to_json
+from pydantic import BaseModel, Field
+
+FINAL_ANSWER = "final_answer"
+
+
+class ScriptedToolCall(BaseModel):
+    tool_name: str
+    args: dict[str, Any] = Field(default_factory=dict)
+
+
+class ScriptStep(BaseModel):
+    """A single model turn: plain text, one or more tool calls, or both."""
+
+    text: str | None = None
+    tool_calls: list[ScriptedToolCall] = Field(default_factory=list)
+
+
+class Script(BaseModel):
+    """Ordered model turns for one conversation.
+
+    The script is selected when `match` occurs in the latest user message.
+    Scripts without `match` act as a fallback.
+    """
+
+    steps: list[ScriptStep]
+    match: str | None = None
+
+    @classmethod
+    def from_messages(cls, messages: Sequence[AnyMessage], *, match: str | None = None) -> Self:
+        """Record a script from an agent run (e.g. `response.memory.messages`)."""
+        steps: list[ScriptStep] = []
+        for msg in messages:
+            if not isinstance(msg, AssistantMessage) or msg.meta.get("tempMessage") or msg.meta.get("summarizedTurns"):
+                continue
+            steps.append(
+                ScriptStep(
+                    text=msg.text or None,
+                    tool_calls=[
+                        ScriptedToolCall(tool_name=call.tool_name, args=json.loads(call.args or "{}"))
+                        for call in msg.get_tool_calls()
+                    ],
+                )
+            )
+        return cls(steps=steps, match=match)
+
+
+def call(tool_name: str, /, **args: Any) -> ScriptStep:
+    """Script step that invokes a single tool."""
+    return ScriptStep(tool_calls=[ScriptedToolCall(tool_name=tool_name, args=args)])
+
+
+def parallel(*steps: ScriptStep) -> ScriptStep:
+    """Script step that invokes several tools in the same turn."""
+    return ScriptStep(tool_calls=[tool_call for step in steps for tool_call in step.tool_calls])
+
+
+def answer(response: str) -> ScriptStep:
+    """Script step that returns the final answer."""
+    return call(FINAL_ANSWER, response=response)
+
+
+def say(text: str) -> ScriptStep:
+    """Script step that produces plain text without any tool call."""
+    return ScriptStep(text=text)
+
+
+def estimate_tokens(text: str) -> int:
+    return ceil(len(text) / 4)
+
+
+class ScriptedChatModel(ChatModel):
+    """ChatModel that replays scripted turns.
+
+    The position inside a script is derived from the conversation itself
+    (assistant turns since the latest user message), so one instance can be
+    shared by concurrent runs and by handoff sub-agents. When a script runs
+    out of steps, or a request allows only `final_answer`, the model answers
+    with the last tool result.
+    """
+
+    def __init__(
+        self,
+        scripts: Sequence[Script] | Script,
+        *,
+        model_id: str = "scripted",
+        latency: float = 0.0,
+        token_latency: float = 0.0,
+        stream_chunk_size: int = 16,
+        allow_parallel_tool_calls: bool = True,
+    ) -> None:
+        super().__init__(allow_parallel_tool_calls=allow_parallel_tool_calls)
+        self.scripts = [scripts] if isinstance(scripts, Script) else list(scripts)
+        self.latency = latency
+        self.token_latency = token_latency
+        self.stream_chunk_size = stream_chunk_size
+        self._model_id = model_id
+
+    @property
+    def model_id(self) -> str:
+        return self._model_id
+
+    @property
+    def provider_id(self) -> Any:
+        return "scripted"
+
+    @classmethod
+    def from_file(cls, path: str | Path, **kwargs: Any) -> Self:
+        """Load scripts saved with `save`."""
+        raw = json.loads(Path(path).read_text(encoding="utf-8"))
+        return cls([Script.model_validate(item) for item in raw], **kwargs)
+
+    def save(self, path: str | Path) -> None:
+        Path(path).write_text(
+            to_json([script.model_dump() for script in self.scripts], indent=2, sort_keys=False), encoding="utf-8"
+        )
+
+    def _select_script(self, messages: Sequence[AnyMessage]) -> tuple[int, Script, int]:
+        user_index = next((i for i in range(len(messages) - 1, -1, -1) if isinstance(messages[i], UserMessage)), -1)
+        user_text = messages[user_index].text if user_index >= 0 else ""
+        # a summary of collapsed turns (see `examples/budget_memory.py`) stands for several turns
+        position = sum(
+            msg.meta.get("summarizedTurns", 1)
+            for msg in messages[user_index + 1 :]
+            if isinstance(msg, AssistantMessage) and not msg.meta.get("tempMessage")
+        )
+
+        for index, script in enumerate(self.scripts):
+            if script.match is None or script.match in user_text:
+                return index, script, position
+
+        raise ChatModelError(f"No script matches the user message: {user_text!r}")
+
+    def _next_step(self, input: ChatModelInput) -> tuple[ScriptStep, str]:
+        index, script, position = self._select_script(input.messages)
+        if position < len(script.steps):
+            step = script.steps[position]
+            # forced to answer (e.g. by a run budget), the model answers instead of calling its next tool
+            if not self._answer_only(input) or all(call.tool_name == FINAL_ANSWER for call in step.tool_calls):
+                return step, f"{index}_{position}"
+
+        last_result = next(
+            (
+                str(content.result)
+                for msg in reversed(input.messages)
+                if isinstance(msg, ToolMessage)
+                for content in msg.get_tool_results()
+            ),
+            "Done.",
+        )
+        return answer(last_result), f"{index}_{position}"
+
+    @staticmethod
+    def _answer_only(input: ChatModelInput) -> bool:
+        return input.tools is not None and [tool.name for tool in input.tools] == [FINAL_ANSWER]
+
+    def _to_output(self, input: ChatModelInput, step: ScriptStep, call_prefix: str) -> ChatModelOutput:
+        available = {tool.name for tool in input.tools or []}
+        content: list[Any] = []
+        if step.text:
+            content.append(step.text)
+
+        for idx, tool_call in enumerate(step.tool_calls):
+            if input.tools is not None and tool_call.tool_name not in available:
+                raise ChatModelError(
+                    f"Scripted tool call '{tool_call.tool_name}' is not allowed at this step. "
+                    f"Allowed tools: {', '.join(sorted(available))}"
+                )
+            content.append(
+                MessageToolCallContent(
+                    id=f"call_{call_prefix}_{idx}",
+                    tool_name=tool_call.tool_name,
+                    args=to_json(tool_call.args, sort_keys=False),
+                )
+            )
+
+        prompt_tokens = sum(estimate_tokens(msg.text) for msg in input.messages)
+        completion_tokens = estimate_tokens(step.text or "") + sum(
+            estimate_tokens(to_json(tool_call.args, sort_keys=False)) for tool_call in step.tool_calls
+        )
+        return ChatModelOutput(
+            messages=[AssistantMessage(content)] if content else [],
+            usage=ChatModelUsage(
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                total_tokens=prompt_tokens + completion_tokens,
+            ),
+            finish_reason="tool_calls" if step.tool_calls else "stop",
+        )
+
+    async def _create(self, input: ChatModelInput, run: RunContext) -> ChatModelOutput:
+        step, call_prefix = self._next_step(input)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._to_output(input, step, call_prefix)
+
+    async def _create_stream(self, input: ChatModelInput, run: RunContext) -> AsyncGenerator[ChatModelOutput]:
+        step, call_prefix = self._next_step(input)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        output = self._to_output(input, step, call_prefix)
+        text = step.text or ""
+        for offset in range(0, len(text), self.stream_chunk_size):
+            if self.token_latency:
+                await asyncio.sleep(self.token_latency)
+            yield ChatModelOutput(messages=[AssistantMessage(text[offset : offset + self.stream_chunk_size])])
+
+        # tool-call arguments arrive as deltas like from a provider: id and name first, then the rest of the args
+        for tool_call in output.get_tool_calls():
+            args = tool_call.args
+            head = args[: self.stream_chunk_size]
+            yield ChatModelOutput(
+                messages=[
+                    AssistantMessage(MessageToolCallContent(id=tool_call.id, tool_name=tool_call.tool_name, args=head))
+                ]
+            )
+            for offset in range(len(head), len(args), self.stream_chunk_size):
+                if self.token_latency:
+                    await asyncio.sleep(self.token_latency)
+                delta = args[offset : offset + self.stream_chunk_size]
+                yield ChatModelOutput(
+                    messages=[AssistantMessage(MessageToolCallContent(id="", tool_name="", args=delta))]
+                )
+
+        yield ChatModelOutput(messages=[], usage=output.usage, finish_reason=output.finish_reason)
+
+    async def _create_structure(self, input: ChatModelStructureInput[Any], run: RunContext) -> ChatModelStructureOutput:
+        # `ChatModel` declares this abstract (the class cannot be instantiated without it) but implements it:
+        # a request for JSON matching the schema, which goes through `_create` and so replays the script
+        return await super()._create_structure(input, run)
+
+    async def clone(self) -> Self:
+        # Scripts are immutable during a run, so clones (e.g. handoff sub-agents) can share them.
+        return type(self)(
+            self.scripts,
+            model_id=self._model_id,
+            latency=self.latency,
+            token_latency=self.token_latency,
+            stream_chunk_size=self.stream_chunk_size,
+            allow_parallel_tool_calls=self.allow_parallel_tool_calls,
+        )
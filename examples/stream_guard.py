@@ -0,0 +1,223 @@
+"""Streaming safety guard
+
+`PrematureStopRequirement` in example 10 only looks at finished tool outputs:
+sensitive data the model writes itself (e.g. in the final answer) is never
+checked, and a leaking answer still costs the full completion plus another
+turn that forces `final_answer`.
+
+`StreamScanner` runs a compiled set of patterns over text that arrives in
+chunks and carries partial matches across chunk boundaries, so every chunk
+is scanned once. `StreamGuardChatModel` feeds it the text and tool-call
+arguments of the model stream (and the tool results the model is about to
+read). On a match it cancels the in-flight generation and answers with a
+refusal right away, as a `final_answer` call when the agent offers one:
+
+    llm = StreamGuardChatModel(llm, {"credit card number": CREDIT_CARD})
+    agent = RequirementAgent(llm=llm, tools=[...])
+
+Chunks are only passed on once the scanner has cleared them, so a stream
+consumer never sees the beginning of a match.
+"""
+
+import re
+from collections import deque
+from collections.abc import AsyncGenerator, Mapping, Sequence
+from dataclasses import dataclass
+
+from beeai_framework.backend import AnyMessage, AssistantMessage, ChatModel, MessageToolCallContent, ToolMessage
+from beeai_framework.backend.types import ChatModelInput, ChatModelOutput
+from beeai_framework.context import RunContext
+from beeai_framework.utils.strings import to_json
+
+from examples.wrappers import ChatModelWrapper
+
+CREDIT_CARD = r"\b\d{4}[\s-]?\d{4}[\s-]?\d{4}[\s-]?\d{4}\b"
+FINAL_ANSWER = "final_answer"
+
+
+@dataclass(frozen=True)
+class GuardMatch:
+    name: str
+    """Name of the pattern that matched."""
+    offset: int
+    """Position of the match in the whole stream."""
+    text: str
+
+
+class StreamScanner:
+    """Incremental search for several patterns in chunked text.
+
+    `max_match_length` bounds how long a match can be; that much text is kept
+    between chunks, so matches split across chunks are still found while each
+    chunk is scanned only once. A match that touches the end of the text seen
+    so far is reported only once it cannot grow any more (on a later chunk or
+    on `finish()`), so `\\b` and greedy quantifiers behave as on the full text.
+
+    Token-sized chunks are collected until `min_scan` characters are pending,
+    otherwise the kept text would be rescanned for every few new characters;
+    a match is then reported at most `min_scan` characters late.
+    """
+
+    def __init__(
+        self, patterns: Mapping[str, str], *, max_match_length: int = 64, min_scan: int | None = None, flags: int = 0
+    ) -> None:
+        if not patterns:
+            raise ValueError("At least one pattern is required.")
+        self.names = list(patterns)
+        self.max_match_length = max_match_length
+        self.min_scan = max_match_length if min_scan is None else min_scan
+        self.regex = re.compile("|".join(f"(?P<p{i}>{pattern})" for i, pattern in enumerate(patterns.values())), flags)
+        self.reset()
+
+    def reset(self) -> None:
+        self._tail = ""
+        self._start = 0  # position in the tail where the next match may begin
+        self._offset = 0  # stream position of the tail's first character
+        self._pending: list[str] = []
+        self._pending_size = 0
+
+    @property
+    def safe_offset(self) -> int:
+        """Stream position before which no match can start anymore."""
+        return self._offset + self._start
+
+    def feed(self, chunk: str) -> list[GuardMatch]:
+        """Scan the next chunk; returns the matches completed by it, in stream order."""
+        self._pending.append(chunk)
+        self._pending_size += len(chunk)
+        if self._pending_size < self.min_scan:
+            return []
+        return self._scan(self._take(), final=False)
+
+    def finish(self) -> list[GuardMatch]:
+        """End of the stream: report the matches still waiting for more text."""
+        return self._scan(self._take(), final=True)
+
+    def _take(self) -> str:
+        buffer = self._tail + "".join(self._pending)
+        self._pending.clear()
+        self._pending_size = 0
+        return buffer
+
+    def _scan(self, buffer: str, *, final: bool) -> list[GuardMatch]:
+        found: list[GuardMatch] = []
+        keep: int | None = None
+        end = self._start
+        for match in self.regex.finditer(buffer, self._start):
+            if not final and match.end() == len(buffer):
+                # could still grow with the next chunk
+                keep = match.start()
+                break
+            name = self.names[int(match.lastgroup[1:])]  # type: ignore[index]
+            found.append(GuardMatch(name, self._offset + match.start(), match.group()))
+            end = match.end()
+        if keep is None:
+            keep = max(end, len(buffer) - (self.max_match_length - 1))
+
+        # one character before the kept text stays as context for look-behinds such as `\b`
+        context = min(1, keep)
+        self._tail = buffer[keep - context :]
+        self._start = context
+        self._offset += keep - context
+        return found
+
+
+def pending_tool_results(messages: Sequence[AnyMessage]) -> list[str]:
+    """Tool results added since the model's latest turn."""
+    results: list[str] = []
+    for msg in reversed(messages):
+        if isinstance(msg, AssistantMessage):
+            break
+        if isinstance(msg, ToolMessage):
+            results.extend(str(result.result) for result in msg.get_tool_results())
+    return results[::-1]
+
+
+def chunk_text(chunk: ChatModelOutput) -> str:
+    """Text and tool-call argument deltas of a streamed chunk."""
+    return "".join(
+        content.args if isinstance(content, MessageToolCallContent) else getattr(content, "text", "")
+        for msg in chunk.messages
+        for content in msg.content
+    )
+
+
+class StreamGuardChatModel(ChatModelWrapper):
+    def __init__(
+        self,
+        llm: ChatModel,
+        patterns: Mapping[str, str],
+        *,
+        refusal: str = "I cannot complete this task because the output contains a {name}.",
+        max_match_length: int = 64,
+        min_scan: int | None = None,
+    ) -> None:
+        super().__init__(llm)
+        self.patterns = dict(patterns)
+        self.refusal = refusal
+        self.max_match_length = max_match_length
+        self.min_scan = min_scan
+        StreamScanner(self.patterns)  # validate the patterns upfront
+        self.stops: list[GuardMatch] = []
+
+    def create_scanner(self) -> StreamScanner:
+        return StreamScanner(self.patterns, max_match_length=self.max_match_length, min_scan=self.min_scan)
+
+    def refuse(self, input: ChatModelInput, match: GuardMatch, *, separator: str = "") -> ChatModelOutput:
+        self.stops.append(match)
+        text = self.refusal.format(name=match.name)
+        meta = {"safetyStop": match.name}
+        if any(tool.name == FINAL_ANSWER for tool in input.tools or []):
+            call = MessageToolCallContent(
+                id="call_safety_stop", tool_name=FINAL_ANSWER, args=to_json({"response": text}, sort_keys=False)
+            )
+            return ChatModelOutput(messages=[AssistantMessage(call, meta)], finish_reason="tool_calls")
+        return ChatModelOutput(messages=[AssistantMessage(separator + text, meta)], finish_reason="stop")
+
+    async def _create(self, input: ChatModelInput, run: RunContext) -> ChatModelOutput:
+        # always stream from the inner model, that is what allows stopping mid-generation
+        return ChatModelOutput.from_chunks([chunk async for chunk in self.guard(input, release=False)])
+
+    async def _create_stream(self, input: ChatModelInput, run: RunContext) -> AsyncGenerator[ChatModelOutput]:
+        async for chunk in self.guard(input, release=True):
+            yield chunk
+
+    async def guard(self, input: ChatModelInput, *, release: bool) -> AsyncGenerator[ChatModelOutput]:
+        """Guarded inner stream; with `release`, chunks are passed on as soon as the scanner has cleared them."""
+        for result in pending_tool_results(input.messages):
+            scanner = self.create_scanner()
+            if matches := scanner.feed(result) + scanner.finish():
+                yield self.refuse(input, matches[0])
+                return
+
+        scanner = self.create_scanner()
+        held: deque[tuple[ChatModelOutput, int]] = deque()
+        holds_tool_call = False
+        released = False
+        end = 0
+        match: GuardMatch | None = None
+        stream = self.forward_stream(input)
+        try:
+            async for chunk in stream:
+                end += len(text := chunk_text(chunk))
+                held.append((chunk, end))
+                # tool-call deltas are merged by position, they can only be released as a whole
+                holds_tool_call = holds_tool_call or bool(chunk.get_tool_calls())
+                if matches := scanner.feed(text):
+                    match = matches[0]
+                    break
+                while release and held and not holds_tool_call and held[0][1] <= scanner.safe_offset:
+                    released = True
+                    yield held.popleft()[0]
+            else:
+                match = next(iter(scanner.finish()), None)
+        finally:
+            # leaving the stream early cancels the generation
+            await stream.aclose()
+
+        if match is not None:
+            # text the consumer has already seen stays, the refusal starts a new paragraph
+            yield self.refuse(input, match, separator="\n\n" if released else "")
+            return
+        for chunk, _ in held:
+            yield chunk
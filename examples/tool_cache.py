@@ -0,0 +1,236 @@
+"""Memoized tools
+
+Tools such as `weather_tool` or `wikipedia_search_tool` are pure (or slowly
+changing) functions of their arguments, and under load the same `location`
+or `query` comes in over and over. `memoize` stacks on `@tool` (or wraps any
+tool instance) and answers repeated calls from an in-process cache:
+
+    @memoize(ttl=600, max_entries=1024)
+    @tool
+    def weather_tool(location: str) -> str: ...
+
+* keys are the validated arguments with whitespace collapsed, so `"Paris"`
+  and `" Paris "` share an entry; with `casefold` case is ignored as well
+  (`"paris"` gets the answer cached for `"Paris"`), which is only right for
+  tools that ignore case themselves, like those of example 5;
+* entries expire `ttl` seconds after they were stored and the least recently
+  used ones are evicted beyond `max_entries`;
+* concurrent identical calls share one execution (single flight): the first
+  call runs the tool, the others wait for its result. A failed execution is
+  not cached, its error is raised to every waiting call.
+
+The framework's `options={"cache": ...}` tool cache is keyed on the raw
+input and has neither of the last two. Every output of a memoized tool
+carries the cache status and the hit rate so far, which the trajectory
+middleware prints; the model only sees the tool's text:
+
+    🛠️ MemoizedTool[weather_tool][finish]: {"cache": {"status": "hit", "hit_rate": 0.75}, "output": "..."}
+"""
+
+import asyncio
+import copy
+import json
+import re
+import time
+import typing
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from typing import Any, Literal, Self
+
+from beeai_framework.context import RunContext
+from beeai_framework.emitter import Emitter
+from beeai_framework.tools import AnyTool, Tool, ToolOutput, ToolRunOptions
+from beeai_framework.utils.strings import to_safe_word
+from pydantic import BaseModel
+
+CacheStatus = Literal["hit", "miss", "shared"]
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass
+class ToolCacheStats:
+    hits: int = 0
+    misses: int = 0
+    shared: int = 0
+    """Calls that waited for an identical call in flight instead of running the tool."""
+    expirations: int = 0
+    evictions: int = 0
+    entries: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of calls that did not run the tool."""
+        total = self.hits + self.shared + self.misses
+        return (self.hits + self.shared) / total if total else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {**asdict(self), "hit_rate": self.hit_rate}
+
+    def reset_counters(self) -> None:
+        """Zero the counters, keeping the size gauge."""
+        self.hits = self.misses = self.shared = self.expirations = self.evictions = 0
+
+
+def normalize_args(value: Any, *, casefold: bool = False) -> Any:
+    """Arguments with surrounding whitespace stripped and inner whitespace collapsed (optionally casefolded)."""
+    if isinstance(value, str):
+        value = _WHITESPACE.sub(" ", value).strip()
+        return value.casefold() if casefold else value
+    if isinstance(value, dict):
+        return {key: normalize_args(item, casefold=casefold) for key, item in value.items()}
+    if isinstance(value, list | tuple):
+        return [normalize_args(item, casefold=casefold) for item in value]
+    return value
+
+
+class CachedToolOutput(ToolOutput):
+    """Output of a memoized tool: the tool's own output plus how it was obtained."""
+
+    def __init__(self, output: ToolOutput, status: CacheStatus, hit_rate: float) -> None:
+        super().__init__()
+        self.output = output
+        self.status = status
+        self.hit_rate = hit_rate
+
+    def get_text_content(self) -> str:
+        return self.output.get_text_content()
+
+    def is_empty(self) -> bool:
+        return self.output.is_empty()
+
+    def to_json_safe(self) -> Any:
+        return {"cache": {"status": self.status, "hit_rate": round(self.hit_rate, 3)}, "output": self.output}
+
+
+class MemoizedTool(Tool[BaseModel, ToolRunOptions, CachedToolOutput]):
+    """Tool wrapper answering repeated calls from a TTL-bounded LRU cache with single-flight execution.
+
+    The wrapped tool's `_run` is called directly, its own emitter events and
+    middlewares are skipped. Clones (e.g. made for handoff sub-agents) share
+    the cache and the statistics.
+    """
+
+    def __init__(
+        self,
+        tool: AnyTool,
+        *,
+        ttl: float | None = 300.0,
+        max_entries: int = 1024,
+        casefold: bool = False,
+        options: dict[str, Any] | None = None,
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1.")
+        super().__init__(options)
+        self.tool = tool
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.casefold = casefold
+        self.stats = ToolCacheStats()
+        self._entries: OrderedDict[str, tuple[float, ToolOutput]] = OrderedDict()
+        self._in_flight: dict[str, asyncio.Future[ToolOutput]] = {}
+
+    @property
+    def name(self) -> str:
+        return self.tool.name
+
+    @property
+    def description(self) -> str:
+        return self.tool.description
+
+    @property
+    def input_schema(self) -> type[BaseModel]:
+        return self.tool.input_schema
+
+    def _create_emitter(self) -> Emitter:
+        return Emitter.root().child(namespace=["tool", "memoized", to_safe_word(self.name)], creator=self)
+
+    def cache_key(self, input: BaseModel | dict[str, Any]) -> str:
+        args = input.model_dump() if isinstance(input, BaseModel) else self._validate_input(input).model_dump()
+        return json.dumps(normalize_args(args, casefold=self.casefold), sort_keys=True, default=str)
+
+    def evict(self, **args: Any) -> bool:
+        """Drop the entry for these arguments; returns whether there was one."""
+        removed = self._entries.pop(self.cache_key(args), None) is not None
+        self.stats.entries = len(self._entries)
+        return removed
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.stats.entries = 0
+
+    async def _run(self, input: BaseModel, options: ToolRunOptions | None, context: RunContext) -> CachedToolOutput:
+        key = self.cache_key(input)
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires, output = entry
+            if expires > time.monotonic():
+                self._entries.move_to_end(key)
+                self.stats.hits += 1
+                return CachedToolOutput(output, "hit", self.stats.hit_rate)
+            del self._entries[key]
+            self.stats.expirations += 1
+
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.stats.shared += 1
+            status: CacheStatus = "shared"
+        else:
+            self.stats.misses += 1
+            status = "miss"
+            # a task of its own, so cancelling the first caller does not fail the calls waiting for it
+            future = self._in_flight[key] = asyncio.ensure_future(self._execute(key, input, options, context))
+            # retrieve the error even when every caller has been cancelled
+            future.add_done_callback(lambda done: done.cancelled() or done.exception())
+        # shield: a cancelled caller stops waiting without cancelling the shared execution
+        output = await asyncio.shield(future)
+        return CachedToolOutput(output, status, self.stats.hit_rate)
+
+    async def _execute(
+        self, key: str, input: BaseModel, options: ToolRunOptions | None, context: RunContext
+    ) -> ToolOutput:
+        try:
+            output = await self.tool._run(input, options, context)
+        finally:
+            del self._in_flight[key]
+
+        expires = time.monotonic() + self.ttl if self.ttl is not None else float("inf")
+        self._entries[key] = (expires, output)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+        self.stats.entries = len(self._entries)
+        return output
+
+    async def clone(self) -> Self:
+        cloned = copy.copy(self)
+        cloned.__dict__.pop("emitter", None)
+        cloned.middlewares = list(self.middlewares)
+        return cloned
+
+
+@typing.overload
+def memoize(
+    tool: AnyTool, /, *, ttl: float | None = ..., max_entries: int = ..., casefold: bool = ...
+) -> MemoizedTool: ...
+@typing.overload
+def memoize(
+    *, ttl: float | None = ..., max_entries: int = ..., casefold: bool = ...
+) -> Callable[[AnyTool], MemoizedTool]: ...
+def memoize(
+    tool: AnyTool | None = None,
+    /,
+    *,
+    ttl: float | None = 300.0,
+    max_entries: int = 1024,
+    casefold: bool = False,
+) -> MemoizedTool | Callable[[AnyTool], MemoizedTool]:
+    """Cache the results of a tool; use as `@memoize(...)` above `@tool` or call it on a tool instance."""
+
+    def wrap(inner: AnyTool) -> MemoizedTool:
+        return MemoizedTool(inner, ttl=ttl, max_entries=max_entries, casefold=casefold)
+
+    return wrap if tool is None else wrap(tool)
@@ -1,9 +1,131 @@
+import atexit
 import os
-from dotenv import load_dotenv
+import threading
 
 from beeai_framework.backend import ChatModel
+from beeai_framework.context import RunMiddlewareProtocol
+from dotenv import load_dotenv
+
+from examples.wrappers import LazyChatModel
+
+DEFAULT_MODEL = "openai:gpt-5-nano"
+
+# one model per (provider, model, API key), shared by every agent in the process
+_models: dict[tuple[str, str, str | None], ChatModel] = {}
+_lock = threading.Lock()
+_env_loaded = False
+_recorder: RunMiddlewareProtocol | None = None
+
+
+def _load_env() -> None:
+    global _env_loaded
+    if not _env_loaded:
+        load_dotenv()
+        _env_loaded = True
+
+
+def get_llm(name: str | None = None, *, api_key: str | None = None) -> ChatModel:
+    """Return the shared model for `name` (default `$MODEL`), building it on first use.
+
+    The provider SDK is only imported here, so importing the examples stays cheap
+    and each process keeps a single client (and connection pool) per model.
+    """
+    _load_env()
+    name = name or os.getenv("MODEL", DEFAULT_MODEL)
+    api_key = api_key if api_key is not None else os.getenv("API_KEY")
+    provider, _, model_id = name.partition(":")
+    key = (provider, model_id, api_key)
+
+    with _lock:
+        if key not in _models:
+            _models[key] = _create_llm(name, api_key)
+        return _models[key]
+
+
+def _create_model(name: str, api_key: str | None) -> ChatModel:
+    if name == "scripted" or name.startswith("scripted:"):
+        from examples.scripted import ScriptedChatModel
+
+        # Offline replay, e.g. MODEL=scripted:recorded.json (scripts can also be assigned to `get_llm().scripts`)
+        script_file = name.removeprefix("scripted").removeprefix(":")
+        return ScriptedChatModel.from_file(script_file) if script_file else ScriptedChatModel([])
+    return ChatModel.from_name(name, {"api_key": api_key})
+
+
+def _secondary_api_key(name: str, key_variable: str, main_name: str, api_key: str | None) -> str | None:
+    """`$<key_variable>` if set, else the main key when `name` has the main model's provider.
+
+    A model of another provider gets None, so its SDK reads its own key variable (e.g. `ANTHROPIC_API_KEY`).
+    """
+    if (secondary_key := os.getenv(key_variable)) is not None:
+        return secondary_key
+    return api_key if name.partition(":")[0] == main_name.partition(":")[0] else None
+
+
+def _create_llm(name: str, api_key: str | None) -> ChatModel:
+    llm = _create_model(name, api_key)
+
+    cheap_model, hedge_model = os.getenv("LLM_CHEAP_MODEL"), os.getenv("LLM_HEDGE_MODEL")
+    if cheap_model or hedge_model:
+        from examples.router import Route, RoutingChatModel
+
+        # steps where the requirements force a single tool go to the cheap model; slow requests are hedged
+        routes: list[Route] = []
+        if cheap_model:
+            cheap_key = _secondary_api_key(cheap_model, "LLM_CHEAP_API_KEY", name, api_key)
+            routes.append(Route(_create_model(cheap_model, cheap_key), name="constrained", max_choices=1))
+        hedge_key = _secondary_api_key(hedge_model, "LLM_HEDGE_API_KEY", name, api_key) if hedge_model else None
+        llm = RoutingChatModel(llm, routes=routes, hedge=_create_model(hedge_model, hedge_key) if hedge_model else None)
+
+    if os.getenv("LLM_CACHE"):
+        from examples.cache import CachedChatModel, TieredCache
+
+        # "memory" keeps responses in-process only, anything else is a SQLite file path
+        cache_location = os.environ["LLM_CACHE"]
+        llm = CachedChatModel(
+            llm,
+            cache=TieredCache(
+                None if cache_location == "memory" else cache_location,
+                max_memory_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "256")),
+                max_memory_bytes=int(os.getenv("LLM_CACHE_MAX_MEMORY_BYTES", str(16 * 1024 * 1024))),
+                max_disk_entries=int(os.getenv("LLM_CACHE_MAX_DISK_ENTRIES", "100000")),
+                max_disk_bytes=int(os.getenv("LLM_CACHE_MAX_DISK_BYTES", str(512 * 1024 * 1024))),
+            ),
+        )
+
+    if os.getenv("LLM_FAST_PATH"):
+        from examples.fast_path import FastPathChatModel
+
+        # outermost, so a forced step skips the cache lookup as well
+        llm = FastPathChatModel(llm)
+    return llm
+
+
+# Examples import this; the model behind it is created by the first request
+llm = LazyChatModel(get_llm)
+
+
+def trajectory_middleware() -> RunMiddlewareProtocol:
+    """Middleware the examples attach to their runs.
+
+    Tool events are pretty-printed by default; with `TRAJECTORY=<path>` (`.jsonl`
+    or `.parquet`) every step is recorded to that file by one process-wide
+    `TrajectoryRecorder` instead, which writes its buffer when the event loop ends
+    and closes the file when the process exits.
+    """
+    global _recorder
+    _load_env()
+    if not os.getenv("TRAJECTORY"):
+        from beeai_framework.middleware.trajectory import GlobalTrajectoryMiddleware
+        from beeai_framework.tools import Tool
+
+        return GlobalTrajectoryMiddleware(included=[Tool])
 
-load_dotenv()
+    with _lock:
+        if _recorder is None:
+            from examples.recorder import TrajectoryRecorder
 
-model = os.getenv("MODEL", "openai:gpt-5-nano")
-llm = ChatModel.from_name(model, {"api_key": os.getenv("API_KEY")})
+            recorder = TrajectoryRecorder(os.environ["TRAJECTORY"])
+            atexit.register(recorder.close)  # after the event loop, which may be started again before that
+            _recorder = recorder
+        return _recorder
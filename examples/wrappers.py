@@ -0,0 +1,152 @@
+"""ChatModel wrapper base
+
+`ChatModelWrapper` forwards every request to an inner ChatModel. Subclasses
+override `_create` / `_create_stream` to add behaviour (caching, routing,
+guards) while the inner model keeps its provider-specific handling such as
+tool-call fallbacks and retries.
+"""
+
+import asyncio
+import copy
+from collections.abc import AsyncGenerator, Callable
+from typing import Any, Self
+
+from beeai_framework.backend import ChatModel
+from beeai_framework.backend.events import ChatModelNewTokenEvent
+from beeai_framework.backend.types import (
+    ChatModelInput,
+    ChatModelOutput,
+    ChatModelStructureInput,
+    ChatModelStructureOutput,
+)
+from beeai_framework.context import Run, RunContext
+from beeai_framework.emitter import EventMeta
+from beeai_framework.utils.cancellation import AbortController, register_signals
+
+
+class ChatModelWrapper(ChatModel):
+    def __init__(self, llm: ChatModel) -> None:
+        # the inner model validates tool calls and applies fallbacks, so the wrapper must not do it twice
+        super().__init__(
+            tool_call_fallback_via_response_format=False,
+            allow_parallel_tool_calls=True,
+            ignore_parallel_tool_calls=False,
+            model_supports_tool_calling=True,
+            tool_choice_support={"required", "none", "single", "auto"},
+        )
+        self.llm = llm
+
+    @property
+    def model_id(self) -> str:
+        return self.llm.model_id
+
+    @property
+    def provider_id(self) -> Any:
+        return self.llm.provider_id
+
+    def forward(
+        self,
+        input: ChatModelInput,
+        llm: ChatModel | None = None,
+        *,
+        stream: bool | None = None,
+        parallel_tool_calls: bool | None = None,
+    ) -> Run[ChatModelOutput]:
+        """Send the request to the inner (or the given) model."""
+        return (llm or self.llm).create(
+            messages=list(input.messages),
+            tools=input.tools,
+            tool_choice=input.tool_choice,
+            abort_signal=input.abort_signal,
+            stop_sequences=input.stop_sequences,
+            response_format=input.response_format,
+            stream=input.stream if stream is None else stream,
+            # None lets the inner model apply its own `allow_parallel_tool_calls`
+            parallel_tool_calls=parallel_tool_calls,
+        )
+
+    async def _create(self, input: ChatModelInput, run: RunContext) -> ChatModelOutput:
+        return await self.forward(input, stream=False)
+
+    async def _create_stream(self, input: ChatModelInput, run: RunContext) -> AsyncGenerator[ChatModelOutput]:
+        async for chunk in self.forward_stream(input):
+            yield chunk
+
+    async def forward_stream(
+        self, input: ChatModelInput, llm: ChatModel | None = None, *, parallel_tool_calls: bool | None = None
+    ) -> AsyncGenerator[ChatModelOutput]:
+        """Stream the inner model's chunks as they arrive.
+
+        Closing the generator early aborts the inner generation.
+        """
+        queue: asyncio.Queue[ChatModelOutput | None] = asyncio.Queue()
+
+        async def on_token(data: ChatModelNewTokenEvent, _: EventMeta) -> None:
+            # the inner model merges its chunks in place once the stream ends, so hand out copies
+            await queue.put(copy.deepcopy(data.value))
+
+        # aborting through the run's signal lets the framework unwind the run, cancelling the task would not
+        controller = AbortController()
+        register_signals(controller, [input.abort_signal] if input.abort_signal else [])
+        input = input.model_copy(update={"abort_signal": controller.signal})
+        inner = self.forward(input, llm, stream=True, parallel_tool_calls=parallel_tool_calls)
+        task = asyncio.create_task(self._run_stream(inner.on("new_token", on_token)))
+        task.add_done_callback(lambda _: queue.put_nowait(None))
+        try:
+            while (chunk := await queue.get()) is not None:
+                yield chunk
+            await task
+        finally:
+            if not task.done():
+                controller.abort("The stream was closed.")
+                await asyncio.gather(task, return_exceptions=True)
+
+    @staticmethod
+    async def _run_stream(run: Run[ChatModelOutput]) -> ChatModelOutput:
+        return await run
+
+    async def _create_structure(self, input: ChatModelStructureInput[Any], run: RunContext) -> ChatModelStructureOutput:
+        return await self.llm.create_structure(
+            schema=input.input_schema,
+            messages=input.messages,
+            abort_signal=input.abort_signal,
+            max_retries=input.max_retries,
+        )
+
+    async def clone(self) -> Self:
+        # shares wrapper state (caches, counters) with the original, as HandoffTool clones agents per call
+        cloned = copy.copy(self)
+        cloned.__dict__.pop("emitter", None)
+        cloned.llm = await self.llm.clone()
+        return cloned
+
+
+class LazyChatModel(ChatModelWrapper):
+    """Builds the inner model on first use.
+
+    Clones return the same instance, so every agent holding it (including the
+    per-call clones HandoffTool makes of its target) shares one model and its
+    HTTP connection pool.
+    """
+
+    def __init__(self, factory: Callable[[], ChatModel]) -> None:
+        self._factory = factory
+        self._llm: ChatModel | None = None
+        super().__init__(None)  # type: ignore[arg-type]
+
+    @property
+    def llm(self) -> ChatModel:
+        if self._llm is None:
+            self._llm = self._factory()
+        return self._llm
+
+    @llm.setter
+    def llm(self, value: ChatModel | None) -> None:
+        self._llm = value
+
+    @property
+    def built(self) -> bool:
+        return self._llm is not None
+
+    async def clone(self) -> Self:
+        return self